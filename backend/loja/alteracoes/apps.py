@@ -0,0 +1,10 @@
+from django.apps import AppConfig
+
+
+class AlteracoesConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'alteracoes'
+
+    def ready(self):
+        from . import signals
+        signals.conectar()  # registra no log toda criação/alteração/remoção dos modelos acompanhados
@@ -0,0 +1,23 @@
+# backend/loja/alteracoes/management/commands/limpar_alteracoes.py
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from alteracoes.models import Alteracao
+
+
+class Command(BaseCommand):
+    help = 'Apaga o log de alterações antigo (clientes com cursor anterior recebem 410 e recarregam as listas).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dias', type=int, default=7, help='Mantém as alterações dos últimos N dias.')
+
+    def handle(self, *args, **options):
+        limite = timezone.now() - timedelta(days=options['dias'])
+        # Corta pelo id (chave primária) e mantém a linha do corte: ela marca até onde o log foi apagado
+        corte = Alteracao.objects.filter(created__lt=limite).order_by('-id').values_list('id', flat=True).first()
+        if corte is None:
+            self.stdout.write('Nada para apagar')
+            return
+        apagadas, _ = Alteracao.objects.filter(id__lt=corte).delete()
+        self.stdout.write(self.style.SUCCESS(f'✅ {apagadas} alterações apagadas (log a partir do id {corte})'))
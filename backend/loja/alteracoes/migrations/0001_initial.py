@@ -0,0 +1,30 @@
+# Generated by Django 5.1.7 on 2026-10-18 15:57
+
+import django.core.serializers.json
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Alteracao',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('modelo', models.CharField(max_length=30)),
+                ('objeto_id', models.PositiveBigIntegerField()),
+                ('acao', models.CharField(choices=[('criado', 'Criado'), ('alterado', 'Alterado'), ('removido', 'Removido')], max_length=10)),
+                ('empresa_id', models.PositiveBigIntegerField(blank=True, null=True)),
+                ('dados', models.JSONField(default=dict, encoder=django.core.serializers.json.DjangoJSONEncoder)),
+                ('created', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['empresa_id', 'id'], name='alteracao_empresa_cursor_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,35 @@
+# backend/loja/alteracoes/models.py
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import models
+
+
+class Alteracao(models.Model):
+    """Log de alterações (somente inclusão) lido pelos clientes que sincronizam incrementalmente.
+
+    O id é o cursor de GET /api/changes/?since=. ``dados`` guarda só os campos que
+    os clientes usam do objeto (ver alteracoes.registro.MODELOS), já no estado
+    posterior à alteração.
+    """
+    CRIADO = 'criado'
+    ALTERADO = 'alterado'
+    REMOVIDO = 'removido'
+    ACAO_CHOICES = [
+        (CRIADO, 'Criado'),
+        (ALTERADO, 'Alterado'),
+        (REMOVIDO, 'Removido'),
+    ]
+
+    modelo = models.CharField(max_length=30)  # ex.: "pedido", "itemmesa"
+    objeto_id = models.PositiveBigIntegerField()
+    acao = models.CharField(max_length=10, choices=ACAO_CHOICES)
+    empresa_id = models.PositiveBigIntegerField(null=True, blank=True)  # sem FK: o log sobrevive à empresa
+    dados = models.JSONField(default=dict, encoder=DjangoJSONEncoder)
+    created = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['empresa_id', 'id'], name='alteracao_empresa_cursor_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.id}: {self.modelo} {self.objeto_id} {self.acao}'
@@ -0,0 +1,107 @@
+# backend/loja/alteracoes/registro.py
+"""Gravação do log de alterações (outbox), sempre na transação da própria alteração.
+
+save() e delete() dos modelos acompanhados chegam aqui pelos sinais
+(alteracoes.signals); UPDATEs e bulk_create, que não disparam sinais, chamam
+``registrar``/``registrar_ids`` logo depois de gravar.
+"""
+import threading
+from contextlib import contextmanager
+
+from django.db.models import Subquery
+
+from .models import Alteracao
+
+CRIADO = Alteracao.CRIADO
+ALTERADO = Alteracao.ALTERADO
+REMOVIDO = Alteracao.REMOVIDO
+
+# Modelo -> (campos copiados para o delta, caminho até o id da empresa)
+MODELOS = {
+    'pedido.pedido': (['status', 'total', 'origem', 'mesa', 'usuario', 'valor_pago', 'pessoas_pagaram', 'slug'], 'empresa_id'),
+    'mesa.mesa': (['numero', 'nome', 'status', 'pedido', 'valor_pago', 'pessoas_pagaram', 'numero_pessoas', 'slug'], 'empresa_id'),
+    'mesa.itemmesa': (['mesa', 'produto_id', 'quantidade', 'preco_unitario', 'produto_nome', 'slug'], 'mesa__empresa_id'),
+    'carrinho.carrinho': (['usuario', 'slug'], None),
+    'carrinho.itemcarrinho': (['carrinho', 'produto', 'quantidade', 'preco_unitario', 'produto_slug', 'slug'], None),
+    'produto.produto': (['nome', 'venda', 'estoque', 'categoria', 'is_available', 'slug'], 'empresa_id'),
+}
+
+_estado = threading.local()
+
+
+@contextmanager
+def em_lote():
+    """Suspende o registro pelos sinais (ex.: queryset.delete(), que dispara um sinal por objeto);
+    quem usa registra o lote inteiro com uma chamada a ``registrar`` (um INSERT)."""
+    anterior = getattr(_estado, 'suspenso', False)
+    _estado.suspenso = True
+    try:
+        yield
+    finally:
+        _estado.suspenso = anterior
+
+
+def suspenso():
+    return getattr(_estado, 'suspenso', False)
+
+
+def _campos(model):
+    """[(chave no delta, attname)]: FKs saem com o nome do campo e o valor do id."""
+    return [(nome, model._meta.get_field(nome).attname) for nome in MODELOS[model._meta.label_lower][0]]
+
+
+def _empresa(instancia, caminho):
+    if caminho is None:
+        return None
+    if '__' not in caminho:
+        return getattr(instancia, caminho)
+    # Empresa em outra tabela (ex.: item -> mesa -> empresa): subconsulta dentro do próprio INSERT
+    relacao, resto = caminho.split('__', 1)
+    campo = instancia._meta.get_field(relacao)
+    return Subquery(campo.related_model.objects.filter(pk=getattr(instancia, campo.attname)).values(resto)[:1])
+
+
+def registrar(instancias, acao):
+    """Grava uma alteração por instância num único INSERT. Instâncias carregadas com only()/defer()
+    são relidas numa consulta (ler os campos adiados faria uma consulta por campo)."""
+    linhas = []
+    adiadas = {}
+    for instancia in instancias:
+        model = type(instancia)
+        if model._meta.label_lower not in MODELOS:
+            continue
+        campos = _campos(model)
+        if instancia.get_deferred_fields() & {attname for _, attname in campos}:
+            adiadas.setdefault(model, []).append(instancia.pk)
+            continue
+        linhas.append(Alteracao(
+            modelo=model._meta.model_name,
+            objeto_id=instancia.pk,
+            acao=acao,
+            empresa_id=_empresa(instancia, MODELOS[model._meta.label_lower][1]),
+            dados={chave: getattr(instancia, attname) for chave, attname in campos},
+        ))
+    if linhas:
+        Alteracao.objects.bulk_create(linhas)
+    for model, ids in adiadas.items():
+        registrar_ids(model, ids, acao)
+
+
+def registrar_ids(model, ids, acao):
+    """Registra objetos alterados por UPDATE em lote, lendo o estado atual numa consulta."""
+    ids = list(ids)
+    if not ids:
+        return
+    campos = _campos(model)
+    caminho = MODELOS[model._meta.label_lower][1]
+    valores = model.objects.filter(pk__in=ids).values('pk', *[attname for _, attname in campos], *([caminho] if caminho else []))
+    Alteracao.objects.bulk_create([
+        Alteracao(
+            modelo=model._meta.model_name,
+            objeto_id=linha['pk'],
+            acao=acao,
+            empresa_id=linha[caminho] if caminho else None,
+            dados={chave: linha[attname] for chave, attname in campos},
+        )
+        for linha in valores
+    ])
@@ -0,0 +1,23 @@
+# backend/loja/alteracoes/signals.py
+from django.apps import apps
+from django.db.models.signals import post_delete, post_save
+from . import registro
+
+
+def registrar_salvo(sender, instance, created=False, raw=False, **kwargs):
+    if raw or registro.suspenso():  # loaddata / lote registrado por quem chamou
+        return
+    registro.registrar([instance], registro.CRIADO if created else registro.ALTERADO)
+
+
+def registrar_removido(sender, instance, **kwargs):
+    if registro.suspenso():
+        return
+    registro.registrar([instance], registro.REMOVIDO)
+
+
+def conectar():
+    for label in registro.MODELOS:
+        model = apps.get_model(label)
+        post_save.connect(registrar_salvo, sender=model, dispatch_uid=f'alteracoes-salvo-{label}')
+        post_delete.connect(registrar_removido, sender=model, dispatch_uid=f'alteracoes-removido-{label}')
@@ -0,0 +1,68 @@
+from django.test import TestCase
+
+from carrinho.models import Carrinho
+from loja.testing import cliente_autenticado, criar_empresa, criar_produto, criar_usuario
+from mesa.models import Mesa
+from pedido.services import fechar_mesas
+from .models import Alteracao
+
+
+class AlteracoesTests(TestCase):
+    def setUp(self):
+        self.empresa = criar_empresa()
+        self.client = cliente_autenticado()
+        self.chopp = criar_produto(empresa=self.empresa, estoque=50)
+        self.mesa = Mesa.objects.create(empresa=self.empresa, numero='3', nome='Mesa 3')
+
+    def cursor(self):
+        return self.client.get('/api/changes/').data['cursor']
+
+    def changes(self, since, **params):
+        query = ''.join(f'&{chave}={valor}' for chave, valor in params.items())
+        return self.client.get(f'/api/changes/?since={since}{query}')
+
+    def test_deltas_em_ordem_e_compactados(self):
+        cursor = self.cursor()
+        self.mesa.adicionar_item(self.chopp, 1)
+        self.mesa.adicionar_item(self.chopp, 2)  # UPDATE com F(): registrado sem sinal
+        response = self.changes(cursor)
+        self.assertEqual(response.status_code, 200)
+        deltas = {(d['modelo'], d['id']): d for d in response.data['alteracoes']}
+        item = self.mesa.items.get()
+        self.assertEqual(deltas[('itemmesa', item.id)]['dados']['quantidade'], 3)  # só a última alteração do item
+        self.assertEqual(deltas[('itemmesa', item.id)]['empresa'], self.empresa.id)
+        self.assertEqual(deltas[('produto', self.chopp.id)]['dados']['estoque'], 47)
+        self.assertEqual(deltas[('mesa', self.mesa.id)]['dados']['status'], 'Ocupada')
+
+        # Retomando do cursor devolvido, nada de novo
+        vazio = self.changes(response.data['cursor']).data
+        self.assertEqual((vazio['alteracoes'], vazio['cursor']), ([], response.data['cursor']))
+
+    def test_fechamento_registra_pedido_remocoes_e_mesa_liberada(self):
+        self.mesa.adicionar_item(self.chopp, 2)
+        item_id = self.mesa.items.get().id
+        cursor = self.cursor()
+        pedido, = fechar_mesas([{'slug': self.mesa.slug}])
+        deltas = [(d['modelo'], d['id'], d['acao']) for d in self.changes(cursor, empresa=self.empresa.id).data['alteracoes']]
+        self.assertIn(('pedido', pedido.id, 'criado'), deltas)
+        self.assertIn(('itemmesa', item_id, 'removido'), deltas)
+        self.assertIn(('mesa', self.mesa.id, 'alterado'), deltas)
+
+    def test_carrinho_e_paginas(self):
+        cursor = self.cursor()
+        carrinho = Carrinho.objects.create(usuario=criar_usuario())
+        for _ in range(3):
+            carrinho.adicionar_item(self.chopp, 1)
+        primeira = self.changes(cursor, modelos='itemcarrinho', limit=1).data
+        self.assertTrue(primeira['mais'])
+        self.assertEqual(primeira['alteracoes'][0]['acao'], 'criado')
+        resto = self.changes(primeira['cursor'], modelos='itemcarrinho').data
+        self.assertFalse(resto['mais'])
+        self.assertEqual([d['dados']['quantidade'] for d in resto['alteracoes']], [3])
+
+    def test_cursor_expirado(self):
+        self.mesa.adicionar_item(self.chopp, 1)
+        ultimo = Alteracao.objects.order_by('-id').first()
+        Alteracao.objects.filter(id__lt=ultimo.id).delete()
+        self.assertEqual(self.changes(0).status_code, 410)
+        self.assertEqual(self.changes(ultimo.id - 1).status_code, 200)
@@ -0,0 +1,7 @@
+# backend/loja/alteracoes/urls.py
+from django.urls import path
+from . import views
+
+urlpatterns = [
+    path("changes/", views.alteracoes, name="alteracoes"),
+]
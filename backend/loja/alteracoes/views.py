@@ -0,0 +1,67 @@
+# backend/loja/alteracoes/views.py
+from rest_framework import status
+from rest_framework.decorators import api_view
+from rest_framework.response import Response
+
+from .models import Alteracao
+
+LIMITE_PADRAO = 500
+LIMITE_MAXIMO = 2000
+
+
+def _inteiro(valor, padrao=None):
+    if valor in (None, ''):
+        return padrao
+    return int(valor)
+
+
+@api_view(['GET'])
+def alteracoes(request):
+    """Deltas em ordem depois de ?since=<cursor> (opcionais: ?empresa=, ?modelos=pedido,mesa, ?limit=).
+
+    Sem ``since`` devolve só o cursor atual: o cliente carrega as listas completas
+    uma vez, guarda o cursor e dali em diante pede só o que mudou. Dentro de uma
+    página fica apenas a última alteração de cada objeto; ``mais`` indica que há
+    outra página logo em seguida. Se o cursor for mais antigo que o log guardado
+    (limpar_alteracoes), a resposta é 410 e o cliente deve recarregar as listas.
+    """
+    try:
+        since = _inteiro(request.query_params.get('since'))
+        empresa_id = _inteiro(request.query_params.get('empresa'))
+        limite = min(max(_inteiro(request.query_params.get('limit'), LIMITE_PADRAO), 1), LIMITE_MAXIMO)
+    except ValueError:
+        return Response({"error": "since, empresa e limit devem ser números inteiros"}, status=status.HTTP_400_BAD_REQUEST)
+
+    log = Alteracao.objects.all()
+    if empresa_id is not None:
+        log = log.filter(empresa_id=empresa_id)
+    if since is None:
+        cursor = Alteracao.objects.order_by('-id').values_list('id', flat=True).first() or 0
+        return Response({"cursor": cursor, "mais": False, "alteracoes": []})
+
+    mais_antiga = Alteracao.objects.order_by('id').values_list('id', flat=True).first()
+    if mais_antiga is not None and since < mais_antiga - 1:  # o que vinha logo depois do cursor já foi apagado
+        return Response({"error": "Cursor expirado; recarregue as listas e use o cursor novo"}, status=status.HTTP_410_GONE)
+
+    modelos = request.query_params.get('modelos')
+    if modelos:
+        log = log.filter(modelo__in=[modelo.strip().lower() for modelo in modelos.split(',')])
+
+    pagina = list(
+        log.filter(id__gt=since).order_by('id')
+        .values('id', 'modelo', 'objeto_id', 'acao', 'empresa_id', 'dados')[:limite + 1]
+    )
+    mais = len(pagina) > limite
+    pagina = pagina[:limite]
+
+    ultimas = {}
+    for linha in pagina:
+        chave = (linha['modelo'], linha['objeto_id'])
+        ultimas.pop(chave, None)  # reinsere no fim: a ordem é a da última alteração
+        ultimas[chave] = linha
+    deltas = [
+        {"modelo": linha['modelo'], "id": linha['objeto_id'], "acao": linha['acao'],
+         "empresa": linha['empresa_id'], "dados": linha['dados']}
+        for linha in ultimas.values()
+    ]
+    return Response({"cursor": pagina[-1]['id'] if pagina else since, "mais": mais, "alteracoes": deltas})
@@ -0,0 +1,11 @@
+# backend/loja/avaliacoes/management/commands/recalcular_avaliacoes.py
+from django.core.management.base import BaseCommand
+from avaliacoes import services
+
+
+class Command(BaseCommand):
+    help = 'Recalcula a soma e a contagem de avaliações de todos os produtos (reparo, ex.: após importação em massa).'
+
+    def handle(self, *args, **options):
+        total = services.recalcular()
+        self.stdout.write(self.style.SUCCESS(f'✅ Avaliações recalculadas para {total} produtos'))
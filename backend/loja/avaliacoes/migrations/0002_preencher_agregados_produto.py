@@ -0,0 +1,25 @@
+from django.db import migrations
+from django.db.models import Count, IntegerField, OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce
+
+
+def preencher(apps, schema_editor):
+    Avaliacao = apps.get_model('avaliacoes', 'Avaliacao')
+    Produto = apps.get_model('produto', 'Produto')
+    avaliacoes = Avaliacao.objects.filter(produto=OuterRef('pk')).order_by().values('produto')
+    Produto.objects.update(
+        avaliacoes_soma=Coalesce(Subquery(avaliacoes.annotate(soma=Sum('rating')).values('soma'), output_field=IntegerField()), 0),
+        avaliacoes_total=Coalesce(Subquery(avaliacoes.annotate(total=Count('id')).values('total'), output_field=IntegerField()), 0),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('avaliacoes', '0001_initial'),
+        ('produto', '0004_produto_avaliacoes_agregadas'),
+    ]
+
+    operations = [
+        migrations.RunPython(preencher, migrations.RunPython.noop),
+    ]
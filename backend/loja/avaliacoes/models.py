@@ -21,4 +21,12 @@ class Avaliacao(models.Model):
     class Meta:
         unique_together = ('usuario', 'produto')
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        # Nota como estava no banco: os sinais somam só a diferença em Produto.avaliacoes_soma
+        instance = super().from_db(db, field_names, values)
+        if 'rating' in field_names:
+            instance._rating_salvo = values[field_names.index('rating')]
+        return instance
+
 
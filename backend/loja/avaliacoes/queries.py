@@ -0,0 +1,8 @@
+# backend/loja/avaliacoes/queries.py
+from .models import Avaliacao
+
+
+def avaliacoes(queryset=None):
+    """Avaliações prontas para o AvaliacaoSerializer (usuario.username e produto.nome)."""
+    queryset = Avaliacao.objects.all() if queryset is None else queryset
+    return queryset.select_related('usuario', 'produto')
@@ -0,0 +1,24 @@
+# backend/loja/avaliacoes/services.py
+from django.db.models import Count, IntegerField, OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce
+
+from produto.models import Produto
+from .models import Avaliacao
+
+
+def medias(produto_ids):
+    """[{produto_id, media, total}] dos produtos existentes, numa consulta (sem AVG sobre Avaliacao)."""
+    return [
+        {'produto_id': produto.id, 'media': produto.media_avaliacoes, 'total': produto.avaliacoes_total}
+        for produto in Produto.objects.filter(id__in=produto_ids).only('avaliacoes_soma', 'avaliacoes_total').order_by('id')
+    ]
+
+
+def recalcular():
+    """Refaz soma e contagem de todos os produtos a partir das avaliações, num único UPDATE
+    com subconsultas agrupadas. Retorna quantos produtos foram percorridos."""
+    avaliacoes = Avaliacao.objects.filter(produto=OuterRef('pk')).order_by().values('produto')
+    return Produto.objects.update(
+        avaliacoes_soma=Coalesce(Subquery(avaliacoes.annotate(soma=Sum('rating')).values('soma'), output_field=IntegerField()), 0),
+        avaliacoes_total=Coalesce(Subquery(avaliacoes.annotate(total=Count('id')).values('total'), output_field=IntegerField()), 0),
+    )
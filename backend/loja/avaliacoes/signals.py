@@ -0,0 +1,37 @@
+# backend/loja/avaliacoes/signals.py
+"""Mantém Produto.avaliacoes_soma/avaliacoes_total na mesma transação de cada save/delete de Avaliacao.
+
+Os UPDATEs usam F(), então duas avaliações simultâneas do mesmo produto não se
+sobrescrevem. Inclui as remoções em cascata (ex.: usuário apagado).
+"""
+from django.db.models import F
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from loja import cache
+from produto.models import Produto
+from .models import Avaliacao
+
+
+@receiver(post_save, sender=Avaliacao)
+def avaliacao_salva(sender, instance, created, **kwargs):
+    rating = int(instance.rating)
+    if created:
+        Produto.objects.filter(pk=instance.produto_id).update(
+            avaliacoes_soma=F('avaliacoes_soma') + rating, avaliacoes_total=F('avaliacoes_total') + 1,
+        )
+    else:
+        diferenca = rating - getattr(instance, '_rating_salvo', rating)
+        if diferenca:
+            Produto.objects.filter(pk=instance.produto_id).update(avaliacoes_soma=F('avaliacoes_soma') + diferenca)
+    instance._rating_salvo = rating
+    cache.invalidar('avaliacoes_produto', produto_id=instance.produto_id)
+
+
+@receiver(post_delete, sender=Avaliacao)
+def avaliacao_removida(sender, instance, **kwargs):
+    Produto.objects.filter(pk=instance.produto_id).update(
+        avaliacoes_soma=F('avaliacoes_soma') - int(getattr(instance, '_rating_salvo', instance.rating)),
+        avaliacoes_total=F('avaliacoes_total') - 1,
+    )
+    cache.invalidar('avaliacoes_produto', produto_id=instance.produto_id)
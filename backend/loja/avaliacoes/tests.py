@@ -1,3 +1,82 @@
+from io import StringIO
+
+from django.core.cache import caches
+from django.core.management import call_command
 from django.test import TestCase
 
-# Create your tests here.
+from loja.testing import QueryCountMixin, cliente_autenticado, criar_empresa, criar_produto, criar_usuario
+from produto.models import Produto
+from .models import Avaliacao
+
+
+class AvaliacaoQueryCountTests(QueryCountMixin, TestCase):
+    def setUp(self):
+        self.produto = criar_produto(empresa=criar_empresa())
+        self.client = cliente_autenticado()
+
+    def criar_avaliacoes(self, quantidade):
+        for _ in range(quantidade):
+            Avaliacao.objects.create(usuario=criar_usuario(), produto=self.produto, rating=5, comentario='Gelado!')
+
+    def test_avaliacoes_do_produto(self):
+        # avaliações com usuário e produto em um JOIN
+        self.assertNumQueriesFixo(1, self.client, f'/api/avaliacoes/produto/{self.produto.id}/', self.criar_avaliacoes)
+
+
+class AgregadosAvaliacaoTests(TestCase):
+    def setUp(self):
+        self.produto = criar_produto(empresa=criar_empresa())
+        self.client = cliente_autenticado()
+        self.usuarios = [criar_usuario() for _ in range(2)]
+
+    def agregados(self):
+        self.produto.refresh_from_db()
+        return self.produto.avaliacoes_soma, self.produto.avaliacoes_total
+
+    def test_criar_editar_remover_mantem_soma_e_contagem(self):
+        for usuario, nota in zip(self.usuarios, (5, 3)):
+            self.client.post('/api/avaliacoes/criar/', {'produto_id': self.produto.id, 'user_id': usuario.id, 'nota': nota, 'comentario': 'ok'})
+        self.assertEqual(self.agregados(), (8, 2))
+
+        # reavaliar pelo criar (update_or_create) soma só a diferença
+        self.client.post('/api/avaliacoes/criar/', {'produto_id': self.produto.id, 'user_id': self.usuarios[0].id, 'nota': 4, 'comentario': 'ok'})
+        self.assertEqual(self.agregados(), (7, 2))
+
+        avaliacao = Avaliacao.objects.get(usuario=self.usuarios[1])
+        self.client.put(f'/api/avaliacoes/editar/{avaliacao.slug}/', {'user_id': self.usuarios[1].id, 'rating': 1}, format='json')
+        self.assertEqual(self.agregados(), (5, 2))
+        self.client.delete(f'/api/avaliacoes/remover/{avaliacao.slug}/', {'user_id': self.usuarios[1].id}, format='json')
+        self.assertEqual(self.agregados(), (4, 1))
+
+        self.assertEqual(self.client.get(f'/api/avaliacoes/media/{self.produto.id}/').json()['media'], 4)
+
+    def test_medias_em_lote_numa_consulta(self):
+        outro = criar_produto(empresa=self.produto.empresa)
+        Avaliacao.objects.create(usuario=self.usuarios[0], produto=self.produto, rating=5, comentario='')
+        Avaliacao.objects.create(usuario=self.usuarios[1], produto=self.produto, rating=2, comentario='')
+        with self.assertNumQueries(1):
+            resposta = self.client.get(f'/api/avaliacoes/medias/?produtos={self.produto.id},{outro.id},999999')
+        self.assertEqual(resposta.json(), [
+            {'produto_id': self.produto.id, 'media': 3.5, 'total': 2},
+            {'produto_id': outro.id, 'media': 0, 'total': 0},
+        ])
+
+    def test_recalcular_corrige_desvios(self):
+        Avaliacao.objects.create(usuario=self.usuarios[0], produto=self.produto, rating=5, comentario='')
+        Produto.objects.update(avaliacoes_soma=99, avaliacoes_total=7)
+        call_command('recalcular_avaliacoes', stdout=StringIO())
+        self.assertEqual(self.agregados(), (5, 1))
+
+
+class CacheAvaliacoesTests(TestCase):
+    def test_id_com_zero_a_esquerda_usa_a_mesma_chave_que_a_invalidacao(self):
+        caches['respostas'].clear()
+        produto = criar_produto(empresa=criar_empresa())
+        client = cliente_autenticado()
+        self.assertEqual(client.get(f'/api/avaliacoes/produto/0{produto.id}/')['X-Cache'], 'MISS')
+        self.assertEqual(client.get(f'/api/avaliacoes/produto/{produto.id}/')['X-Cache'], 'HIT')
+        with self.captureOnCommitCallbacks(execute=True):
+            Avaliacao.objects.create(usuario=criar_usuario(), produto=produto, rating=5, comentario='')
+        resposta = client.get(f'/api/avaliacoes/produto/0{produto.id}/')
+        self.assertEqual((resposta['X-Cache'], len(resposta.json())), ('MISS', 1))
+        self.assertEqual(client.get('/api/avaliacoes/produto/abc/').status_code, 404)
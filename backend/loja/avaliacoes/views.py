@@ -6,8 +6,10 @@ from rest_framework.response import Response
 from rest_framework import status
 from .models import Avaliacao
 from .serializers import AvaliacaoSerializer
+from . import queries, services
+from loja import cache
 from produto.models import Produto
-from django.db.models import Avg
+from django.db import transaction
 from django.contrib.auth.models import User
 
 @api_view(['GET'])
@@ -18,7 +20,7 @@ def listar_avaliacoes_usuario(request):
         return Response({'error': 'user_id é obrigatório'}, status=status.HTTP_400_BAD_REQUEST)
     try:
         usuario = User.objects.get(id=user_id)
-        avaliacoes = Avaliacao.objects.filter(usuario=usuario)
+        avaliacoes = queries.avaliacoes().filter(usuario=usuario)
         serializer = AvaliacaoSerializer(avaliacoes, many=True)
         return Response(serializer.data)
     except User.DoesNotExist:
@@ -26,8 +28,9 @@ def listar_avaliacoes_usuario(request):
 
 @api_view(['GET'])
 @permission_classes([AllowAny])
+@cache.em_cache('avaliacoes_produto')
 def listar_avaliacoes_produto(request, produto_id):
-    avaliacoes = Avaliacao.objects.filter(produto__id=produto_id)
+    avaliacoes = queries.avaliacoes().filter(produto__id=produto_id)
     serializer = AvaliacaoSerializer(avaliacoes, many=True)
     return Response(serializer.data)
 
@@ -65,12 +68,14 @@ def editar_avaliacao(request, slug):
 
     try:
         usuario = User.objects.get(id=user_id)
-        avaliacao = Avaliacao.objects.get(slug=slug, usuario=usuario)
-        rating = request.data.get('rating', avaliacao.rating)
-        comentario = request.data.get('comentario', avaliacao.comentario)
-        avaliacao.rating = rating
-        avaliacao.comentario = comentario
-        avaliacao.save()
+        with transaction.atomic():
+            # Travada: a nota anterior é a base da diferença somada em Produto.avaliacoes_soma
+            avaliacao = Avaliacao.objects.select_for_update().get(slug=slug, usuario=usuario)
+            rating = request.data.get('rating', avaliacao.rating)
+            comentario = request.data.get('comentario', avaliacao.comentario)
+            avaliacao.rating = rating
+            avaliacao.comentario = comentario
+            avaliacao.save()
         serializer = AvaliacaoSerializer(avaliacao)
         return Response(serializer.data)
     except Avaliacao.DoesNotExist:
@@ -87,8 +92,9 @@ def remover_avaliacao(request, slug):
 
     try:
         usuario = User.objects.get(id=user_id)
-        avaliacao = Avaliacao.objects.get(slug=slug, usuario=usuario)
-        avaliacao.delete()
+        with transaction.atomic():
+            avaliacao = Avaliacao.objects.select_for_update().get(slug=slug, usuario=usuario)
+            avaliacao.delete()
         return Response(status=status.HTTP_204_NO_CONTENT)
     except Avaliacao.DoesNotExist:  # Fixed 'campi except' to 'except'
         return Response({'error': 'Avaliação não encontrada'}, status=status.HTTP_404_NOT_FOUND)
@@ -99,8 +105,20 @@ def remover_avaliacao(request, slug):
 @permission_classes([AllowAny])
 def media_avaliacoes(request, produto_id):
     try:
-        media = Avaliacao.objects.filter(produto__id=produto_id).aggregate(Avg('rating'))['rating__avg'] or 0
-        return Response({'produto_id': produto_id, 'media': round(media, 2)})
-    except Produto.DoesNotExist:
+        produto = Produto.objects.only('avaliacoes_soma', 'avaliacoes_total').get(id=produto_id)
+        return Response({'produto_id': produto_id, 'media': produto.media_avaliacoes})
+    except (Produto.DoesNotExist, ValueError):
         return Response({'error': 'Produto não encontrado'}, status=status.HTTP_404_NOT_FOUND)
 
+@api_view(['GET'])
+@permission_classes([AllowAny])
+def medias_avaliacoes(request):
+    """Médias de vários produtos numa consulta: ?produtos=1,2,3 (para a página do catálogo)."""
+    try:
+        produto_ids = [int(produto_id) for produto_id in request.GET.get('produtos', '').split(',') if produto_id.strip()]
+    except ValueError:
+        return Response({'error': 'produtos deve ser uma lista de ids separados por vírgula'}, status=status.HTTP_400_BAD_REQUEST)
+    if not produto_ids:
+        return Response({'error': 'produtos é obrigatório'}, status=status.HTTP_400_BAD_REQUEST)
+    return Response(services.medias(produto_ids))
+
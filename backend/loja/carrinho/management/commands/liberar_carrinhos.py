@@ -0,0 +1,15 @@
+# backend/loja/carrinho/management/commands/liberar_carrinhos.py
+from django.core.management.base import BaseCommand
+from carrinho import services
+
+
+class Command(BaseCommand):
+    help = 'Devolve o estoque dos carrinhos com reserva vencida e os apaga (rodar periodicamente, ex.: cron a cada 10 minutos).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--lote', type=int, default=services.TAMANHO_LOTE,
+                            help='Carrinhos por transação (transações curtas não seguram a tabela).')
+
+    def handle(self, *args, **options):
+        carrinhos, itens = services.liberar_expirados(lote=options['lote'])
+        self.stdout.write(self.style.SUCCESS(f'✅ {carrinhos} carrinhos vencidos liberados ({itens} itens devolvidos ao estoque)'))
@@ -0,0 +1,19 @@
+# Generated by Django 5.1.7 on 2026-10-18 15:33
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('carrinho', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='carrinho',
+            index=models.Index(fields=['criado_em', 'id'], name='carrinho_criado_em_id_idx'),
+        ),
+    ]
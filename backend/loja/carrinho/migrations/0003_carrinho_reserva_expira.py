@@ -0,0 +1,25 @@
+# Generated by Django 5.1.7 on 2026-10-18 16:06
+
+import carrinho.models
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('carrinho', '0002_carrinho_carrinho_criado_em_id_idx'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='carrinho',
+            name='reserva_expira',
+            field=models.DateTimeField(blank=True, default=carrinho.models.vencimento_reserva, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='carrinho',
+            index=models.Index(fields=['reserva_expira'], name='carrinho_reserva_expira_idx'),
+        ),
+    ]
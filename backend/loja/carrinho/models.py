@@ -1,59 +1,175 @@
 # backend/loja/carrinho/models.py
+from datetime import timedelta
+from django.conf import settings
 from django.db import models
 from django.contrib.auth.models import User
+from django.utils import timezone
 from produto.models import Produto
 from django.utils.text import slugify
 from django.utils.crypto import get_random_string
+from django.db import transaction
 from decimal import Decimal
+from alteracoes import registro
+from estoque import services as estoque_service
+from loja import slugs
+from loja.slugs import SlugUnicoMixin
+
+# Por quanto tempo o estoque fica reservado num carrinho sem movimento (ver manage.py liberar_carrinhos)
+RESERVA_TTL = timedelta(seconds=getattr(settings, 'CARRINHO_RESERVA_TTL', 2 * 60 * 60))
+
+
+def vencimento_reserva():
+    return timezone.now() + RESERVA_TTL
+
+
+class Carrinho(SlugUnicoMixin, models.Model):
+    # Operações aceitas por aplicar_operacoes (POST /carrinhos/<slug>/batch/)
+    ADICIONAR = 'adicionar'
+    DEFINIR = 'definir'
+    REMOVER = 'remover'
+    OPERACOES = (ADICIONAR, DEFINIR, REMOVER)
 
-class Carrinho(models.Model):
     usuario = models.ForeignKey(User, null=True, blank=True, on_delete=models.SET_NULL)  # Usa User diretamente
     sessao_id = models.CharField(max_length=100, null=True, blank=True)  # Para usuários anônimos
     criado_em = models.DateTimeField(auto_now_add=True)
     atualizado_em = models.DateTimeField(auto_now=True)
     slug = models.SlugField(max_length=100, unique=True, blank=True, null=True)
+    # Quando a varredura devolve o estoque dos itens e apaga o carrinho; nulo = nada reservado
+    reserva_expira = models.DateTimeField(null=True, blank=True, default=vencimento_reserva)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['criado_em', 'id'], name='carrinho_criado_em_id_idx'),  # paginação por cursor
+            models.Index(fields=['reserva_expira'], name='carrinho_reserva_expira_idx'),  # varredura de vencidos
+        ]
 
     def __str__(self):
         return f"Carrinho {self.slug} - {self.usuario.username if self.usuario else 'Anônimo'}"
 
-    def save(self, *args, **kwargs):
-        """Gera um slug único baseado no usuário ou sessão."""
-        if not self.slug:
-            base = f"carrinho-{self.usuario.username if self.usuario else self.sessao_id or 'anonimo'}"
-            slug_base = slugify(base)
-            slug = slug_base
-            if Carrinho.objects.filter(slug=slug).exists():
-                slug = f"{slug_base}-{get_random_string(5)}"
-            self.slug = slug
+    def get_slug_base(self):
+        """Slug baseado no usuário ou sessão."""
+        return f"carrinho-{self.usuario.username if self.usuario else self.sessao_id or 'anonimo'}"
 
-        super().save(*args, **kwargs)
+    def renovar_reserva(self):
+        """Adia o vencimento da reserva. Chame no início de toda transação que mexe nos itens (incluir,
+        alterar, remover, cancelar, fechar o pedido): o UPDATE trava a linha do carrinho, a varredura
+        pula carrinhos travados e, se ela chegou antes, a transação espera e encontra os itens já
+        devolvidos ao estoque, sem devolvê-los de novo."""
+        self.reserva_expira = vencimento_reserva()
+        Carrinho.objects.filter(pk=self.pk).update(reserva_expira=self.reserva_expira)
+
+    def adicionar_item(self, produto, quantidade, empresa_id=None, produto_slug=None):
+        """Adiciona ou atualiza um item no carrinho, reservando o estoque. Retorna (item, criado)."""
+        with transaction.atomic():
+            self.renovar_reserva()
+            estoque_service.reservar(produto.id, quantidade)
+            item, created = self.itens.get_or_create(
+                produto=produto,
+                empresa_id=empresa_id,
+                defaults={
+                    'quantidade': quantidade,
+                    'preco_unitario': produto.venda or produto.custo,
+                    'slug': slugify(f"item-{produto.nome}-{get_random_string(5)}"),
+                    'produto_slug': produto_slug or produto.slug,  # Preservar o slug do produto
+                }
+            )
 
-    def adicionar_item(self, produto, quantidade, empresa_id=None):
-        """Adiciona ou atualiza um item no carrinho."""
-        item, created = self.itens.get_or_create(
-            produto=produto,
-            empresa_id=empresa_id,
-            defaults={
-                'quantidade': quantidade,
-                'preco_unitario': produto.venda or produto.custo,
-                'slug': slugify(f"item-{produto.nome}-{get_random_string(5)}"),
-                'produto_slug': produto_slug or produto.slug,  # Preservar o slug do produto
+            if not created:
+                self.itens.filter(pk=item.pk).update(quantidade=models.F('quantidade') + quantidade)
+                registro.registrar_ids(ItemCarrinho, [item.pk], registro.ALTERADO)
+        return item, created
+
+    def aplicar_operacoes(self, operacoes):
+        """Aplica, na ordem, uma lista de (operação, produto_id, quantidade), tudo ou nada.
+
+        As operações são resolvidas em memória até a quantidade final de cada produto;
+        o estoque é ajustado uma vez por produto (reservar_lote/liberar_lote) e as linhas
+        são gravadas com um bulk_create, um bulk_update e um DELETE.
+        Levanta ItemCarrinho.DoesNotExist (definir/remover de produto fora do carrinho),
+        Produto.DoesNotExist ou EstoqueInsuficiente.
+        Retorna (itens criados ou alterados, ids dos itens removidos).
+        """
+        with transaction.atomic():
+            self.renovar_reserva()
+            existentes = {}
+            for item in self.itens.select_for_update().select_related('produto').order_by('id'):
+                existentes.setdefault(item.produto_id, item)
+
+            finais = {produto_id: item.quantidade for produto_id, item in existentes.items()}
+            for operacao, produto_id, quantidade in operacoes:
+                if operacao == self.ADICIONAR:
+                    finais[produto_id] = finais.get(produto_id, 0) + quantidade
+                elif produto_id not in finais:
+                    raise ItemCarrinho.DoesNotExist(f'Produto {produto_id} não está no carrinho')
+                else:
+                    finais[produto_id] = quantidade if operacao == self.DEFINIR else 0
+
+            deltas = {
+                produto_id: quantidade - (existentes[produto_id].quantidade if produto_id in existentes else 0)
+                for produto_id, quantidade in finais.items()
             }
-        )
-        
-        if not created: 
-            item.quantidade += quantidade
-            item.save()
+            reservas = {produto_id: delta for produto_id, delta in deltas.items() if delta > 0}
+            produtos = estoque_service.reservar_lote(reservas)
+            faltando = sorted(set(reservas) - set(produtos))
+            if faltando:
+                raise Produto.DoesNotExist(f'Produto(s) não encontrado(s): {faltando}')
+            estoque_service.liberar_lote({produto_id: -delta for produto_id, delta in deltas.items() if delta < 0})
+
+            novos = [
+                ItemCarrinho(carrinho=self, produto=produtos[produto_id], quantidade=finais[produto_id],
+                             preco_unitario=produtos[produto_id].venda or produtos[produto_id].custo,
+                             produto_slug=produtos[produto_id].slug)
+                for produto_id, delta in deltas.items() if produto_id not in existentes and finais[produto_id] > 0
+            ]
+            alterados = []
+            removidos = []
+            for produto_id, item in existentes.items():
+                if finais[produto_id] == 0:
+                    removidos.append(item)
+                elif deltas[produto_id]:
+                    item.quantidade = finais[produto_id]
+                    alterados.append(item)
+
+            slugs.criar_em_lote(ItemCarrinho, novos, ItemCarrinho.get_slug_base)
+            ItemCarrinho.objects.bulk_update(alterados, ['quantidade'])
+            registro.registrar(novos, registro.CRIADO)
+            registro.registrar(alterados, registro.ALTERADO)
+            registro.registrar(removidos, registro.REMOVIDO)
+            with registro.em_lote():
+                ItemCarrinho.objects.filter(pk__in=[item.pk for item in removidos]).delete()
+        return alterados + novos, [item.pk for item in removidos]
+
+    def total_no_banco(self):
+        """Total do carrinho numa consulta agregada (calcular_total percorre os itens em Python)."""
+        total = self.itens.aggregate(total=models.Sum(
+            models.F('quantidade') * models.F('preco_unitario'),
+            output_field=models.DecimalField(max_digits=12, decimal_places=2),
+        ))['total']
+        return total or Decimal('0.00')
 
     def remover_item(self, produto):
-        """Remove um item específico do carrinho."""
-        item = self.itens.filter(produto=produto).first()
-        if item:
-            item.delete()
+        """Remove um item específico do carrinho e devolve o estoque."""
+        with transaction.atomic():
+            self.renovar_reserva()
+            item = self.itens.select_for_update().filter(produto=produto).first()
+            if item:
+                item.delete()
+                estoque_service.liberar(item.produto_id, item.quantidade)
 
     def cancelar_pedido(self):
-        """Cancela o carrinho, removendo todos os itens."""
-        self.itens.all().delete()
+        """Cancela o carrinho, removendo todos os itens e restaurando o estoque (um UPDATE por produto)."""
+        with transaction.atomic():
+            self.renovar_reserva()
+            quantidades = {}
+            itens = list(self.itens.select_for_update())
+            for item in itens:
+                quantidades[item.produto_id] = quantidades.get(item.produto_id, 0) + item.quantidade
+            for produto_id, quantidade in quantidades.items():
+                estoque_service.liberar(produto_id, quantidade)
+            with registro.em_lote():
+                self.itens.all().delete()
+            registro.registrar(itens, registro.REMOVIDO)
+        return quantidades
 
     def calcular_total(self):
         """Calcula o total do carrinho baseado nos itens."""
@@ -62,7 +178,7 @@ class Carrinho(models.Model):
             total += item.subtotal()
         return total
 
-class ItemCarrinho(models.Model):
+class ItemCarrinho(SlugUnicoMixin, models.Model):
     carrinho = models.ForeignKey(Carrinho, related_name='itens', on_delete=models.CASCADE)
     produto = models.ForeignKey(Produto, on_delete=models.CASCADE)
     quantidade = models.PositiveIntegerField(default=1)
@@ -72,17 +188,14 @@ class ItemCarrinho(models.Model):
     produto_slug = models.SlugField(max_length=100, blank=True, null=True)  # Novo campo para o slug do produto
 
     def save(self, *args, **kwargs):
-        """Gera slug e define preço unitário se não estiver preenchido."""
+        """Define preço unitário se não estiver preenchido (o slug vem do SlugUnicoMixin)."""
         if not self.preco_unitario:
             self.preco_unitario = self.produto.venda or self.produto.custo
-        if not self.slug:
-            slug_base = slugify(f"item-{self.produto.nome}-{self.carrinho.slug}")
-            slug = slug_base
-            if ItemCarrinho.objects.filter(slug=slug).exists():
-                slug = f"{slug_base}-{get_random_string(5)}"
-            self.slug = slug
         super().save(*args, **kwargs)
 
+    def get_slug_base(self):
+        return f"item-{self.produto.nome}-{self.carrinho.slug}"
+
     def subtotal(self):
         """Calcula o subtotal do item."""
         return self.quantidade * self.preco_unitario
@@ -0,0 +1,14 @@
+# backend/loja/carrinho/queries.py
+from django.db.models import Prefetch
+from .models import Carrinho, ItemCarrinho
+
+
+def itens_carrinho():
+    """Itens com o produto já carregado (ItemCarrinhoSerializer lê produto.nome)."""
+    return ItemCarrinho.objects.select_related('produto')
+
+
+def carrinhos(queryset=None):
+    """Carrinhos prontos para o CarrinhoSerializer: 2 queries, qualquer que seja o número de itens."""
+    queryset = Carrinho.objects.all() if queryset is None else queryset
+    return queryset.prefetch_related(Prefetch('itens', queryset=itens_carrinho()))
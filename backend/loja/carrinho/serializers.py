@@ -17,5 +17,25 @@ class CarrinhoSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Carrinho
-        fields = ['id', 'usuario', 'sessao_id', 'criado_em', 'atualizado_em', 'itens', 'slug']
+        fields = ['id', 'usuario', 'sessao_id', 'criado_em', 'atualizado_em', 'reserva_expira', 'itens', 'slug']
+        read_only_fields = ['reserva_expira']
 
+
+
+class OperacaoCarrinhoSerializer(serializers.Serializer):
+    """Uma linha de POST /carrinhos/<slug>/batch/."""
+    op = serializers.ChoiceField(choices=Carrinho.OPERACOES)
+    produto_id = serializers.IntegerField()
+    quantidade = serializers.IntegerField(min_value=0, default=1)
+
+    def validate(self, data):
+        if data['op'] == Carrinho.ADICIONAR and data['quantidade'] < 1:
+            raise serializers.ValidationError({'quantidade': 'Quantidade deve ser maior que zero'})
+        return data
+
+
+class LoteCarrinhoSerializer(serializers.Serializer):
+    """Resposta do batch: só as linhas que mudaram, os ids removidos e o novo total."""
+    itens = ItemCarrinhoSerializer(many=True)
+    removidos = serializers.ListField(child=serializers.IntegerField())
+    total = serializers.DecimalField(max_digits=12, decimal_places=2)
@@ -0,0 +1,63 @@
+# backend/loja/carrinho/services.py
+"""Varredura dos carrinhos abandonados.
+
+Adicionar ao carrinho já baixa ``Produto.estoque``; carrinhos que ninguém fecha
+(sobretudo os anônimos, por ``sessao_id``) prenderiam esse estoque para sempre.
+Cada carrinho tem um vencimento (``reserva_expira``), renovado a cada alteração
+dos itens, e ``liberar_expirados`` devolve o estoque dos vencidos e os apaga.
+"""
+from collections import defaultdict
+
+from django.db import transaction
+from django.utils import timezone
+
+from alteracoes import registro
+from estoque import services as estoque_service
+from .models import Carrinho, ItemCarrinho
+
+TAMANHO_LOTE = 500
+
+
+def liberar_expirados(agora=None, lote=TAMANHO_LOTE):
+    """Devolve o estoque reservado nos carrinhos vencidos e apaga esses carrinhos, ``lote`` por vez.
+
+    Cada lote é uma transação curta: os ids dos carrinhos vencidos (os travados por
+    uma alteração em curso ficam para a próxima rodada; ver Carrinho.renovar_reserva),
+    os itens travados e somados por produto, um UPDATE para os saldos e DELETEs por id. Carrinhos
+    que viraram pedido não são apagados (o pedido guarda a referência); só perdem a reserva.
+    Retorna (carrinhos, itens) liberados.
+    """
+    agora = agora or timezone.now()
+    total_carrinhos = total_itens = 0
+    while True:
+        with transaction.atomic():
+            ids = list(
+                Carrinho.objects.select_for_update(skip_locked=True)
+                .filter(reserva_expira__lt=agora).order_by('reserva_expira')
+                .values_list('id', flat=True)[:lote]
+            )
+            if not ids:
+                break
+
+            # Itens travados antes de somar: o que for devolvido é exatamente o que será apagado
+            itens = list(
+                ItemCarrinho.objects.select_for_update().filter(carrinho_id__in=ids)
+                .values_list('id', 'produto_id', 'quantidade')
+            )
+            quantidades = defaultdict(int)
+            for _, produto_id, quantidade in itens:
+                quantidades[produto_id] += quantidade
+            estoque_service.liberar_lote(quantidades)
+            apagar = list(Carrinho.objects.filter(id__in=ids, pedido__isnull=True).values_list('id', flat=True))
+            item_ids = [item_id for item_id, _, _ in itens]
+            # O log de alterações lê o estado das linhas, então vem antes dos DELETEs
+            registro.registrar_ids(ItemCarrinho, item_ids, registro.REMOVIDO)
+            registro.registrar_ids(Carrinho, apagar, registro.REMOVIDO)
+            with registro.em_lote():
+                ItemCarrinho.objects.filter(id__in=item_ids).delete()
+                Carrinho.objects.filter(id__in=apagar).delete()
+            Carrinho.objects.filter(id__in=ids).exclude(id__in=apagar).update(reserva_expira=None)
+
+        total_carrinhos += len(ids)
+        total_itens += len(item_ids)
+    return total_carrinhos, total_itens
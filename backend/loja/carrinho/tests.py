@@ -1,3 +1,160 @@
+from datetime import timedelta
+
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from django.utils.crypto import get_random_string
+
+from estoque.models import Estoque
+
+from loja.testing import QueryCountMixin, cliente_autenticado, criar_empresa, criar_produto
+from pedido.models import Pedido
+from pedido.services import criar_pedido_do_carrinho
+from . import services
+from .models import Carrinho, ItemCarrinho
+
+
+class CarrinhoQueryCountTests(QueryCountMixin, TestCase):
+    def setUp(self):
+        self.empresa = criar_empresa()
+        self.client = cliente_autenticado()
+        self.carrinho = Carrinho.objects.create(sessao_id='sessao-teste')
+
+    def criar_itens(self, quantidade):
+        for _ in range(quantidade):
+            produto = criar_produto(empresa=self.empresa)
+            ItemCarrinho.objects.create(carrinho=self.carrinho, produto=produto, quantidade=1)
+
+    def test_detalhe_do_carrinho(self):
+        # carrinho + itens (com produto)
+        self.assertNumQueriesFixo(2, self.client, f'/api/carrinhos/{self.carrinho.slug}/', self.criar_itens)
+
+
+class AdicionarItemCarrinhoTests(TestCase):
+    def test_view_soma_no_mesmo_item_e_reserva_o_estoque(self):
+        produto = criar_produto(estoque=10)
+        carrinho = Carrinho.objects.create(sessao_id='sessao-teste', reserva_expira=None)
+        client = cliente_autenticado()
+        url = f'/api/carrinhos/{carrinho.slug}/adicionar-item/'
+        self.assertEqual(client.post(url, {'produto_id': produto.id, 'quantidade': 2}, format='json').status_code, 201)
+        self.assertEqual(client.post(url, {'produto_id': produto.id, 'quantidade': 3}, format='json').status_code, 201)
+        self.assertEqual(list(carrinho.itens.values_list('quantidade', flat=True)), [5])
+        produto.refresh_from_db()
+        carrinho.refresh_from_db()
+        self.assertEqual(produto.estoque, 5)
+        self.assertIsNotNone(carrinho.reserva_expira)
+        excesso = client.post(url, {'produto_id': produto.id, 'quantidade': 6}, format='json')
+        self.assertEqual(excesso.status_code, 400)
+
+
+class LiberarCarrinhosTests(TestCase):
+    def setUp(self):
+        self.empresa = criar_empresa()
+        self.produto = criar_produto(empresa=self.empresa, estoque=10)
+
+    def carrinho_com_item(self, quantidade, vencido=True):
+        carrinho = Carrinho.objects.create(sessao_id=get_random_string(8))
+        carrinho.adicionar_item(self.produto, quantidade)
+        if vencido:
+            Carrinho.objects.filter(pk=carrinho.pk).update(reserva_expira=timezone.now() - timedelta(minutes=1))
+        return carrinho
+
+    def test_devolve_estoque_e_apaga_vencidos_em_lotes(self):
+        for _ in range(3):
+            self.carrinho_com_item(2)
+        ativo = self.carrinho_com_item(1, vencido=False)
+        self.produto.refresh_from_db()
+        self.assertEqual(self.produto.estoque, 3)
+
+        self.assertEqual(services.liberar_expirados(lote=2), (3, 3))
+
+        self.produto.refresh_from_db()
+        self.assertEqual(self.produto.estoque, 9)
+        # uma movimentação de estorno por produto em cada lote
+        estornos = Estoque.objects.filter(produto=self.produto, tipo=Estoque.ESTORNO)
+        self.assertEqual(sorted(estornos.values_list('quantidade', flat=True)), [2, 4])
+        self.assertEqual(list(Carrinho.objects.values_list('id', flat=True)), [ativo.id])
+        self.assertEqual(ItemCarrinho.objects.count(), 1)
+
+    def test_carrinho_de_pedido_so_perde_a_reserva(self):
+        carrinho = Carrinho.objects.create(sessao_id='sessao-pedido', reserva_expira=timezone.now() - timedelta(minutes=1))
+        Pedido.objects.create(empresa=self.empresa, total=0, carrinho=carrinho)
+        self.assertEqual(services.liberar_expirados(), (1, 0))
+        carrinho.refresh_from_db()
+        self.assertIsNone(carrinho.reserva_expira)
+        self.assertEqual(services.liberar_expirados(), (0, 0))
+
+    def test_quem_mexe_nos_itens_trava_o_carrinho_antes_da_varredura(self):
+        # Checkout, remoção e cancelamento renovam a reserva no início da transação: a varredura
+        # que vier depois não encontra o carrinho vencido e não devolve de novo o mesmo estoque
+        vendido = self.carrinho_com_item(2)
+        criar_pedido_do_carrinho(vendido, self.empresa)
+        removido = self.carrinho_com_item(3)
+        removido.remover_item(self.produto)
+        cancelado = self.carrinho_com_item(1)
+        cancelado.cancelar_pedido()
+        agora = timezone.now()
+        for carrinho in (vendido, removido, cancelado):
+            carrinho.refresh_from_db()
+            self.assertGreater(carrinho.reserva_expira, agora)
+
+        self.assertEqual(services.liberar_expirados(), (0, 0))
+        self.produto.refresh_from_db()
+        self.assertEqual(self.produto.estoque, 8)  # só o que virou pedido saiu
+        self.assertEqual(Estoque.objects.filter(produto=self.produto, tipo=Estoque.ESTORNO).count(), 2)
+
+
+class LoteCarrinhoTests(TestCase):
+    def setUp(self):
+        self.empresa = criar_empresa()
+        self.client = cliente_autenticado()
+        self.carrinho = Carrinho.objects.create(sessao_id='sessao-lote')
+        self.chopp = criar_produto(empresa=self.empresa)
+        self.pizza = criar_produto(empresa=self.empresa, categoria='PIZZA', nome='Pizza', venda=40, estoque=5)
+        self.url = f'/api/carrinhos/{self.carrinho.slug}/batch/'
+
+    def test_operacoes_em_ordem_com_delta(self):
+        self.carrinho.adicionar_item(self.pizza, 2)
+        resposta = self.client.post(self.url, {'operacoes': [
+            {'op': 'adicionar', 'produto_id': self.chopp.id, 'quantidade': 1},
+            {'op': 'adicionar', 'produto_id': self.chopp.id, 'quantidade': 1},
+            {'op': 'definir', 'produto_id': self.chopp.id, 'quantidade': 4},
+            {'op': 'remover', 'produto_id': self.pizza.id},
+        ]}, format='json')
+        self.assertEqual(resposta.status_code, 200)
+        dados = resposta.json()
+        self.assertEqual([(item['produto'], item['quantidade']) for item in dados['itens']], [(self.chopp.id, 4)])
+        self.assertEqual(len(dados['removidos']), 1)
+        self.assertEqual(dados['total'], '48.00')
+
+        self.chopp.refresh_from_db()
+        self.pizza.refresh_from_db()
+        self.assertEqual((self.chopp.estoque, self.pizza.estoque), (96, 5))
+        # um ajuste por produto, não um por operação
+        self.assertEqual(list(Estoque.objects.filter(produto=self.chopp, tipo=Estoque.RESERVA).values_list('quantidade', flat=True)), [4])
+
+    def test_tudo_ou_nada(self):
+        resposta = self.client.post(self.url, [
+            {'op': 'adicionar', 'produto_id': self.chopp.id, 'quantidade': 2},
+            {'op': 'adicionar', 'produto_id': self.pizza.id, 'quantidade': 6},
+        ], format='json')
+        self.assertEqual(resposta.status_code, 400)
+        self.assertEqual(resposta.json()['produto_id'], self.pizza.id)
+        self.assertFalse(self.carrinho.itens.exists())
+        self.chopp.refresh_from_db()
+        self.assertEqual(self.chopp.estoque, 100)
+
+        resposta = self.client.post(self.url, [{'op': 'definir', 'produto_id': self.chopp.id, 'quantidade': 1}], format='json')
+        self.assertEqual(resposta.status_code, 404)
+
+    def test_consultas_nao_crescem_com_as_operacoes(self):
+        def contar(operacoes):
+            with CaptureQueriesContext(connection) as consultas:
+                self.assertEqual(self.client.post(self.url, operacoes, format='json').status_code, 200)
+            return len(consultas)
 
-# Create your tests here.
+        self.carrinho.adicionar_item(self.chopp, 1)
+        uma = contar([{'op': 'adicionar', 'produto_id': self.chopp.id, 'quantidade': 1}])
+        dez = contar([{'op': 'adicionar', 'produto_id': self.chopp.id, 'quantidade': 1}] * 10)
+        self.assertEqual(uma, dez)
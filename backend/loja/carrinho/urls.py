@@ -12,6 +12,7 @@ urlpatterns = [
     path("carrinhos/<slug:slug>/remover-item/", views.remover_item_carrinho, name="remover-item-carrinho"),
     path("carrinhos/<slug:slug>/cancelar-pedido/", views.cancelar_pedido, name="cancelar-pedido"),
     path("carrinhos/<slug:slug>/atualizar-item/", views.atualizar_item_carrinho, name="atualizar-item-carrinho"),
+    path("carrinhos/<slug:slug>/batch/", views.lote_carrinho, name="lote-carrinho"),
 ]
 
 '''
@@ -4,7 +4,14 @@ from rest_framework.decorators import api_view
 from rest_framework.permissions import IsAuthenticated, AllowAny
 from rest_framework import status
 from .models import Carrinho, ItemCarrinho, Produto
-from .serializers import CarrinhoSerializer, ItemCarrinhoSerializer
+from .serializers import CarrinhoSerializer, ItemCarrinhoSerializer, LoteCarrinhoSerializer, OperacaoCarrinhoSerializer
+from . import queries
+from alteracoes import registro
+from idempotencia.decorators import idempotente
+from loja.pagination import paginar
+from estoque import services as estoque_service
+from estoque.services import EstoqueInsuficiente
+from django.db import transaction
 from django.db.models import Q
 from django.utils.text import slugify
 import uuid
@@ -13,7 +20,7 @@ import uuid
 def search_carrinhos(request):
     """Busca carrinhos por slug, sessão ou nome de usuário."""
     query = request.query_params.get("search", "")
-    carrinhos = Carrinho.objects.filter(
+    carrinhos = queries.carrinhos().filter(
         Q(slug__icontains=query) | Q(sessao_id__icontains=query) | Q(usuario__username__icontains=query)
     )
     serializer = CarrinhoSerializer(carrinhos, many=True)
@@ -26,9 +33,8 @@ def carrinhos(request):
     sessao_id = request.session.session_key if not usuario else None
 
     if request.method == 'GET':
-        carrinhos = Carrinho.objects.filter(usuario=usuario, sessao_id=sessao_id)
-        serializer = CarrinhoSerializer(carrinhos, many=True)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        carrinhos = queries.carrinhos().filter(usuario=usuario, sessao_id=sessao_id)
+        return paginar(request, carrinhos, CarrinhoSerializer, ordering=('-criado_em', '-id'))
     
     elif request.method == 'POST':
         # Cria um novo carrinho com slug único
@@ -46,7 +52,7 @@ def carrinhos(request):
 def carrinho_detail(request, slug):
     """Detalha, atualiza ou deleta um carrinho específico por slug."""
     try:
-        carrinho = Carrinho.objects.get(slug=slug)
+        carrinho = queries.carrinhos().get(slug=slug)
     except Carrinho.DoesNotExist:
         return Response({"error": "Carrinho não encontrado"}, status=status.HTTP_404_NOT_FOUND)
 
@@ -66,6 +72,7 @@ def carrinho_detail(request, slug):
         return Response(status=status.HTTP_204_NO_CONTENT)
 
 @api_view(['POST'])
+@idempotente
 def adicionar_item_carrinho(request, slug):
     """Adiciona um item ao carrinho e atualiza o estoque."""
     print(f'🚀 Tentando adicionar item ao carrinho com slug: {slug}')
@@ -103,38 +110,57 @@ def adicionar_item_carrinho(request, slug):
         print(f'❌ Produto com ID {produto_id} não encontrado!')
         return Response({"error": "Produto não encontrado"}, status=status.HTTP_404_NOT_FOUND)
 
-    if produto.estoque < quantidade:
-        print(f'❌ Estoque insuficiente para {produto.nome}: {produto.estoque} disponíveis')
+    try:
+        # Reserva o estoque, renova a reserva do carrinho e grava o item numa transação só
+        item, created = carrinho.adicionar_item(produto, quantidade, empresa_id=empresa_id, produto_slug=produto_slug)
+    except EstoqueInsuficiente:
+        print(f'❌ Estoque insuficiente para {produto.nome}')
         return Response({"error": "Estoque insuficiente"}, status=status.HTTP_400_BAD_REQUEST)
 
-    """Adiciona ou atualiza um item no carrinho."""
-    item, created = ItemCarrinho.objects.get_or_create(
-        carrinho=carrinho,
-        produto=produto,
-        empresa_id=empresa_id,
-        defaults={
-            'quantidade': quantidade,
-            'preco_unitario': produto.venda or produto.custo,
-            'slug': slugify(f"item-{produto.nome}-{uuid.uuid4().hex[:8]}"),  # Gera slug único para o ItemCarrinho
-            'produto_slug': produto_slug or produto.slug,  # Preservar o slug do produto
-        }
-    )
-
-    # Atualiza a quantidade se o item já existir
-    if not created:
-        item.quantidade += quantidade
-        item.save()
-        print(f'✅ Quantidade do item {produto.nome} atualizada: {item.quantidade}')
-    else:
+    if created:
         print(f'✅ Novo item {produto.nome} adicionado ao carrinho com slug: {item.slug}')
+    else:
+        print(f'✅ Quantidade do item {produto.nome} atualizada')
 
-    produto.estoque -= quantidade
-    produto.save()
-    print(f'✅ Estoque atualizado: {produto.estoque}')
-
-    serializer = CarrinhoSerializer(carrinho)
+    serializer = CarrinhoSerializer(queries.carrinhos().get(pk=carrinho.pk))
     return Response(serializer.data, status=status.HTTP_201_CREATED)
 
+@api_view(['POST'])
+@idempotente
+def lote_carrinho(request, slug):
+    """Várias alterações de itens numa requisição (ex.: os cliques do +/- acumulados pelo front).
+
+    Aceita [{op, produto_id, quantidade}, ...] ou {"operacoes": [...]}, com op em
+    adicionar/definir/remover, aplicadas em ordem e tudo ou nada. Responde só com as
+    linhas criadas/alteradas, os ids removidos e o novo total, não com o carrinho inteiro.
+    """
+    print(f'🚀 Recebendo lote de operações para o carrinho com slug: {slug}')
+    try:
+        carrinho = Carrinho.objects.get(slug=slug)
+    except Carrinho.DoesNotExist:
+        return Response({"error": "Carrinho não encontrado"}, status=status.HTTP_404_NOT_FOUND)
+
+    operacoes = request.data.get('operacoes') if isinstance(request.data, dict) else request.data
+    if not isinstance(operacoes, list) or not operacoes:
+        return Response({"error": "Envie uma lista de operações"}, status=status.HTTP_400_BAD_REQUEST)
+    serializer = OperacaoCarrinhoSerializer(data=operacoes, many=True)
+    if not serializer.is_valid():
+        return Response({"error": "Operações inválidas", "erros": serializer.errors}, status=status.HTTP_400_BAD_REQUEST)
+
+    try:
+        itens, removidos = carrinho.aplicar_operacoes(
+            [(linha['op'], linha['produto_id'], linha['quantidade']) for linha in serializer.validated_data]
+        )
+    except (ItemCarrinho.DoesNotExist, Produto.DoesNotExist) as e:
+        return Response({"error": str(e)}, status=status.HTTP_404_NOT_FOUND)
+    except EstoqueInsuficiente as e:
+        print(f'❌ {e}')
+        return Response({"error": "Estoque insuficiente", "produto_id": e.produto_id}, status=status.HTTP_400_BAD_REQUEST)
+    print(f'✅ {len(operacoes)} operações aplicadas ao carrinho {carrinho.slug}')
+
+    resposta = LoteCarrinhoSerializer({'itens': itens, 'removidos': removidos, 'total': carrinho.total_no_banco()})
+    return Response(resposta.data, status=status.HTTP_200_OK)
+
 @api_view(['PUT'])
 def atualizar_item_carrinho(request, slug):
     try:
@@ -146,19 +172,23 @@ def atualizar_item_carrinho(request, slug):
     quantidade = int(request.data.get('quantidade', 1))
 
     try:
-        item = ItemCarrinho.objects.get(slug=item_slug, carrinho=carrinho)
-        if quantidade <= 0:
-            item.delete()
-        else:
-            diferenca = quantidade - item.quantidade
-            item.quantidade = quantidade
-            item.produto.estoque -= diferenca
-            item.produto.save()
-            item.save()
-        serializer = CarrinhoSerializer(carrinho)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        with transaction.atomic():
+            carrinho.renovar_reserva()
+            item = ItemCarrinho.objects.select_for_update().get(slug=item_slug, carrinho=carrinho)
+            if quantidade <= 0:
+                estoque_service.liberar(item.produto_id, item.quantidade)
+                item.delete()
+            else:
+                estoque_service.ajustar(item.produto_id, quantidade - item.quantidade)
+                ItemCarrinho.objects.filter(pk=item.pk).update(quantidade=quantidade)
+                registro.registrar_ids(ItemCarrinho, [item.pk], registro.ALTERADO)
     except ItemCarrinho.DoesNotExist:
         return Response({"error": "Item não encontrado"}, status=status.HTTP_404_NOT_FOUND)
+    except EstoqueInsuficiente:
+        return Response({"error": "Estoque insuficiente"}, status=status.HTTP_400_BAD_REQUEST)
+
+    serializer = CarrinhoSerializer(queries.carrinhos().get(pk=carrinho.pk))
+    return Response(serializer.data, status=status.HTTP_200_OK)
 
 @api_view(['POST'])
 def remover_item_carrinho(request, slug):
@@ -177,21 +207,21 @@ def remover_item_carrinho(request, slug):
         return Response({"error": "item_slug é obrigatório"}, status=status.HTTP_400_BAD_REQUEST)
 
     try:
-        # Busca o item pelo produto_slug em vez do slug do ItemCarrinho
-        item = ItemCarrinho.objects.get(produto_slug=produto_slug, carrinho=carrinho)
-        produto = item.produto
-        print(f'✅ Item encontrado: {produto.nome}, quantidade: {item.quantidade}, produto_slug: {item.produto_slug}')
+        with transaction.atomic():
+            carrinho.renovar_reserva()  # trava o carrinho contra a varredura de vencidos
+            # Busca o item pelo produto_slug em vez do slug do ItemCarrinho
+            item = ItemCarrinho.objects.select_for_update().select_related('produto').get(produto_slug=produto_slug, carrinho=carrinho)
+            produto = item.produto
+            print(f'✅ Item encontrado: {produto.nome}, quantidade: {item.quantidade}, produto_slug: {item.produto_slug}')
+            item.delete()
+            saldo = estoque_service.liberar(produto.id, item.quantidade)
     except ItemCarrinho.DoesNotExist:
         print(f'❌ Item com produto_slug {produto_slug} não encontrado no carrinho {carrinho.slug}!')
         return Response({"error": "Item não encontrado"}, status=status.HTTP_404_NOT_FOUND)
 
-    quantidade = item.quantidade
-    item.delete()
-    produto.estoque += quantidade
-    produto.save()
-    print(f'✅ Item removido do carrinho {carrinho.slug}, estoque atualizado: {produto.estoque}')
+    print(f'✅ Item removido do carrinho {carrinho.slug}, estoque atualizado: {saldo}')
 
-    serializer = CarrinhoSerializer(carrinho)
+    serializer = CarrinhoSerializer(queries.carrinhos().get(pk=carrinho.pk))
     return Response(serializer.data, status=status.HTTP_200_OK)
     
 @api_view(['POST'])
@@ -205,13 +235,10 @@ def cancelar_pedido(request, slug):
         print(f'❌ Carrinho com slug {slug} não encontrado!')
         return Response({"error": "Carrinho não encontrado"}, status=status.HTTP_404_NOT_FOUND)
 
-    # Remove todos os itens e restaura o estoque
-    for item in carrinho.itens.all():
-        produto = item.produto
-        produto.estoque += item.quantidade
-        produto.save()
-        print(f'✅ Estoque restaurado para {produto.nome}: {produto.estoque}')
-    carrinho.itens.all().delete()
+    # Remove todos os itens e restaura o estoque (um UPDATE por produto)
+    quantidades = carrinho.cancelar_pedido()
+    for produto_id, quantidade in quantidades.items():
+        print(f'✅ Estoque restaurado para o produto {produto_id}: +{quantidade}')
     print(f'✅ Todos os itens do carrinho {carrinho.slug} removidos')
 
     return Response({"message": "Carrinho cancelado com sucesso"}, status=status.HTTP_200_OK)
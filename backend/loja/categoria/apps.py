@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class CategoriaConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'categoria'
+
+    def ready(self):
+        from . import signals  # noqa: F401  (invalida a lista de categorias em cache)
@@ -0,0 +1,17 @@
+# Generated by Django 5.1.7 on 2026-10-18 15:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('categoria', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='categoria',
+            index=models.Index(fields=['created', 'id'], name='categoria_created_id_idx'),
+        ),
+    ]
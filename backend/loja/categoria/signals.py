@@ -0,0 +1,14 @@
+# backend/loja/categoria/signals.py
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from loja import cache
+from .models import Categoria
+
+
+@receiver(post_save, sender=Categoria)
+@receiver(post_delete, sender=Categoria)
+def invalidar_cache_categorias(sender, instance, raw=False, **kwargs):
+    """A lista de categorias em cache (loja.cache) é descartada a cada alteração."""
+    if raw:
+        return
+    cache.invalidar('categorias')
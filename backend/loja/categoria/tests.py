@@ -1,3 +1,73 @@
+import base64
+import json
+
+from django.core.cache import caches
 from django.test import TestCase
+from django.utils import timezone
+
+from loja.pagination import KeysetPagination
+from loja.testing import cliente_autenticado
+from .models import Categoria
+
+
+class CacheRespostasTests(TestCase):
+    def setUp(self):
+        caches['respostas'].clear()
+        self.client = cliente_autenticado()
+
+    def test_lista_servida_do_cache_ate_mudar_uma_categoria(self):
+        Categoria.objects.create(nome='CERVEJA')
+        primeira = self.client.get('/api/categorias/')
+        self.assertEqual(primeira['X-Cache'], 'MISS')
+        with self.assertNumQueries(0):
+            segunda = self.client.get('/api/categorias/')
+        self.assertEqual(segunda['X-Cache'], 'HIT')
+        self.assertEqual(segunda.json(), primeira.json())
+
+        # cada query string é uma entrada, e a lista inteira cai quando uma categoria muda
+        self.assertEqual(self.client.get('/api/categorias/?limit=1')['X-Cache'], 'MISS')
+        Categoria.objects.create(nome='PIZZA')
+        resposta = self.client.get('/api/categorias/')
+        self.assertEqual(resposta['X-Cache'], 'MISS')
+        self.assertEqual(sorted(c['nome'] for c in resposta.json()), ['CERVEJA', 'PIZZA'])
+
+    def test_escrita_nao_passa_pelo_cache(self):
+        self.client.get('/api/categorias/')
+        self.assertEqual(self.client.post('/api/categorias/', {'nome': 'BEBIDA'}).status_code, 201)
+        self.assertEqual([c['nome'] for c in self.client.get('/api/categorias/').json()], ['BEBIDA'])
+
+
+class PaginacaoCursorTests(TestCase):
+    def setUp(self):
+        caches['respostas'].clear()
+        self.client = cliente_autenticado()
+        # Todas com o mesmo created: o desempate fica por conta do id
+        momento = timezone.now()
+        for nome in ('CERVEJA', 'PIZZA', 'LANCHE', 'SUCO', 'BALDE'):
+            Categoria.objects.create(nome=nome)
+        Categoria.objects.update(created=momento)
+
+    def cursor(self, valores):
+        return base64.urlsafe_b64encode(json.dumps(valores).encode()).decode().rstrip('=')
+
+    def test_codifica_e_decodifica_o_cursor(self):
+        paginacao = KeysetPagination()
+        categoria = Categoria.objects.first()
+        cursor = paginacao.encode_cursor([categoria.created, categoria.id])
+        self.assertEqual(paginacao.decode_cursor(cursor, Categoria), [categoria.created, categoria.id])
+
+    def test_percorre_empates_de_created_ate_a_ultima_pagina(self):
+        vistos = []
+        url = '/api/categorias/?limit=2'
+        while url:
+            pagina = self.client.get(url).json()
+            vistos += [categoria['id'] for categoria in pagina['results']]
+            url = pagina['next']
+        self.assertEqual(vistos, sorted(Categoria.objects.values_list('id', flat=True), reverse=True))
+        self.assertIsNone(self.client.get('/api/categorias/?limit=5').json()['next'])
 
-# Create your tests here.
+    def test_cursor_invalido_responde_404(self):
+        for cursor in ('%%%', 'bmFvLWUtanNvbg', self.cursor([1]), self.cursor(['nao-e-data', 'x']),
+                       self.cursor([None, 1])):
+            resposta = self.client.get(f'/api/categorias/?cursor={cursor}')
+            self.assertEqual(resposta.status_code, 404, cursor)
@@ -4,6 +4,8 @@ from rest_framework.decorators import api_view
 from rest_framework import status
 from .models import Categoria
 from .serializers import CategoriaSerializer
+from loja import cache
+from loja.pagination import paginar
 from django.db.models import Q
 
 @api_view(['GET'])
@@ -16,11 +18,11 @@ def search_categorias(request):
     return Response(serializer.data, status=status.HTTP_200_OK)
 
 @api_view(['GET', 'POST'])
+@cache.em_cache('categorias')
 def categorias(request):
     if request.method == 'GET':
         categorias = Categoria.objects.all()
-        serializer = CategoriaSerializer(categorias, many=True)
-        return Response(serializer.data)
+        return paginar(request, categorias, CategoriaSerializer)
     
     elif request.method == 'POST':
         serializer = CategoriaSerializer(data=request.data)
@@ -0,0 +1,10 @@
+from django.contrib import admin
+from .models import TicketCozinha
+
+class TicketCozinhaAdmin(admin.ModelAdmin):
+    list_display = ["id", "empresa", "estacao", "referencia", "produto_nome", "quantidade", "status", "created"]
+    list_filter = ["empresa", "estacao", "status"]
+    search_fields = ["referencia", "produto_nome"]
+    readonly_fields = ["status"]  # muda pelo painel, que registra a alteração para os cursores
+
+admin.site.register(TicketCozinha, TicketCozinhaAdmin)
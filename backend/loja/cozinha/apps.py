@@ -0,0 +1,9 @@
+from django.apps import AppConfig
+
+
+class CozinhaConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'cozinha'
+
+    def ready(self):
+        from . import signals  # noqa: F401  (tickets abertos a partir das mesas e dos pedidos)
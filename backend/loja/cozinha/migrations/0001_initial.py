@@ -0,0 +1,56 @@
+# Generated by Django 5.1.7 on 2026-10-18 15:54
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('empresa', '0002_empresa_empresa_created_id_idx'),
+        ('mesa', '0003_sequencia_pedido'),
+        ('pedido', '0003_pedido_mesa_pagamento'),
+        ('produto', '0003_produto_produto_created_id_idx'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TicketCozinha',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('estacao', models.CharField(max_length=20)),
+                ('numero_pedido', models.PositiveIntegerField(blank=True, null=True)),
+                ('referencia', models.CharField(max_length=60)),
+                ('produto_nome', models.CharField(max_length=100)),
+                ('quantidade', models.PositiveIntegerField()),
+                ('status', models.CharField(choices=[('pendente', 'Pendente'), ('preparando', 'Preparando'), ('pronto', 'Pronto'), ('cancelado', 'Cancelado')], default='pendente', max_length=12)),
+                ('created', models.DateTimeField(auto_now_add=True)),
+                ('updated', models.DateTimeField(auto_now=True)),
+                ('empresa', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='tickets_cozinha', to='empresa.empresa')),
+                ('mesa', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='tickets_cozinha', to='mesa.mesa')),
+                ('pedido', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='tickets_cozinha', to='pedido.pedido')),
+                ('produto', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='produto.produto')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='AlteracaoTicket',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('estacao', models.CharField(max_length=20)),
+                ('status', models.CharField(choices=[('pendente', 'Pendente'), ('preparando', 'Preparando'), ('pronto', 'Pronto'), ('cancelado', 'Cancelado')], max_length=12)),
+                ('created', models.DateTimeField(auto_now_add=True)),
+                ('empresa', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='empresa.empresa')),
+                ('ticket', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='alteracoes', to='cozinha.ticketcozinha')),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='ticketcozinha',
+            index=models.Index(fields=['empresa', 'status', 'created'], name='ticket_empresa_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='alteracaoticket',
+            index=models.Index(fields=['empresa', 'estacao', 'id'], name='alteracao_ticket_cursor_idx'),
+        ),
+    ]
@@ -0,0 +1,66 @@
+# backend/loja/cozinha/models.py
+from django.db import models
+from empresa.models import Empresa
+from mesa.models import Mesa
+from pedido.models import Pedido
+from produto.models import Produto
+
+
+class TicketCozinha(models.Model):
+    """Uma linha a preparar no painel de uma estação (bar, pizzaria, chapa...).
+
+    Nasce quando o item é pedido na mesa ou num pedido online e sai do painel
+    quando fica pronto ou é cancelado.
+    """
+    PENDENTE = 'pendente'
+    PREPARANDO = 'preparando'
+    PRONTO = 'pronto'
+    CANCELADO = 'cancelado'
+    STATUS_CHOICES = [
+        (PENDENTE, 'Pendente'),
+        (PREPARANDO, 'Preparando'),
+        (PRONTO, 'Pronto'),
+        (CANCELADO, 'Cancelado'),
+    ]
+    ABERTOS = (PENDENTE, PREPARANDO)  # status que aparecem no painel
+
+    empresa = models.ForeignKey(Empresa, on_delete=models.CASCADE, related_name='tickets_cozinha')
+    estacao = models.CharField(max_length=20)
+    mesa = models.ForeignKey(Mesa, null=True, blank=True, on_delete=models.SET_NULL, related_name='tickets_cozinha')
+    pedido = models.ForeignKey(Pedido, null=True, blank=True, on_delete=models.CASCADE, related_name='tickets_cozinha')
+    numero_pedido = models.PositiveIntegerField(null=True, blank=True)  # Mesa.pedido quando o item foi pedido
+    referencia = models.CharField(max_length=60)  # "Mesa 5", "Pedido 12": o que a cozinha lê no painel
+    produto = models.ForeignKey(Produto, on_delete=models.CASCADE)
+    produto_nome = models.CharField(max_length=100)
+    quantidade = models.PositiveIntegerField()
+    status = models.CharField(max_length=12, choices=STATUS_CHOICES, default=PENDENTE)
+    created = models.DateTimeField(auto_now_add=True)
+    updated = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['empresa', 'status', 'created'], name='ticket_empresa_status_idx'),  # fila do painel
+        ]
+
+    def __str__(self):
+        return f'{self.referencia}: {self.quantidade}x {self.produto_nome} ({self.status})'
+
+
+class AlteracaoTicket(models.Model):
+    """Registro (somente inclusão) de cada ticket criado ou com status alterado.
+
+    O id é o cursor dos painéis: quem já viu até o id N pede só o que veio depois.
+    """
+    empresa = models.ForeignKey(Empresa, on_delete=models.CASCADE, related_name='+')
+    estacao = models.CharField(max_length=20)
+    ticket = models.ForeignKey(TicketCozinha, on_delete=models.CASCADE, related_name='alteracoes')
+    status = models.CharField(max_length=12, choices=TicketCozinha.STATUS_CHOICES)
+    created = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['empresa', 'estacao', 'id'], name='alteracao_ticket_cursor_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.id}: ticket {self.ticket_id} {self.status}'
@@ -0,0 +1,10 @@
+# backend/loja/cozinha/serializers.py
+from rest_framework import serializers
+from .models import TicketCozinha
+
+
+class TicketCozinhaSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = TicketCozinha
+        fields = ['id', 'estacao', 'referencia', 'mesa', 'pedido', 'produto', 'produto_nome', 'quantidade',
+                  'status', 'created', 'updated']
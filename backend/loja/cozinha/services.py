@@ -0,0 +1,180 @@
+# backend/loja/cozinha/services.py
+"""Fila do painel da cozinha (KDS).
+
+Cada item pedido numa mesa ou num pedido online vira um ticket na estação da
+categoria do produto (CERVEJA vai para o bar, PIZZA para a pizzaria...), e cada
+ticket criado ou com status alterado ganha uma linha em AlteracaoTicket. O painel
+carrega a fila uma vez e, dali em diante, pede só as alterações depois do cursor
+(id da última alteração vista), por long-polling ou SSE.
+
+A espera acorda na hora para alterações feitas neste processo; as de outros
+processos são vistas na consulta seguinte (a cada INTERVALO segundos).
+
+No ASGI (loja/asgi.py, um worker) os painéis esperam com ``aguardar_assincrono``,
+inscritos no grupo GRUPO da camada de canais: uma espera não ocupa thread. No
+WSGI cada painel conectado segura uma thread do servidor (``aguardar``), então
+dimensione as threads pelo número de painéis.
+"""
+import asyncio
+import threading
+import time
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from categoria.models import Categoria
+from loja.canais import camada
+from .models import AlteracaoTicket, TicketCozinha
+
+# Estação -> nomes de categoria; categorias que não aparecem aqui vão para a estação padrão
+ESTACOES = getattr(settings, 'COZINHA_ESTACOES', {
+    'bar': ['CERVEJA', 'BEBIDA', 'SUCO', 'BALDE'],
+    'pizzaria': ['PIZZA'],
+    'chapa': ['LANCHE', 'TAPIOCA'],
+})
+ESTACAO_PADRAO = getattr(settings, 'COZINHA_ESTACAO_PADRAO', 'cozinha')
+INTERVALO = 1.0  # segundos entre consultas enquanto um painel espera
+LIMITE = 200     # alterações devolvidas por resposta
+GRUPO = 'cozinha'  # grupo da camada de canais avisado a cada alteração
+
+_estacao_por_categoria = {
+    categoria.upper(): estacao for estacao, categorias in ESTACOES.items() for categoria in categorias
+}
+_novidade = threading.Condition()
+
+
+def estacoes():
+    return sorted({*ESTACOES, ESTACAO_PADRAO})
+
+
+def estacao_da_categoria(nome):
+    return _estacao_por_categoria.get((nome or '').upper(), ESTACAO_PADRAO)
+
+
+def _avisar():
+    with _novidade:
+        _novidade.notify_all()
+    camada.enviar(GRUPO, {'evento': 'alteracao'})
+
+
+def _registrar(tickets):
+    AlteracaoTicket.objects.bulk_create([
+        AlteracaoTicket(empresa_id=ticket.empresa_id, estacao=ticket.estacao, ticket=ticket, status=ticket.status)
+        for ticket in tickets
+    ])
+    transaction.on_commit(_avisar)
+
+
+def abrir_tickets(empresa_id, itens, referencia, mesa=None, pedido=None):
+    """Cria um ticket por (produto, quantidade), cada um na estação da categoria do produto.
+    Uma query para as categorias e um bulk_create por tabela. Retorna os tickets."""
+    itens = [(produto, int(quantidade)) for produto, quantidade in itens if int(quantidade) > 0]
+    if not itens:
+        return []
+    categorias = dict(
+        Categoria.objects.filter(id__in={produto.categoria_id for produto, _ in itens}).values_list('id', 'nome')
+    )
+    tickets = [
+        TicketCozinha(
+            empresa_id=empresa_id,
+            estacao=estacao_da_categoria(categorias.get(produto.categoria_id)),
+            mesa=mesa,
+            pedido=pedido,
+            numero_pedido=mesa.pedido if mesa is not None else None,
+            referencia=referencia,
+            produto=produto,
+            produto_nome=produto.nome,
+            quantidade=quantidade,
+        )
+        for produto, quantidade in itens
+    ]
+    with transaction.atomic():
+        TicketCozinha.objects.bulk_create(tickets)
+        _registrar(tickets)
+    return tickets
+
+
+def cancelar_tickets(tickets):
+    """Cancela os tickets ainda abertos do queryset. Retorna quantos foram cancelados."""
+    with transaction.atomic():
+        abertos = list(tickets.select_for_update().filter(status__in=TicketCozinha.ABERTOS))
+        if not abertos:
+            return 0
+        TicketCozinha.objects.filter(pk__in=[ticket.pk for ticket in abertos]).update(
+            status=TicketCozinha.CANCELADO, updated=timezone.now()
+        )
+        for ticket in abertos:
+            ticket.status = TicketCozinha.CANCELADO
+        _registrar(abertos)
+    return len(abertos)
+
+
+def alterar_status(ticket, status):
+    with transaction.atomic():
+        ticket.status = status
+        ticket.save(update_fields=['status', 'updated'])
+        _registrar([ticket])
+    return ticket
+
+
+def fila(empresa_id, estacao):
+    """Tickets abertos da estação (mais antigos primeiro) e o cursor para acompanhar as alterações.
+
+    O cursor é lido antes dos tickets: o que mudar entre as duas consultas volta
+    de novo em ``alteracoes`` (o painel substitui o ticket pelo id), nunca se perde.
+    """
+    cursor = (
+        AlteracaoTicket.objects.filter(empresa_id=empresa_id, estacao=estacao)
+        .order_by('-id').values_list('id', flat=True).first()
+    ) or 0
+    tickets = (
+        TicketCozinha.objects.filter(empresa_id=empresa_id, status__in=TicketCozinha.ABERTOS, estacao=estacao)
+        .order_by('created', 'id')
+    )
+    return cursor, list(tickets)
+
+
+def alteracoes(empresa_id, estacao, cursor, limite=LIMITE):
+    """Tickets alterados depois do cursor (no estado atual, na ordem das alterações) e o novo cursor."""
+    registros = list(
+        AlteracaoTicket.objects.filter(empresa_id=empresa_id, estacao=estacao, id__gt=cursor)
+        .order_by('id').values_list('id', 'ticket_id')[:limite]
+    )
+    if not registros:
+        return cursor, []
+    tickets = TicketCozinha.objects.in_bulk({ticket_id for _, ticket_id in registros})
+    ordem = dict.fromkeys(ticket_id for _, ticket_id in registros)
+    return registros[-1][0], [tickets[ticket_id] for ticket_id in ordem if ticket_id in tickets]
+
+
+def aguardar(empresa_id, estacao, cursor, espera):
+    """Long-polling: devolve assim que houver alteração depois do cursor, ou após ``espera`` segundos."""
+    limite = time.monotonic() + espera
+    while True:
+        novo_cursor, tickets = alteracoes(empresa_id, estacao, cursor)
+        restante = limite - time.monotonic()
+        if tickets or restante <= 0:
+            return novo_cursor, tickets
+        with _novidade:
+            _novidade.wait(min(INTERVALO, restante))
+
+
+async def aguardar_assincrono(empresa_id, estacao, cursor, espera):
+    """Como ``aguardar``, mas esperando na event loop (views ASGI) em vez de numa thread."""
+    aviso = asyncio.Queue(maxsize=1)  # basta saber que houve alteração; o excesso vira um só aviso
+    camada.inscrever(GRUPO, aviso)  # antes da consulta, para não perder o que mudar entre as duas
+    try:
+        limite = time.monotonic() + espera
+        while True:
+            novo_cursor, tickets = await sync_to_async(alteracoes)(empresa_id, estacao, cursor)
+            restante = limite - time.monotonic()
+            if tickets or restante <= 0:
+                return novo_cursor, tickets
+            try:
+                await asyncio.wait_for(aviso.get(), min(INTERVALO, restante))
+            except asyncio.TimeoutError:
+                pass
+    finally:
+        camada.cancelar(GRUPO, aviso)
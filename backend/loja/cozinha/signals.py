@@ -0,0 +1,36 @@
+# backend/loja/cozinha/signals.py
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+from mesa import tempo_real
+from mesa.models import Mesa
+from pedido.models import Pedido
+from pedido.services import pedido_criado
+from . import services
+from .models import TicketCozinha
+
+
+@receiver(tempo_real.itens_pedidos, sender=Mesa)
+def abrir_tickets_da_mesa(sender, mesa, itens, **kwargs):
+    services.abrir_tickets(mesa.empresa_id, itens, f'Mesa {mesa.numero}', mesa=mesa)
+
+
+@receiver(tempo_real.itens_cancelados, sender=Mesa)
+def cancelar_tickets_da_mesa(sender, mesa, produtos, **kwargs):
+    # Só os tickets do pedido atual da mesa: os dos clientes anteriores seguem como estão
+    tickets = TicketCozinha.objects.filter(mesa=mesa, numero_pedido=mesa.pedido)
+    if produtos is not None:
+        tickets = tickets.filter(produto_id__in=produtos)
+    services.cancelar_tickets(tickets)
+
+
+@receiver(pedido_criado, sender=Pedido)
+def abrir_tickets_do_pedido(sender, pedido, itens, **kwargs):
+    services.abrir_tickets(pedido.empresa_id, [(item.produto, item.quantidade) for item in itens],
+                           f'Pedido {pedido.id}', pedido=pedido)
+
+
+@receiver(post_save, sender=Pedido)
+def cancelar_tickets_do_pedido(sender, instance, created, raw=False, **kwargs):
+    if raw or created or instance.status != 'cancelado':
+        return
+    services.cancelar_tickets(TicketCozinha.objects.filter(pedido=instance))
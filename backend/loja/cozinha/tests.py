@@ -0,0 +1,132 @@
+import asyncio
+import time
+from unittest import mock
+
+from asgiref.sync import sync_to_async
+from django.test import AsyncClient, TestCase
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from carrinho.models import Carrinho
+from loja.testing import cliente_autenticado, criar_empresa, criar_produto, criar_usuario
+from mesa.models import Mesa
+from pedido.services import criar_pedido_do_carrinho
+from . import services
+from .models import TicketCozinha
+
+
+class FilaCozinhaTests(TestCase):
+    def setUp(self):
+        self.empresa = criar_empresa()
+        self.client = cliente_autenticado()
+        self.chopp = criar_produto(empresa=self.empresa, categoria='CERVEJA')
+        self.pizza = criar_produto(empresa=self.empresa, nome='Pizza Calabresa', categoria='PIZZA')
+        self.mesa = Mesa.objects.create(empresa=self.empresa, numero='5', nome='Mesa 5')
+
+    def fila(self, estacao):
+        return self.client.get(f'/api/cozinha/fila/?empresa={self.empresa.id}&estacao={estacao}')
+
+    def alteracoes(self, estacao, cursor, **params):
+        query = '&'.join(f'{chave}={valor}' for chave, valor in params.items())
+        return self.client.get(f'/api/cozinha/alteracoes/?empresa={self.empresa.id}&estacao={estacao}&cursor={cursor}&{query}')
+
+    def test_itens_vao_para_a_estacao_da_categoria(self):
+        self.mesa.adicionar_rodada([(self.chopp.id, 2), (self.pizza.id, 1)])
+        bar = self.fila('bar').data
+        pizzaria = self.fila('pizzaria').data
+        self.assertEqual([(t['produto_nome'], t['quantidade'], t['referencia']) for t in bar['tickets']],
+                         [('Chopp Pilsen', 2, 'Mesa 5')])
+        self.assertEqual([t['produto_nome'] for t in pizzaria['tickets']], ['Pizza Calabresa'])
+        self.assertEqual(self.fila('cozinha').data['tickets'], [])
+
+    def test_long_polling_devolve_so_o_que_mudou_depois_do_cursor(self):
+        self.mesa.adicionar_item(self.chopp, 1)
+        cursor = self.fila('bar').data['cursor']
+        vazio = self.alteracoes('bar', cursor, espera=0).data
+        self.assertEqual((vazio['cursor'], vazio['tickets']), (cursor, []))
+
+        self.mesa.adicionar_item(self.pizza, 1)  # outra estação: o bar não vê
+        self.mesa.adicionar_item(self.chopp, 3)
+        resposta = self.alteracoes('bar', cursor, espera=0).data
+        self.assertEqual([t['quantidade'] for t in resposta['tickets']], [3])
+        self.assertGreater(resposta['cursor'], cursor)
+
+        ticket = resposta['tickets'][0]['id']
+        self.client.post(f'/api/cozinha/tickets/{ticket}/status/', {'status': 'pronto'}, format='json')
+        resposta = self.alteracoes('bar', resposta['cursor'], espera=0).data
+        self.assertEqual([(t['id'], t['status']) for t in resposta['tickets']], [(ticket, 'pronto')])
+        self.assertEqual([t['quantidade'] for t in self.fila('bar').data['tickets']], [1])
+
+    def test_item_removido_e_mesa_cancelada_cancelam_os_tickets(self):
+        self.mesa.adicionar_rodada([(self.chopp.id, 2), (self.pizza.id, 1)])
+        self.mesa.remover_item(produto=self.chopp)
+        self.assertEqual(self.fila('bar').data['tickets'], [])
+        self.mesa.cancelar_pedido()
+        self.assertEqual(self.fila('pizzaria').data['tickets'], [])
+        self.assertEqual(TicketCozinha.objects.filter(status=TicketCozinha.CANCELADO).count(), 2)
+
+    def test_pedido_online_abre_e_cancelamento_fecha_os_tickets(self):
+        usuario = criar_usuario()
+        carrinho = Carrinho.objects.create(usuario=usuario)
+        carrinho.itens.create(produto=self.pizza, quantidade=2, preco_unitario=self.pizza.venda)
+        pedido = criar_pedido_do_carrinho(carrinho, self.empresa, usuario=usuario)
+        tickets = self.fila('pizzaria').data['tickets']
+        self.assertEqual([(t['pedido'], t['referencia']) for t in tickets], [(pedido.id, f'Pedido {pedido.id}')])
+
+        pedido.status = 'cancelado'
+        pedido.save()
+        self.assertEqual(self.fila('pizzaria').data['tickets'], [])
+
+    def test_sse_comeca_pela_fila_e_aceita_token_na_url(self):
+        self.mesa.adicionar_item(self.chopp, 1)
+        token = AccessToken.for_user(criar_usuario())
+        response = APIClient().get(f'/api/cozinha/alteracoes/?empresa={self.empresa.id}&estacao=bar&token={token}&duracao=0',
+                                   HTTP_ACCEPT='text/event-stream')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        evento = b''.join(response.streaming_content).decode()
+        self.assertTrue(evento.startswith('id: '))
+        self.assertIn('event: fila', evento)
+        self.assertIn('Chopp Pilsen', evento)
+
+    def test_estacao_invalida(self):
+        self.assertEqual(self.fila('churrasqueira').status_code, 400)
+
+
+@mock.patch.object(services, 'INTERVALO', 5)  # sem o aviso a espera só acabaria depois de 5 s
+class EsperaAssincronaTests(TestCase):
+    def setUp(self):
+        self.empresa = criar_empresa()
+        self.chopp = criar_produto(empresa=self.empresa, categoria='CERVEJA')
+        self.mesa = Mesa.objects.create(empresa=self.empresa, numero='7', nome='Mesa 7')
+        self.mesa.adicionar_item(self.chopp, 1)
+        self.token = AccessToken.for_user(criar_usuario())
+        self.url = f'/api/cozinha/alteracoes/?empresa={self.empresa.id}&estacao=bar&token={self.token}'
+
+    async def nova_alteracao(self):
+        await asyncio.sleep(0.1)  # deixa a espera começar
+        await sync_to_async(self.mesa.adicionar_item)(self.chopp, 2)
+        services._avisar()  # o que transaction.on_commit faria (o TestCase nunca confirma)
+
+    async def test_long_polling_acorda_com_o_aviso(self):
+        cursor = (await sync_to_async(services.fila)(self.empresa.id, 'bar'))[0]
+        inicio = time.monotonic()
+        resposta, _ = await asyncio.gather(AsyncClient().get(f'{self.url}&cursor={cursor}&espera=10'),
+                                           self.nova_alteracao())
+        self.assertLess(time.monotonic() - inicio, 0.9)
+        self.assertEqual(resposta.status_code, 200)
+        self.assertEqual([t['quantidade'] for t in resposta.json()['tickets']], [2])
+        self.assertEqual(services.camada.inscritos(services.GRUPO), 0)
+
+    async def test_sse_no_asgi_envia_cada_evento_ao_gerar(self):
+        resposta = await AsyncClient().get(f'{self.url}&duracao=10', headers={'Accept': 'text/event-stream'})
+        self.assertEqual(resposta.status_code, 200)
+        self.assertTrue(resposta.is_async)
+        eventos = aiter(resposta.streaming_content)
+        self.assertIn('event: fila', (await asyncio.wait_for(anext(eventos), 1)).decode())
+
+        inicio = time.monotonic()
+        evento, _ = await asyncio.gather(anext(eventos), self.nova_alteracao())
+        self.assertLess(time.monotonic() - inicio, 0.9)
+        self.assertIn('event: alteracoes', evento.decode())
+        self.assertIn('"quantidade": 2', evento.decode())
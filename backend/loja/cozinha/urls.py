@@ -0,0 +1,9 @@
+# backend/loja/cozinha/urls.py
+from django.urls import path
+from . import views
+
+urlpatterns = [
+    path("cozinha/fila/", views.fila_cozinha, name="cozinha-fila"),
+    path("cozinha/alteracoes/", views.alteracoes_cozinha, name="cozinha-alteracoes"),
+    path("cozinha/tickets/<int:pk>/status/", views.alterar_status_ticket, name="cozinha-ticket-status"),
+]
@@ -0,0 +1,183 @@
+# backend/loja/cozinha/views.py
+import json
+import time
+
+from asgiref.sync import sync_to_async
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import StreamingHttpResponse
+from django.views.decorators.csrf import csrf_exempt
+from rest_framework import status
+from rest_framework.decorators import api_view, authentication_classes, renderer_classes
+from rest_framework.renderers import BaseRenderer, BrowsableAPIRenderer
+from rest_framework.response import Response
+from rest_framework_simplejwt.authentication import JWTAuthentication
+
+from loja.autenticacao import JWTQueryStringAuthentication
+from loja.renderers import FastJSONRenderer
+from loja.streaming import requisicao_asgi
+from . import services
+from .models import TicketCozinha
+from .serializers import TicketCozinhaSerializer
+
+ESPERA_PADRAO = 25  # segundos que o long-polling segura a requisição sem novidades
+ESPERA_MAXIMA = 55
+DURACAO_SSE = 300   # depois disso o stream termina e o EventSource reconecta com Last-Event-ID
+PING_SSE = 15
+
+
+class EventStreamRenderer(BaseRenderer):
+    """Deixa o DRF negociar text/event-stream (EventSource ou ?format=sse).
+
+    Só renderiza respostas de erro; o stream em si sai num StreamingHttpResponse.
+    """
+    media_type = 'text/event-stream'
+    format = 'sse'
+    charset = 'utf-8'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return _evento('erro', data)
+
+
+def _evento(nome, dados, cursor=None):
+    linhas = [f'id: {cursor}'] if cursor is not None else []
+    linhas += [f'event: {nome}', f'data: {json.dumps(dados, cls=DjangoJSONEncoder)}']
+    return '\n'.join(linhas) + '\n\n'
+
+
+def _painel(request):
+    """Lê ?empresa= e ?estacao=. Retorna (empresa_id, estacao, None) ou (None, None, Response de erro)."""
+    try:
+        empresa_id = int(request.query_params.get('empresa', ''))
+    except ValueError:
+        return None, None, Response({"error": "Informe a empresa (?empresa=<id>)"}, status=status.HTTP_400_BAD_REQUEST)
+    estacao = request.query_params.get('estacao', services.ESTACAO_PADRAO)
+    if estacao not in services.estacoes():
+        return None, None, Response({"error": f"Estação inválida. Use uma de: {', '.join(services.estacoes())}"},
+                                    status=status.HTTP_400_BAD_REQUEST)
+    return empresa_id, estacao, None
+
+
+def _numero(valor, padrao, maximo):
+    try:
+        return min(max(float(valor), 0), maximo)
+    except (TypeError, ValueError):
+        return padrao
+
+
+def _resposta(estacao, cursor, tickets):
+    return {'estacao': estacao, 'cursor': cursor, 'tickets': TicketCozinhaSerializer(tickets, many=True).data}
+
+
+@api_view(['GET'])
+def fila_cozinha(request):
+    """Tickets abertos da estação e o cursor para acompanhar as alterações em /cozinha/alteracoes/."""
+    empresa_id, estacao, erro = _painel(request)
+    if erro:
+        return erro
+    cursor, tickets = services.fila(empresa_id, estacao)
+    return Response(_resposta(estacao, cursor, tickets))
+
+
+def _stream(empresa_id, estacao, cursor, duracao):
+    if cursor is None:  # conexão nova: começa pela fila inteira
+        cursor, tickets = services.fila(empresa_id, estacao)
+        yield _evento('fila', _resposta(estacao, cursor, tickets), cursor)
+    fim = time.monotonic() + duracao
+    while True:
+        restante = fim - time.monotonic()
+        if restante <= 0:
+            return
+        novo_cursor, tickets = services.aguardar(empresa_id, estacao, cursor, min(PING_SSE, restante))
+        if tickets:
+            cursor = novo_cursor
+            yield _evento('alteracoes', _resposta(estacao, cursor, tickets), cursor)
+        else:
+            yield ': ping\n\n'  # mantém a conexão viva através de proxies
+
+
+async def _stream_assincrono(empresa_id, estacao, cursor, duracao):
+    """``_stream`` para o ASGI: espera na event loop e o Django envia cada evento ao ser gerado."""
+    if cursor is None:
+        cursor, tickets = await sync_to_async(services.fila)(empresa_id, estacao)
+        yield _evento('fila', await sync_to_async(_resposta)(estacao, cursor, tickets), cursor)
+    fim = time.monotonic() + duracao
+    while True:
+        restante = fim - time.monotonic()
+        if restante <= 0:
+            return
+        novo_cursor, tickets = await services.aguardar_assincrono(empresa_id, estacao, cursor, min(PING_SSE, restante))
+        if tickets:
+            cursor = novo_cursor
+            yield _evento('alteracoes', await sync_to_async(_resposta)(estacao, cursor, tickets), cursor)
+        else:
+            yield ': ping\n\n'
+
+
+@api_view(['GET'])
+@authentication_classes([JWTAuthentication, JWTQueryStringAuthentication])
+@renderer_classes([FastJSONRenderer, BrowsableAPIRenderer, EventStreamRenderer])
+def _alteracoes(request):
+    """Valida a requisição de ``alteracoes_cozinha`` e monta o stream SSE.
+
+    No long-polling devolve a Response sem dados e com ``aguardar`` preenchido;
+    quem espera é ``alteracoes_cozinha``, de forma assíncrona.
+    """
+    empresa_id, estacao, erro = _painel(request)
+    if erro:
+        return erro
+    cursor = request.query_params.get('cursor') or request.headers.get('Last-Event-ID')
+    try:
+        cursor = int(cursor) if cursor is not None else None
+    except ValueError:
+        return Response({"error": "Cursor inválido"}, status=status.HTTP_400_BAD_REQUEST)
+
+    if request.accepted_renderer.format == EventStreamRenderer.format:
+        duracao = _numero(request.query_params.get('duracao'), DURACAO_SSE, DURACAO_SSE)
+        stream = _stream_assincrono if requisicao_asgi(request) else _stream
+        response = StreamingHttpResponse(stream(empresa_id, estacao, cursor, duracao), content_type='text/event-stream')
+        response['Cache-Control'] = 'no-cache'
+        response['X-Accel-Buffering'] = 'no'  # nginx não deve segurar os eventos
+        return response
+
+    if cursor is None:
+        return Response({"error": "Informe o cursor (?cursor=) devolvido por /cozinha/fila/"}, status=status.HTTP_400_BAD_REQUEST)
+    espera = _numero(request.query_params.get('espera'), ESPERA_PADRAO, ESPERA_MAXIMA)
+    response = Response()
+    response.aguardar = (empresa_id, estacao, cursor, espera)
+    return response
+
+
+@csrf_exempt
+async def alteracoes_cozinha(request):
+    """Alterações de tickets depois de ?cursor=.
+
+    JSON: long-polling, responde assim que houver alteração ou após ?espera= segundos.
+    SSE (Accept: text/event-stream ou ?format=sse, token em ?token=): sem cursor
+    começa pela fila; o id de cada evento é o cursor (Last-Event-ID na reconexão).
+
+    View assíncrona: no ASGI a espera (long-polling e SSE) não ocupa thread. No
+    WSGI o Django roda a view numa event loop própria e a requisição segura a
+    thread do servidor até responder, como qualquer view síncrona.
+    """
+    response = await sync_to_async(_alteracoes)(request)
+    aguardar = getattr(response, 'aguardar', None)
+    if aguardar is None:
+        return response
+    empresa_id, estacao, cursor, espera = aguardar
+    print(f"👨‍🍳 Painel {estacao} (empresa {empresa_id}) aguardando alterações após {cursor}")
+    cursor, tickets = await services.aguardar_assincrono(empresa_id, estacao, cursor, espera)
+    response.data = await sync_to_async(_resposta)(estacao, cursor, tickets)
+    return response
+
+
+@api_view(['POST'])
+def alterar_status_ticket(request, pk):
+    try:
+        ticket = TicketCozinha.objects.get(pk=pk)
+    except TicketCozinha.DoesNotExist:
+        return Response({"error": "Ticket não encontrado"}, status=status.HTTP_404_NOT_FOUND)
+    status_novo = request.data.get('status')
+    if status_novo not in dict(TicketCozinha.STATUS_CHOICES):
+        return Response({"error": "Status inválido"}, status=status.HTTP_400_BAD_REQUEST)
+    services.alterar_status(ticket, status_novo)
+    return Response(TicketCozinhaSerializer(ticket).data)
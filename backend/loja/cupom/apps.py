@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class CupomConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'cupom'
+
+    def ready(self):
+        from . import signals  # noqa: F401  (invalida a lista de cupons em cache)
@@ -0,0 +1,14 @@
+# backend/loja/cupom/signals.py
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from loja import cache
+from .models import Cupom
+
+
+@receiver(post_save, sender=Cupom)
+@receiver(post_delete, sender=Cupom)
+def invalidar_cache_cupons(sender, instance, raw=False, **kwargs):
+    """A lista de cupons em cache (loja.cache) é descartada a cada alteração."""
+    if raw:
+        return
+    cache.invalidar('cupons')
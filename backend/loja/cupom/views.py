@@ -6,8 +6,10 @@ from rest_framework import status
 from .models import Cupom
 from .serializers import CupomSerializer
 from datetime import datetime
+from loja import cache
 
 @api_view(['GET'])
+@cache.em_cache('cupons', ttl=60)  # TTL curto: a lista também muda quando um cupom vence
 def listar_cupons(request):
     cupons = Cupom.objects.filter(ativo=True, valido_ate__gte=datetime.now())
     serializer = CupomSerializer(cupons, many=True)
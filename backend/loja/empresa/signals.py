@@ -0,0 +1,14 @@
+# backend/loja/empresa/signals.py
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from loja import cache
+from .models import Empresa
+
+
+@receiver(post_save, sender=Empresa)
+@receiver(post_delete, sender=Empresa)
+def invalidar_cache_empresas(sender, instance, raw=False, **kwargs):
+    """A lista de empresas em cache (loja.cache) é descartada a cada alteração."""
+    if raw:
+        return
+    cache.invalidar('empresas')
@@ -4,6 +4,8 @@ from rest_framework.decorators import api_view
 from rest_framework import status
 from .models import Empresa
 from .serializers import EmpresaSerializer
+from loja import cache
+from loja.pagination import paginar
 from django.db.models import Q
 
 @api_view(['GET'])
@@ -16,11 +18,11 @@ def search_empresas(request):
     return Response(serializer.data, status=status.HTTP_200_OK)
 
 @api_view(['GET', 'POST'])
+@cache.em_cache('empresas')
 def empresas(request):
     if request.method == 'GET':
         empresas = Empresa.objects.all()
-        serializer = EmpresaSerializer(empresas, many=True)
-        return Response(serializer.data)
+        return paginar(request, empresas, EmpresaSerializer)
     
     elif request.method == 'POST':
         serializer = EmpresaSerializer(data=request.data)
@@ -1,11 +1,21 @@
 from django.contrib import admin
-from .models import Estoque
+from .models import Estoque, SaldoEstoque
 
 class EstoqueAdmin(admin.ModelAdmin):
     list_display = ["empresa", "produto", "quantidade", "tipo", "slug", "created"]
     list_filter = ["empresa", "produto", "tipo"]
     search_fields = ["empresa__nome", "produto__nome"]
 
-admin.site.register(Estoque, EstoqueAdmin)
+    # Livro somente de inclusão
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
 
+class SaldoEstoqueAdmin(admin.ModelAdmin):
+    list_display = ["produto", "saldo", "momento", "ultimo_movimento"]
+    list_filter = ["produto"]
 
+admin.site.register(Estoque, EstoqueAdmin)
+admin.site.register(SaldoEstoque, SaldoEstoqueAdmin)
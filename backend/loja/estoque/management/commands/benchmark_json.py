@@ -0,0 +1,78 @@
+# backend/loja/estoque/management/commands/benchmark_json.py
+import io
+import time
+import tracemalloc
+import uuid
+from datetime import timedelta
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+from loja.parsers import FastJSONParser
+from loja.renderers import FastJSONRenderer, orjson
+
+
+def _linhas(quantidade):
+    """Linhas no formato de /api/estoques/ e /api/produtos/ (Decimal, datetime, UUID, texto)."""
+    agora = timezone.now()
+    return [
+        {
+            'id': i,
+            'empresa': 1,
+            'produto': i % 500,
+            'produto_nome': f'Chopp Pilsen {i % 500} 300ml',
+            'quantidade': i % 50,
+            'tipo': 'reserva' if i % 3 else 'entrada',
+            'venda': Decimal('12.90') + i % 7,
+            'custo': Decimal('5.35'),
+            'slug': f'chopp-pilsen-{i}-{uuid.UUID(int=i).hex[:5]}',
+            'referencia': uuid.UUID(int=i),
+            'is_available': True,
+            'created': agora - timedelta(seconds=i),
+        }
+        for i in range(quantidade)
+    ]
+
+
+def _medir(funcao, repeticoes):
+    """(melhor tempo em ms, pico de memória alocada em KiB, resultado)."""
+    melhor = None
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        resultado = funcao()
+        decorrido = time.perf_counter() - inicio
+        melhor = decorrido if melhor is None else min(melhor, decorrido)
+    tracemalloc.start()
+    try:
+        funcao()
+        _, pico = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return melhor * 1000, pico / 1024, resultado
+
+
+class Command(BaseCommand):
+    help = 'Compara JSONRenderer/JSONParser do DRF com FastJSONRenderer/FastJSONParser (tempo e pico de memória).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--linhas', type=int, default=10_000)
+        parser.add_argument('--repeticoes', type=int, default=5)
+
+    def handle(self, *args, **options):
+        dados = _linhas(options['linhas'])
+        repeticoes = options['repeticoes']
+        self.stdout.write(f"📊 {options['linhas']} linhas, melhor de {repeticoes} "
+                          f"(orjson {'instalado' if orjson else 'ausente: Fast* usa o json da biblioteca padrão'})")
+
+        corpo = None
+        for nome, renderer, parser in (
+            ('DRF (json)', JSONRenderer(), JSONParser()),
+            ('Fast (orjson)', FastJSONRenderer(), FastJSONParser()),
+        ):
+            ms, kib, corpo = _medir(lambda: renderer.render(dados), repeticoes)
+            self.stdout.write(f'{nome:<14} render: {ms:8.1f} ms  pico {kib:9.0f} KiB  ({len(corpo) / 1024:.0f} KiB)')
+            ms, kib, _ = _medir(lambda: parser.parse(io.BytesIO(corpo), parser_context={'encoding': 'utf-8'}), repeticoes)
+            self.stdout.write(f'{nome:<14} parse:  {ms:8.1f} ms  pico {kib:9.0f} KiB')
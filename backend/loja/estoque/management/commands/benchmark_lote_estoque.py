@@ -0,0 +1,73 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils.crypto import get_random_string
+
+from categoria.models import Categoria
+from empresa.models import Empresa
+from loja.renderers import FastJSONRenderer
+from produto.models import Produto
+from estoque import services
+from estoque.models import Estoque
+from estoque.serializers import MovimentoLoteSerializer
+
+
+class _Desfazer(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = ('Mede o POST em lote de /api/estoques/ (validação, registrar_lote e resposta) '
+            'com dados temporários; tudo é desfeito no fim.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--linhas', type=int, default=10_000)
+        parser.add_argument('--produtos', type=int, default=200)
+        parser.add_argument('--repeticoes', type=int, default=3)
+
+    def _preparar(self, quantidade):
+        empresa = Empresa.objects.create(nome='Benchmark', endereco='-', telefone='-', email='benchmark@example.com',
+                                         cnpj=get_random_string(14, '0123456789'))
+        categoria, _ = Categoria.objects.get_or_create(nome='CERVEJA')
+        produtos = [
+            Produto.objects.create(empresa=empresa, categoria=categoria, nome=f'Chopp {i}', descricao='-',
+                                   custo=5, venda=12, codigo=get_random_string(8), estoque=0)
+            for i in range(quantidade)
+        ]
+        return empresa, produtos
+
+    def handle(self, *args, **options):
+        linhas_total = options['linhas']
+        tempos = []
+        try:
+            with transaction.atomic():
+                empresa, produtos = self._preparar(options['produtos'])
+                corpo = [
+                    {'empresa': empresa.id, 'produto': produtos[i % len(produtos)].id, 'quantidade': 1 + i % 5,
+                     'tipo': Estoque.ENTRADA}
+                    for i in range(linhas_total)
+                ]
+                for _ in range(options['repeticoes']):
+                    inicio = time.perf_counter()
+                    serializer = MovimentoLoteSerializer(data=corpo, many=True)
+                    serializer.is_valid(raise_exception=True)
+                    validado = time.perf_counter()
+                    movimentos, erros = services.registrar_lote(serializer.validated_data)
+                    gravado = time.perf_counter()
+                    FastJSONRenderer().render([
+                        {'id': m.id, 'empresa': m.empresa_id, 'produto': m.produto_id, 'quantidade': m.quantidade,
+                         'tipo': m.tipo, 'created': m.created}
+                        for m in movimentos
+                    ])
+                    fim = time.perf_counter()
+                    tempos.append((fim - inicio, validado - inicio, gravado - validado, fim - gravado))
+                raise _Desfazer
+        except _Desfazer:
+            pass
+
+        self.stdout.write(f"📊 {linhas_total} movimentações em {options['produtos']} produtos "
+                          f"(dados temporários, desfeitos ao final)")
+        for total, validacao, gravacao, resposta in tempos:
+            self.stdout.write(f'total {total * 1000:8.1f} ms  validação {validacao * 1000:7.1f} ms  '
+                              f'registrar_lote {gravacao * 1000:7.1f} ms  resposta {resposta * 1000:7.1f} ms')
@@ -0,0 +1,17 @@
+# backend/loja/estoque/management/commands/consolidar_estoque.py
+from django.core.management.base import BaseCommand
+from estoque import services
+
+
+class Command(BaseCommand):
+    help = 'Grava fotografias de saldo do livro de estoque (rodar periodicamente, ex.: cron a cada hora).'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--minimo', type=int, default=100,
+            help='Só fotografa produtos com pelo menos N movimentações desde a última fotografia.',
+        )
+
+    def handle(self, *args, **options):
+        total = services.consolidar(minimo=options['minimo'])
+        self.stdout.write(self.style.SUCCESS(f'✅ {total} fotografias de saldo gravadas'))
@@ -0,0 +1,19 @@
+# Generated by Django 5.1.7 on 2026-10-18 15:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('empresa', '0002_empresa_empresa_created_id_idx'),
+        ('estoque', '0001_initial'),
+        ('produto', '0003_produto_produto_created_id_idx'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='estoque',
+            index=models.Index(fields=['created', 'id'], name='estoque_created_id_idx'),
+        ),
+    ]
@@ -0,0 +1,73 @@
+# Generated by Django 5.1.7 on 2026-10-18 15:40
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Max
+from django.utils import timezone
+
+
+def ancorar_saldos(apps, schema_editor):
+    """Normaliza os tipos antigos e grava uma fotografia inicial com o saldo atual de cada produto.
+
+    O histórico anterior não registrava reservas de carrinho/mesa, então o livro
+    antigo não fecha com Produto.estoque: a fotografia inicial ancora o saldo e
+    dali em diante cada alteração gera sua movimentação.
+    """
+    Estoque = apps.get_model('estoque', 'Estoque')
+    SaldoEstoque = apps.get_model('estoque', 'SaldoEstoque')
+    Produto = apps.get_model('produto', 'Produto')
+
+    Estoque.objects.filter(tipo__in=['saída', 'Saída', 'SAIDA', 'Saida']).update(tipo='saida')
+    Estoque.objects.filter(tipo__in=['Entrada', 'ENTRADA']).update(tipo='entrada')
+
+    agora = timezone.now()
+    ultimos = dict(Estoque.objects.values('produto').annotate(ultimo=Max('id')).values_list('produto', 'ultimo'))
+    SaldoEstoque.objects.bulk_create(
+        SaldoEstoque(produto_id=produto_id, saldo=saldo, ultimo_movimento=ultimos.get(produto_id, 0), momento=agora)
+        for produto_id, saldo in Produto.objects.values_list('id', 'estoque').iterator()
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('empresa', '0002_empresa_empresa_created_id_idx'),
+        ('estoque', '0002_estoque_estoque_created_id_idx'),
+        ('produto', '0003_produto_produto_created_id_idx'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SaldoEstoque',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('ultimo_movimento', models.PositiveBigIntegerField(default=0)),
+                ('momento', models.DateTimeField()),
+                ('saldo', models.IntegerField()),
+                ('created', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.AlterField(
+            model_name='estoque',
+            name='tipo',
+            field=models.CharField(choices=[('entrada', 'Entrada'), ('saida', 'Saída'), ('reserva', 'Reserva'), ('estorno', 'Estorno')], max_length=10),
+        ),
+        migrations.AddIndex(
+            model_name='estoque',
+            index=models.Index(fields=['produto', 'id'], name='estoque_produto_id_idx'),
+        ),
+        migrations.AddField(
+            model_name='saldoestoque',
+            name='produto',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='saldos_estoque', to='produto.produto'),
+        ),
+        migrations.AddIndex(
+            model_name='saldoestoque',
+            index=models.Index(fields=['produto', 'momento'], name='saldo_estoque_momento_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='saldoestoque',
+            constraint=models.UniqueConstraint(fields=('produto', 'ultimo_movimento'), name='saldo_estoque_unico'),
+        ),
+        migrations.RunPython(ancorar_saldos, migrations.RunPython.noop),
+    ]
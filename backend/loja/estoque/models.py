@@ -1,30 +1,85 @@
 # backend\loja\estoque\models.py
 from django.db import models
+from django.db.models import Case, F, When
 from empresa.models import Empresa
 from produto.models import Produto
-from django.utils.text import slugify
-from django.utils.crypto import get_random_string
+from loja.slugs import SlugUnicoMixin
+
+class Estoque(SlugUnicoMixin, models.Model):
+    """Livro de movimentações de estoque (somente inclusão).
+
+    Toda alteração de saldo do produto gera uma linha aqui; correções são feitas
+    com uma nova movimentação (estorno/entrada/saída), nunca editando ou apagando.
+    """
+    ENTRADA = 'entrada'
+    SAIDA = 'saida'
+    RESERVA = 'reserva'  # item adicionado ao carrinho/mesa
+    ESTORNO = 'estorno'  # reserva devolvida (item removido, carrinho cancelado)
+    TIPO_CHOICES = [
+        (ENTRADA, 'Entrada'),
+        (SAIDA, 'Saída'),
+        (RESERVA, 'Reserva'),
+        (ESTORNO, 'Estorno'),
+    ]
+    CREDITOS = (ENTRADA, ESTORNO)  # tipos que somam ao saldo; os demais subtraem
+
+    # Toda movimentação do mesmo produto teria o mesmo slug, então ele já nasce com sufixo
+    slug_sempre_com_sufixo = True
 
-class Estoque(models.Model):
     empresa = models.ForeignKey(Empresa, on_delete=models.CASCADE, related_name='estoques')
     produto = models.ForeignKey(Produto, on_delete=models.CASCADE, related_name='entradas_saidas')
     quantidade = models.PositiveIntegerField()
-    tipo = models.CharField(max_length=10)  # 'entrada' ou 'saída'
+    tipo = models.CharField(max_length=10, choices=TIPO_CHOICES)
     slug = models.SlugField(unique=True, blank=True, null=True)
     is_available = models.BooleanField(default=True)
     created = models.DateTimeField(auto_now_add=True) # Quando o registro for criado, a data e hora serão salvas
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['created', 'id'], name='estoque_created_id_idx'),  # paginação por cursor
+            models.Index(fields=['produto', 'id'], name='estoque_produto_id_idx'),  # deltas após a fotografia
+        ]
 
     def __str__(self):
         return f'{self.produto.nome} - {self.quantidade} ({self.tipo})'
-    
+
+    def get_slug_base(self):
+        return self.produto.nome
+
     def save(self, *args, **kwargs):
-        if not self.slug:
-            slug_base = slugify(self.produto.nome)
-            slug = slug_base
-            if Estoque.objects.filter(slug=slug).exists():
-                slug = f'{slug_base}-{get_random_string(5)}'
-            self.slug = slug
-        super(Estoque, self).save(*args, **kwargs)
+        if not self._state.adding:
+            raise ValueError('Movimentações de estoque não podem ser alteradas; registre um estorno.')
+        super().save(*args, **kwargs)
 
+    @classmethod
+    def delta(cls):
+        """Expressão com o efeito da movimentação no saldo (+quantidade ou -quantidade)."""
+        return Case(
+            When(tipo__in=cls.CREDITOS, then=F('quantidade')),
+            default=-F('quantidade'),
+            output_field=models.IntegerField(),
+        )
 
+
+class SaldoEstoque(models.Model):
+    """Fotografia do saldo de um produto até uma movimentação do livro.
+
+    O saldo em qualquer instante é a última fotografia anterior a ele mais as
+    movimentações posteriores à fotografia, sem somar o histórico inteiro.
+    """
+    produto = models.ForeignKey(Produto, on_delete=models.CASCADE, related_name='saldos_estoque')
+    ultimo_movimento = models.PositiveBigIntegerField(default=0)  # id da última movimentação incluída
+    momento = models.DateTimeField()  # created da última movimentação incluída
+    saldo = models.IntegerField()
+    created = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['produto', 'ultimo_movimento'], name='saldo_estoque_unico'),
+        ]
+        indexes = [
+            models.Index(fields=['produto', 'momento'], name='saldo_estoque_momento_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.produto_id}: {self.saldo} em {self.momento}'
@@ -7,3 +7,33 @@ class EstoqueSerializer(serializers.ModelSerializer):
         model = Estoque
         fields = ['id', "empresa", "produto", "quantidade", "tipo", "created"]
 
+    def to_internal_value(self, data):
+        if hasattr(data, 'get') and data.get('tipo') == 'saída':  # o frontend antigo envia com acento
+            data = data.copy()
+            data['tipo'] = Estoque.SAIDA
+        return super().to_internal_value(data)
+
+
+class MovimentoLoteSerializer(serializers.Serializer):
+    """Uma linha do POST em lote. Só valida o formato: produtos e empresas são
+    conferidos de uma vez pelo serviço (registrar_lote), sem uma consulta por linha."""
+    empresa = serializers.IntegerField()
+    produto = serializers.IntegerField()
+    quantidade = serializers.IntegerField(min_value=1)
+    tipo = serializers.ChoiceField(choices=Estoque.TIPO_CHOICES)
+
+    TIPOS = dict(Estoque.TIPO_CHOICES)
+
+    def to_internal_value(self, data):
+        if hasattr(data, 'get') and data.get('tipo') == 'saída':
+            data = data.copy()
+            data['tipo'] = Estoque.SAIDA
+        # Linha já no formato certo (JSON com inteiros e tipo válido) dispensa a validação campo
+        # a campo, que em lotes de milhares de linhas custa mais que a gravação; qualquer outra
+        # coisa passa pelos campos, com as mensagens de erro do DRF
+        if isinstance(data, dict):
+            linha = {campo: data.get(campo) for campo in ('empresa', 'produto', 'quantidade', 'tipo')}
+            if (all(type(linha[campo]) is int for campo in ('empresa', 'produto', 'quantidade'))
+                    and linha['quantidade'] >= 1 and linha['tipo'] in self.TIPOS):
+                return linha
+        return super().to_internal_value(data)
@@ -0,0 +1,286 @@
+# backend/loja/estoque/services.py
+"""Movimentação de estoque.
+
+``Produto.estoque`` é só o saldo corrente materializado (e a trava do UPDATE
+condicional); a fonte da verdade é o livro ``Estoque``. Toda função daqui altera
+o saldo e grava a movimentação correspondente na mesma transação.
+"""
+from django.db import transaction
+from django.dispatch import Signal
+from django.db.models import Case, Count, F, IntegerField, Max, OuterRef, Q, Subquery, Sum, When
+from django.db.models.functions import Coalesce
+from alteracoes import registro
+from empresa.models import Empresa
+from loja import slugs
+from produto.models import Produto
+from .models import Estoque, SaldoEstoque
+
+# Enviado dentro da transação de cada baixa/devolução: saldos=[(produto_id, empresa_id, novo saldo)].
+# Os saldos mudam por UPDATE, que não dispara post_save (ex.: o cardápio acompanha o "esgotado").
+saldos_alterados = Signal()
+
+
+class EstoqueInsuficiente(Exception):
+    """Não há saldo suficiente para reservar a quantidade pedida."""
+
+    def __init__(self, produto_id, quantidade):
+        self.produto_id = produto_id
+        self.quantidade = quantidade
+        super().__init__(f'Estoque insuficiente para o produto {produto_id} (pedido: {quantidade})')
+
+
+def _registrar(produto_id, tipo, quantidade):
+    """Grava a movimentação de um saldo que acabou de ser alterado. Retorna (saldo, movimentação)."""
+    produto = Produto.objects.only('estoque', 'empresa_id', 'nome').get(pk=produto_id)
+    movimento = Estoque.objects.create(empresa_id=produto.empresa_id, produto=produto, quantidade=quantidade, tipo=tipo)
+    registro.registrar_ids(Produto, [produto_id], registro.ALTERADO)
+    saldos_alterados.send(sender=Produto, saldos=[(produto_id, produto.empresa_id, produto.estoque)])
+    return produto.estoque, movimento
+
+
+def _saldo(produto_id):
+    return Produto.objects.filter(pk=produto_id).values_list('estoque', flat=True).first()
+
+
+def _debitar(produto_id, quantidade, tipo):
+    """O UPDATE condicional (estoque >= quantidade) é a própria trava: dois garçons
+    pedindo o mesmo chopp ao mesmo tempo nunca deixam o saldo negativo."""
+    quantidade = int(quantidade)
+    with transaction.atomic():
+        if quantidade <= 0:
+            return _saldo(produto_id), None
+        atualizados = Produto.objects.filter(pk=produto_id, estoque__gte=quantidade).update(
+            estoque=F('estoque') - quantidade
+        )
+        if not atualizados:
+            raise EstoqueInsuficiente(produto_id, quantidade)
+        return _registrar(produto_id, tipo, quantidade)
+
+
+def _creditar(produto_id, quantidade, tipo):
+    quantidade = int(quantidade)
+    with transaction.atomic():
+        if quantidade <= 0:
+            return _saldo(produto_id), None
+        Produto.objects.filter(pk=produto_id).update(estoque=F('estoque') + quantidade)
+        return _registrar(produto_id, tipo, quantidade)
+
+
+def reservar(produto_id, quantidade):
+    """Decrementa o estoque somente se houver saldo suficiente (movimentação 'reserva'). Retorna o novo saldo."""
+    return _debitar(produto_id, quantidade, Estoque.RESERVA)[0]
+
+
+def reservar_lote(quantidades):
+    """Reserva vários produtos de uma vez ({produto_id: quantidade}), tudo ou nada.
+
+    Os saldos são conferidos numa consulta e baixados num único UPDATE condicional
+    (CASE por produto); se o UPDATE alcançar menos linhas que o esperado, outro
+    pedido levou o saldo no meio do caminho e nada é gravado.
+    Retorna {produto_id: Produto} (valores lidos antes da baixa); ids inexistentes ficam de fora.
+    """
+    quantidades = {produto_id: int(q) for produto_id, q in quantidades.items() if int(q) > 0}
+    with transaction.atomic():
+        produtos = Produto.objects.select_for_update().in_bulk(list(quantidades))
+        quantidades = {produto_id: q for produto_id, q in quantidades.items() if produto_id in produtos}
+        for produto_id, quantidade in quantidades.items():
+            if produtos[produto_id].estoque < quantidade:
+                raise EstoqueInsuficiente(produto_id, quantidade)
+        if not quantidades:
+            return produtos
+
+        filtro = Q()
+        baixas = []
+        for produto_id, quantidade in quantidades.items():
+            filtro |= Q(pk=produto_id, estoque__gte=quantidade)
+            baixas.append(When(pk=produto_id, then=F('estoque') - quantidade))
+        atualizados = Produto.objects.filter(filtro).update(estoque=Case(*baixas, default=F('estoque'), output_field=IntegerField()))
+        if atualizados != len(quantidades):
+            # Só acontece se o saldo mudou entre a leitura e o UPDATE; o mais justo é o provável culpado
+            produto_id = min(quantidades, key=lambda p: produtos[p].estoque - quantidades[p])
+            raise EstoqueInsuficiente(produto_id, quantidades[produto_id])
+
+        slugs.criar_em_lote(Estoque, [
+            Estoque(empresa_id=produtos[produto_id].empresa_id, produto=produtos[produto_id],
+                    quantidade=quantidade, tipo=Estoque.RESERVA)
+            for produto_id, quantidade in quantidades.items()
+        ], Estoque.get_slug_base)
+        registro.registrar_ids(Produto, list(quantidades), registro.ALTERADO)
+        saldos_alterados.send(sender=Produto, saldos=[
+            (produto_id, produtos[produto_id].empresa_id, produtos[produto_id].estoque - quantidade)
+            for produto_id, quantidade in quantidades.items()
+        ])
+    return produtos
+
+
+def liberar_lote(quantidades, tipo=Estoque.ESTORNO):
+    """Devolve ao estoque vários produtos de uma vez ({produto_id: quantidade}).
+
+    Um UPDATE (CASE por produto) soma as quantidades aos saldos e as movimentações
+    entram num bulk_create; ids inexistentes são ignorados. Retorna {produto_id: quantidade} devolvido.
+    """
+    quantidades = {produto_id: int(q) for produto_id, q in quantidades.items() if int(q) > 0}
+    if not quantidades:
+        return {}
+    with transaction.atomic():
+        produtos = Produto.objects.select_for_update().only('estoque', 'empresa_id', 'nome').in_bulk(list(quantidades))
+        quantidades = {produto_id: q for produto_id, q in quantidades.items() if produto_id in produtos}
+        if not quantidades:
+            return {}
+        Produto.objects.filter(pk__in=list(quantidades)).update(estoque=Case(
+            *[When(pk=produto_id, then=F('estoque') + quantidade) for produto_id, quantidade in quantidades.items()],
+            default=F('estoque'), output_field=IntegerField(),
+        ))
+        slugs.criar_em_lote(Estoque, [
+            Estoque(empresa_id=produtos[produto_id].empresa_id, produto=produtos[produto_id], quantidade=quantidade, tipo=tipo)
+            for produto_id, quantidade in quantidades.items()
+        ], Estoque.get_slug_base)
+        registro.registrar_ids(Produto, list(quantidades), registro.ALTERADO)
+        saldos_alterados.send(sender=Produto, saldos=[
+            (produto_id, produtos[produto_id].empresa_id, produtos[produto_id].estoque + quantidade)
+            for produto_id, quantidade in quantidades.items()
+        ])
+    return quantidades
+
+
+def liberar(produto_id, quantidade, tipo=Estoque.ESTORNO):
+    """Devolve ao estoque uma quantidade reservada anteriormente (ou uma entrada, com tipo='entrada').
+    Retorna o novo saldo."""
+    return _creditar(produto_id, quantidade, tipo)[0]
+
+
+def ajustar(produto_id, diferenca):
+    """Reserva (diferença positiva) ou libera (diferença negativa) estoque."""
+    if diferenca > 0:
+        return reservar(produto_id, diferenca)
+    return liberar(produto_id, -diferenca)
+
+
+def baixar(produto_id, quantidade):
+    """Saída de estoque sem deixá-lo negativo (saldo mínimo zero). Retorna o novo saldo.
+
+    A linha do produto é travada para que a movimentação registre o que de fato saiu.
+    """
+    quantidade = int(quantidade)
+    with transaction.atomic():
+        saldo = Produto.objects.select_for_update().filter(pk=produto_id).values_list('estoque', flat=True).first()
+        saida = min(quantidade, saldo or 0)
+        if saida <= 0:
+            return saldo
+        Produto.objects.filter(pk=produto_id).update(estoque=F('estoque') - saida)
+        return _registrar(produto_id, Estoque.SAIDA, saida)[0]
+
+
+def movimentar(produto_id, tipo, quantidade):
+    """Registra uma movimentação avulsa (POST /estoques/). Saídas e reservas sem saldo levantam
+    EstoqueInsuficiente. Retorna a movimentação criada."""
+    if tipo in Estoque.CREDITOS:
+        return _creditar(produto_id, quantidade, tipo)[1]
+    return _debitar(produto_id, quantidade, tipo)[1]
+
+
+def registrar_lote(linhas):
+    """Registra um lote de movimentações (ex.: entrega de fornecedor) de uma só vez.
+
+    ``linhas`` são dicts já validados (empresa, produto, quantidade, tipo). Produtos e
+    empresas são buscados numa consulta cada, os saldos são conferidos em memória
+    (com as linhas dos produtos travadas) e tudo é gravado com bulk_update/bulk_create
+    numa transação. Se alguma linha falhar nada é gravado.
+    Retorna (movimentações, erros), com ``erros`` alinhado às linhas ({} para as válidas).
+    """
+    linhas = list(linhas)
+    erros = [{} for _ in linhas]
+    with transaction.atomic():
+        produtos = (
+            Produto.objects.select_for_update().only('estoque', 'empresa_id', 'nome')
+            .in_bulk({linha['produto'] for linha in linhas})
+        )
+        empresas = set(Empresa.objects.filter(id__in={linha['empresa'] for linha in linhas}).values_list('id', flat=True))
+        saldos = {produto_id: produto.estoque for produto_id, produto in produtos.items()}
+
+        movimentos = []
+        for erro, linha in zip(erros, linhas):
+            produto = produtos.get(linha['produto'])
+            if produto is None:
+                erro['produto'] = [f"Produto {linha['produto']} não encontrado."]
+            if linha['empresa'] not in empresas:
+                erro['empresa'] = [f"Empresa {linha['empresa']} não encontrada."]
+            elif produto is not None and produto.empresa_id != linha['empresa']:
+                erro['empresa'] = [f"O produto {produto.id} não pertence à empresa {linha['empresa']}."]
+            if erro:
+                continue
+            quantidade = linha['quantidade']
+            delta = quantidade if linha['tipo'] in Estoque.CREDITOS else -quantidade
+            if saldos[produto.id] + delta < 0:
+                erro['quantidade'] = [f'Estoque insuficiente para o produto {produto.id} (saldo: {saldos[produto.id]}).']
+                continue
+            saldos[produto.id] += delta
+            movimentos.append(Estoque(empresa_id=produto.empresa_id, produto_id=produto.id, quantidade=quantidade, tipo=linha['tipo']))
+
+        if any(erros):
+            return [], erros
+
+        alterados = []
+        for produto_id, produto in produtos.items():
+            if saldos[produto_id] != produto.estoque:
+                produto.estoque = saldos[produto_id]
+                alterados.append(produto)
+        Produto.objects.bulk_update(alterados, ['estoque'], batch_size=500)
+        registro.registrar_ids(Produto, [produto.id for produto in alterados], registro.ALTERADO)
+        saldos_alterados.send(sender=Produto, saldos=[(produto.id, produto.empresa_id, produto.estoque) for produto in alterados])
+        slugs.criar_em_lote(Estoque, movimentos, lambda movimento: produtos[movimento.produto_id].nome)
+    return movimentos, []
+
+
+def saldo(produto_id, em=None):
+    """Saldo do produto agora (ou no instante ``em``): última fotografia + movimentações seguintes."""
+    fotografias = SaldoEstoque.objects.filter(produto_id=produto_id)
+    movimentos = Estoque.objects.filter(produto_id=produto_id)
+    if em is not None:
+        fotografias = fotografias.filter(momento__lte=em)
+        movimentos = movimentos.filter(created__lte=em)
+    fotografia = fotografias.order_by('-ultimo_movimento').values_list('saldo', 'ultimo_movimento').first()
+    base, ultimo_movimento = fotografia or (0, 0)
+    delta = movimentos.filter(id__gt=ultimo_movimento).aggregate(total=Sum(Estoque.delta()))['total']
+    return base + (delta or 0)
+
+
+def consolidar(produtos=None, minimo=1):
+    """Grava uma nova fotografia para cada produto com pelo menos ``minimo`` movimentações
+    desde a anterior. Tudo em consultas agrupadas, sem percorrer o livro produto a produto.
+    Retorna quantas fotografias foram criadas."""
+    anteriores = SaldoEstoque.objects.filter(produto=OuterRef('produto')).order_by('-ultimo_movimento')
+    pendentes = Estoque.objects.filter(
+        id__gt=Coalesce(Subquery(anteriores.values('ultimo_movimento')[:1]), 0)
+    )
+    if produtos is not None:
+        pendentes = pendentes.filter(produto__in=produtos)
+    grupos = list(
+        pendentes.values('produto')
+        .annotate(delta=Sum(Estoque.delta()), ultimo=Max('id'), movimentos=Count('id'))
+        .filter(movimentos__gte=minimo)
+        .order_by()
+    )
+    if not grupos:
+        return 0
+
+    produto_ids = [grupo['produto'] for grupo in grupos]
+    bases = dict(
+        SaldoEstoque.objects.filter(produto_id__in=produto_ids, ultimo_movimento=Subquery(anteriores.values('ultimo_movimento')[:1]))
+        .values_list('produto_id', 'saldo')
+    )
+    momentos = dict(Estoque.objects.filter(id__in=[grupo['ultimo'] for grupo in grupos]).values_list('id', 'created'))
+
+    SaldoEstoque.objects.bulk_create(
+        [
+            SaldoEstoque(
+                produto_id=grupo['produto'],
+                ultimo_movimento=grupo['ultimo'],
+                momento=momentos[grupo['ultimo']],
+                saldo=bases.get(grupo['produto'], 0) + grupo['delta'],
+            )
+            for grupo in grupos
+        ],
+        ignore_conflicts=True,  # outra consolidação concorrente já gravou a mesma fotografia
+    )
+    return len(grupos)
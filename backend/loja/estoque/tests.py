@@ -1,3 +1,235 @@
-from django.test import TestCase
+import json
+import threading
+import uuid
+from datetime import datetime, timezone as dt_timezone
+from decimal import Decimal
+from io import StringIO
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.core.management import call_command
+
+from django.db import connection, connections
+from django.test import TestCase, TransactionTestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from rest_framework.renderers import JSONRenderer
+
+from loja.renderers import FastJSONRenderer
+from loja.testing import cliente_autenticado, criar_produto
+from . import services as estoque_service
+from .models import Estoque, SaldoEstoque
+from .services import EstoqueInsuficiente
+
+
+class ReservaEstoqueTests(TestCase):
+    def setUp(self):
+        self.produto = criar_produto(estoque=5)
+
+    def test_reservar_decrementa_no_banco(self):
+        self.assertEqual(estoque_service.reservar(self.produto.id, 3), 2)
+
+    def test_reservar_sem_saldo_nao_altera_estoque(self):
+        with self.assertRaises(EstoqueInsuficiente):
+            estoque_service.reservar(self.produto.id, 6)
+        self.produto.refresh_from_db()
+        self.assertEqual(self.produto.estoque, 5)
+
+    def test_liberar_devolve_estoque(self):
+        estoque_service.reservar(self.produto.id, 5)
+        self.assertEqual(estoque_service.liberar(self.produto.id, 2), 2)
+
+    def test_baixar_nao_fica_negativo(self):
+        self.assertEqual(estoque_service.baixar(self.produto.id, 10), 0)
+
+
+class LivroEstoqueTests(TestCase):
+    def setUp(self):
+        self.produto = criar_produto(estoque=10)
+
+    def test_cada_alteracao_grava_movimentacao(self):
+        estoque_service.reservar(self.produto.id, 4)
+        estoque_service.liberar(self.produto.id, 1)
+        estoque_service.baixar(self.produto.id, 20)  # só sai o que havia (7)
+        tipos = list(Estoque.objects.filter(produto=self.produto).order_by('id').values_list('tipo', 'quantidade'))
+        self.assertEqual(tipos, [('entrada', 10), ('reserva', 4), ('estorno', 1), ('saida', 7)])
+        self.assertEqual(estoque_service.saldo(self.produto.id), 0)
+
+    def test_edicao_manual_do_saldo_vira_ajuste(self):
+        produto = type(self.produto).objects.get(pk=self.produto.pk)
+        produto.estoque = 4
+        produto.save()
+        self.assertEqual(Estoque.objects.filter(produto=produto).latest('id').tipo, Estoque.SAIDA)
+        self.assertEqual(estoque_service.saldo(produto.id), 4)
+
+    def test_edicao_de_instancia_velha_nao_desfaz_reserva(self):
+        produto = type(self.produto).objects.get(pk=self.produto.pk)  # lido com saldo 10
+        estoque_service.reservar(self.produto.id, 3)  # outro garçom, por UPDATE com F()
+        produto.nome = 'Chopp Escuro'
+        produto.save()
+        produto.refresh_from_db()
+        self.assertEqual((produto.nome, produto.estoque), ('Chopp Escuro', 7))
+
+        produto = type(self.produto).objects.get(pk=self.produto.pk)
+        estoque_service.reservar(self.produto.id, 2)
+        produto.estoque += 5  # o gerente soma 5 ao saldo que viu
+        produto.save()
+        self.assertEqual(produto.estoque, 10)
+        self.assertEqual(estoque_service.saldo(produto.id), 10)
+        movimento = Estoque.objects.filter(produto=produto).latest('id')
+        self.assertEqual((movimento.tipo, movimento.quantidade), (Estoque.ENTRADA, 5))
+
+    def test_saldo_em_instante_passado(self):
+        estoque_service.reservar(self.produto.id, 3)
+        estoque_service.consolidar()
+        antes = timezone.now()
+        estoque_service.reservar(self.produto.id, 2)
+        self.assertEqual(estoque_service.saldo(self.produto.id, em=antes), 7)
+        self.assertEqual(estoque_service.saldo(self.produto.id), 5)
+
+    def test_saldo_le_so_movimentacoes_apos_a_fotografia(self):
+        for _ in range(30):
+            estoque_service.reservar(self.produto.id, 1)
+            estoque_service.liberar(self.produto.id, 1)
+        self.assertEqual(estoque_service.consolidar(), 1)
+        self.assertEqual(estoque_service.consolidar(), 0)  # nada novo desde a fotografia
+        estoque_service.reservar(self.produto.id, 2)
+        fotografia = SaldoEstoque.objects.get(produto=self.produto)
+        self.assertEqual(fotografia.saldo, 10)
+        with CaptureQueriesContext(connection) as contexto:
+            self.assertEqual(estoque_service.saldo(self.produto.id), 8)
+        self.assertEqual(len(contexto), 2)  # fotografia + soma das movimentações com id > ultimo_movimento
+
+    def test_post_saida_com_acento_e_sem_saldo(self):
+        client = cliente_autenticado()
+        dados = {'empresa': self.produto.empresa_id, 'produto': self.produto.id, 'quantidade': 3, 'tipo': 'saída'}
+        response = client.post('/api/estoques/', dados, format='json')
+        self.assertEqual(response.status_code, 201, response.content)
+        self.assertEqual(response.data['tipo'], 'saida')
+        response = client.post('/api/estoques/', {**dados, 'quantidade': 50}, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.produto.refresh_from_db()
+        self.assertEqual(self.produto.estoque, 7)
+        self.assertEqual(client.delete(f'/api/estoques/{Estoque.objects.latest("id").slug}/').status_code, 405)
+
+
+class ReservaEstoqueConcorrenteTests(TransactionTestCase):
+    """N garçons pedindo o mesmo chopp ao mesmo tempo nunca vendem mais que o barril."""
+
+    ESCRITORES = 20
+    ESTOQUE = 7
+
+    def setUp(self):
+        if connection.vendor == 'sqlite' and connection.is_in_memory_db():
+            self.skipTest('O banco de testes em memória não aceita conexões concorrentes')
+
+    def test_sem_venda_acima_do_estoque(self):
+        produto = criar_produto(estoque=self.ESTOQUE)
+        barreira = threading.Barrier(self.ESCRITORES)
+        resultados = []
+        trava = threading.Lock()
+
+        def garcom():
+            try:
+                barreira.wait()
+                try:
+                    estoque_service.reservar(produto.id, 1)
+                    resultado = 'ok'
+                except EstoqueInsuficiente:
+                    resultado = 'sem-estoque'
+                with trava:
+                    resultados.append(resultado)
+            finally:
+                connections.close_all()
+
+        threads = [threading.Thread(target=garcom) for _ in range(self.ESCRITORES)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        produto.refresh_from_db()
+        self.assertEqual(len(resultados), self.ESCRITORES)
+        self.assertEqual(resultados.count('ok'), self.ESTOQUE)
+        self.assertEqual(produto.estoque, 0)
+        self.assertEqual(estoque_service.saldo(produto.id), 0)  # o livro fecha com o saldo
+
+
+class LoteEstoqueTests(TestCase):
+    def setUp(self):
+        self.client = cliente_autenticado()
+        self.produto = criar_produto(estoque=5)
+        self.outro = criar_produto(empresa=self.produto.empresa, estoque=0)
+
+    def linha(self, produto, quantidade, tipo='entrada'):
+        return {'empresa': produto.empresa_id, 'produto': produto.id, 'quantidade': quantidade, 'tipo': tipo}
+
+    def test_lote_grava_tudo_de_uma_vez(self):
+        linhas = [self.linha(self.outro, 2) for _ in range(50)] + [self.linha(self.produto, 5, 'saída')]
+        with CaptureQueriesContext(connection) as contexto:
+            response = self.client.post('/api/estoques/', linhas, format='json')
+        self.assertEqual(response.status_code, 201, response.content)
+        self.assertEqual(len(response.data), 51)
+        self.assertEqual(Estoque.objects.filter(pk__in={linha['id'] for linha in response.data}).count(), 51)
+        self.assertLessEqual(len(contexto), 10)  # savepoints + produtos + empresas + bulk_update + bulk_create + log de alterações
+        self.outro.refresh_from_db()
+        self.produto.refresh_from_db()
+        self.assertEqual((self.outro.estoque, self.produto.estoque), (100, 0))
+        self.assertEqual(estoque_service.saldo(self.outro.id), 100)
+
+    def test_erros_por_linha_e_nada_gravado(self):
+        linhas = [
+            self.linha(self.outro, 1),
+            {**self.linha(self.outro, 1), 'produto': 999999},
+            self.linha(self.produto, 6, 'saida'),
+        ]
+        antes = Estoque.objects.count()
+        response = self.client.post('/api/estoques/', linhas, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data[0], {})
+        self.assertIn('produto', response.data[1])
+        self.assertIn('quantidade', response.data[2])
+        self.assertEqual(Estoque.objects.count(), antes)
+
+    def test_benchmark_desfaz_os_dados(self):
+        antes = Estoque.objects.count()
+        saida = StringIO()
+        call_command('benchmark_lote_estoque', linhas=50, produtos=5, repeticoes=1, stdout=saida)
+        self.assertIn('registrar_lote', saida.getvalue())
+        self.assertEqual(Estoque.objects.count(), antes)
+
+
+class JSONRapidoTests(TestCase):
+    def test_renderer_igual_ao_do_drf(self):
+        dados = {'venda': Decimal('12.90'), 'referencia': uuid.UUID(int=7), 1: 'chave int',
+                 'created': datetime(2025, 1, 2, 3, 4, 5, tzinfo=dt_timezone.utc), 'itens': [{'nome': 'Açaí'}]}
+        self.assertEqual(json.loads(FastJSONRenderer().render(dados)), json.loads(JSONRenderer().render(dados)))
+
+    def test_api_usa_o_renderer_e_o_parser(self):
+        client = cliente_autenticado()
+        produto = criar_produto()
+        resposta = client.post('/api/estoques/', data=f'{{"empresa": {produto.empresa_id}, "produto": {produto.id}, '
+                                                     f'"quantidade": 2, "tipo": "entrada"}}', content_type='application/json')
+        self.assertEqual(resposta.status_code, 201)
+        self.assertIsInstance(resposta.accepted_renderer, FastJSONRenderer)
+        invalido = client.post('/api/estoques/', data='{"empresa": ', content_type='application/json')
+        self.assertEqual(invalido.status_code, 400)
+
+    def test_benchmark(self):
+        saida = StringIO()
+        call_command('benchmark_json', linhas=50, repeticoes=1, stdout=saida)
+        self.assertIn('Fast', saida.getvalue())
+
+
+class ExportacaoEstoqueTests(TestCase):
+    def test_csv_em_streaming_com_filtro_de_empresa(self):
+        produto = criar_produto()
+        criar_produto(nome='Outra')
+        client = cliente_autenticado(User.objects.create(username='admin', is_staff=True))
+        resposta = client.get('/api/estoques/exportar/', {'formato': 'csv', 'empresa': produto.empresa_id})
+        self.assertEqual(resposta.status_code, 200)
+        self.assertTrue(resposta.streaming)
+        linhas = b''.join(resposta.streaming_content).decode().splitlines()
+        self.assertEqual(linhas[0], 'id,empresa_id,produto_id,produto__nome,tipo,quantidade,created')
+        self.assertEqual(len(linhas), 2)
+        self.assertIn(',entrada,100,', linhas[1])
@@ -4,6 +4,8 @@ from . import views
 
 urlpatterns = [
     path("estoques/", views.estoques, name="estoques"),
+    path("estoques/exportar/", views.exportar_estoques, name="estoques-exportar"),
+    path("estoques/saldo/<int:produto_id>/", views.saldo_estoque, name="estoque-saldo"),
     path("estoques/<slug:slug>/", views.estoque_detail, name="estoque-detail"),
     path("estoques-search/", views.search_estoques, name='estoques-search'),    
 ]
@@ -1,10 +1,17 @@
 # backend/loja/estoque/views.py
 from rest_framework.response import Response
-from rest_framework.decorators import api_view
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import IsAdminUser
 from rest_framework import status
 from .models import Estoque
-from .serializers import EstoqueSerializer
+from .serializers import EstoqueSerializer, MovimentoLoteSerializer
+from . import services
+from .services import EstoqueInsuficiente
+from loja.exportacao import exportar
+from loja.pagination import paginar
 from django.db.models import Q
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
 
 @api_view(['GET'])
 def search_estoques(request):
@@ -20,51 +27,72 @@ def search_estoques(request):
 def estoques(request):
     if request.method == 'GET':
         estoques = Estoque.objects.all()
-        serializer = EstoqueSerializer(estoques, many=True)
-        return Response(serializer.data)
+        return paginar(request, estoques, EstoqueSerializer)
     
     elif request.method == 'POST': # Adicionar POST para criar uma nova movimentação de entrada ou saída de estoque
-        print(f'🚀 Recebendo requisição POST para /estoques/: {request.data}')
         if isinstance(request.data, list):
-            responses = []
-            for item in request.data:
-                serializer = EstoqueSerializer(data=item)
-                if serializer.is_valid():
-                    serializer.save()
-                    responses.append(serializer.data)
-                else:
-                    return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
-            return Response(responses, status=status.HTTP_201_CREATED)
+            print(f'🚀 Recebendo lote de {len(request.data)} movimentações em /estoques/')
+            serializer = MovimentoLoteSerializer(data=request.data, many=True)
+            if not serializer.is_valid():
+                return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+            movimentos, erros = services.registrar_lote(serializer.validated_data)
+            if erros:
+                return Response(erros, status=status.HTTP_400_BAD_REQUEST)
+            # Mesmo formato do EstoqueSerializer, montado direto: em lotes de milhares de linhas o
+            # ModelSerializer custa mais que a própria gravação
+            return Response([
+                {'id': m.id, 'empresa': m.empresa_id, 'produto': m.produto_id, 'quantidade': m.quantidade,
+                 'tipo': m.tipo, 'created': m.created}
+                for m in movimentos
+            ], status=status.HTTP_201_CREATED)
         else:
+            print(f'🚀 Recebendo requisição POST para /estoques/: {request.data}')
             serializer = EstoqueSerializer(data=request.data)
             if serializer.is_valid():
-                serializer.save()
-                return Response(serializer.data, status=status.HTTP_201_CREATED)
+                try:
+                    movimento = _movimentar(serializer)
+                except EstoqueInsuficiente as e:
+                    return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+                return Response(EstoqueSerializer(movimento).data, status=status.HTTP_201_CREATED)
             return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
-@api_view(['GET', 'PUT', 'DELETE'])
+
+def _movimentar(serializer):
+    """Aplica a movimentação validada ao saldo do produto (o serviço grava a linha do livro)."""
+    dados = serializer.validated_data
+    return services.movimentar(dados['produto'].id, dados['tipo'], dados['quantidade'])
+
+
+# O livro de estoque é somente de inclusão: sem PUT/DELETE, correções são novas movimentações
+@api_view(['GET'])
 def estoque_detail(request, slug):
     try:
         estoque = Estoque.objects.get(slug=slug)
     except Estoque.DoesNotExist:
         return Response(status=status.HTTP_404_NOT_FOUND)
 
-    if request.method == 'GET':
-        serializer = EstoqueSerializer(estoque)
-        return Response(serializer.data)
-
-    elif request.method == 'PUT':
-        serializer = EstoqueSerializer(estoque, data=request.data)
-        if serializer.is_valid():
-            serializer.save()
-            return Response(serializer.data)
-        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
-
-    elif request.method == 'DELETE':
-        estoque.delete()
-        return Response(status=status.HTTP_204_NO_CONTENT)
-    
+    serializer = EstoqueSerializer(estoque)
+    return Response(serializer.data)
 
 
+@api_view(['GET'])
+def saldo_estoque(request, produto_id):
+    """Saldo do produto agora ou em um instante passado (?em=2025-01-31T23:59:59)."""
+    em = request.query_params.get('em')
+    if em:
+        momento = parse_datetime(em)
+        if momento is None:
+            return Response({"error": "Parâmetro 'em' inválido (use ISO 8601)"}, status=status.HTTP_400_BAD_REQUEST)
+        if timezone.is_naive(momento):
+            momento = timezone.make_aware(momento)
+    else:
+        momento = None
+    return Response({'produto': produto_id, 'saldo': services.saldo(produto_id, em=momento), 'em': momento})
 
 
+# Exportação para a administração: streaming linha a linha (?formato=ndjson|csv, ?empresa=, ?inicio=, ?fim=)
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def exportar_estoques(request):
+    campos = ('id', 'empresa_id', 'produto_id', 'produto__nome', 'tipo', 'quantidade', 'created')
+    return exportar(request, Estoque.objects.all(), campos, 'estoques')
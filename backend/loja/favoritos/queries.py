@@ -0,0 +1,8 @@
+# backend/loja/favoritos/queries.py
+from .models import Favorito
+
+
+def favoritos(queryset=None):
+    """Favoritos prontos para o FavoritoSerializer (nome, preço, imagem e descrição do produto)."""
+    queryset = Favorito.objects.all() if queryset is None else queryset
+    return queryset.select_related('produto')
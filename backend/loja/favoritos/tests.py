@@ -1,3 +1,19 @@
 from django.test import TestCase
 
-# Create your tests here.
+from loja.testing import QueryCountMixin, cliente_autenticado, criar_empresa, criar_produto, criar_usuario
+from .models import Favorito
+
+
+class FavoritoQueryCountTests(QueryCountMixin, TestCase):
+    def setUp(self):
+        self.empresa = criar_empresa()
+        self.usuario = criar_usuario()
+        self.client = cliente_autenticado(self.usuario)
+
+    def criar_favoritos(self, quantidade):
+        for _ in range(quantidade):
+            Favorito.objects.create(usuario=self.usuario, produto=criar_produto(empresa=self.empresa))
+
+    def test_lista_de_favoritos(self):
+        # usuário + favoritos com produto
+        self.assertNumQueriesFixo(2, self.client, f'/api/favoritos/?user_id={self.usuario.id}', self.criar_favoritos)
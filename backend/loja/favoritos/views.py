@@ -5,6 +5,7 @@ from rest_framework.response import Response
 from rest_framework import status
 from .models import Favorito
 from .serializers import FavoritoSerializer
+from . import queries
 from produto.models import Produto
 from django.contrib.auth.models import User
 
@@ -17,7 +18,7 @@ def listar_favoritos(request):
     
     try:
         usuario = User.objects.get(id=user_id)
-        favoritos = Favorito.objects.filter(usuario=usuario)
+        favoritos = queries.favoritos().filter(usuario=usuario)
         serializer = FavoritoSerializer(favoritos, many=True)
         return Response(serializer.data, status=status.HTTP_200_OK)
     except User.DoesNotExist:
@@ -0,0 +1,82 @@
+# backend/loja/idempotencia/decorators.py
+"""Idempotency-Key para endpoints que baixam estoque ou criam pedidos.
+
+O Wi-Fi do bar faz o frontend reenviar a mesma requisição; com o cabeçalho
+``Idempotency-Key`` a primeira execução grava a resposta e as repetições recebem
+a mesma resposta (com ``Idempotent-Replayed: true``) sem executar a view de novo.
+
+A chave é reservada com um INSERT na mesma transação da view: uma repetição que
+chega enquanto a primeira ainda roda espera o commit dela no índice único e
+então devolve a resposta gravada. Respostas 5xx (ou exceções) desfazem tudo e a
+chave fica livre para nova tentativa.
+"""
+import hashlib
+import json
+from datetime import timedelta
+from functools import wraps
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.response import Response
+
+from .models import ChaveIdempotencia
+
+CABECALHO = 'Idempotency-Key'
+TTL = timedelta(seconds=getattr(settings, 'IDEMPOTENCIA_TTL', 24 * 60 * 60))
+
+
+def _hash(texto):
+    return hashlib.sha256(texto.encode()).hexdigest()
+
+
+def _repetir(registro, requisicao):
+    if registro.requisicao != requisicao:
+        return Response({"error": f"{CABECALHO} já usada com outro corpo de requisição"},
+                        status=status.HTTP_422_UNPROCESSABLE_ENTITY)
+    return Response(registro.resposta, status=registro.status_code, headers={'Idempotent-Replayed': 'true'})
+
+
+def idempotente(view):
+    """Use abaixo do @api_view. Sem o cabeçalho a view roda normalmente."""
+    @wraps(view)
+    def _view(request, *args, **kwargs):
+        chave_cliente = request.headers.get(CABECALHO)
+        if not chave_cliente:
+            return view(request, *args, **kwargs)
+        if len(chave_cliente) > 255:
+            return Response({"error": f"{CABECALHO} muito longa (máx. 255)"}, status=status.HTTP_400_BAD_REQUEST)
+
+        usuario = request.user.pk if request.user.is_authenticated else ''
+        chave = _hash(f'{usuario}\n{request.method}\n{request.path}\n{chave_cliente}')
+        requisicao = _hash(json.dumps(request.data, sort_keys=True, cls=DjangoJSONEncoder))
+
+        registro = ChaveIdempotencia.objects.filter(chave=chave).first()
+        agora = timezone.now()
+        if registro and registro.expira > agora:
+            print(f"🔁 {CABECALHO} repetida em {request.path}: devolvendo a resposta gravada")
+            return _repetir(registro, requisicao)
+
+        with transaction.atomic():
+            try:
+                with transaction.atomic():
+                    if registro:  # vencida: a chave pode ser usada de novo
+                        registro.delete()
+                    ChaveIdempotencia.objects.create(chave=chave, requisicao=requisicao, expira=agora + TTL)
+            except IntegrityError:
+                registro = None  # outra requisição com a mesma chave terminou primeiro
+            else:
+                response = view(request, *args, **kwargs)
+                if response.status_code >= 500 or not hasattr(response, 'data'):
+                    transaction.set_rollback(True)
+                    return response
+                ChaveIdempotencia.objects.filter(chave=chave).update(status_code=response.status_code, resposta=response.data)
+                return response
+
+        registro = ChaveIdempotencia.objects.filter(chave=chave).first()
+        if registro is None:
+            return Response({"error": "Requisição com a mesma chave em andamento; tente de novo"}, status=status.HTTP_409_CONFLICT)
+        return _repetir(registro, requisicao)
+    return _view
@@ -0,0 +1,12 @@
+# backend/loja/idempotencia/management/commands/limpar_idempotencia.py
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from idempotencia.models import ChaveIdempotencia
+
+
+class Command(BaseCommand):
+    help = 'Apaga as respostas de Idempotency-Key vencidas (rodar periodicamente, ex.: cron diário).'
+
+    def handle(self, *args, **options):
+        apagadas, _ = ChaveIdempotencia.objects.filter(expira__lte=timezone.now()).delete()
+        self.stdout.write(self.style.SUCCESS(f'✅ {apagadas} chaves de idempotência vencidas apagadas'))
@@ -0,0 +1,19 @@
+# backend/loja/idempotencia/models.py
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import models
+
+
+class ChaveIdempotencia(models.Model):
+    """Resposta guardada de uma requisição enviada com Idempotency-Key.
+
+    A chave primária é o hash (usuário, método, rota, Idempotency-Key), então
+    achar a resposta de uma retentativa é uma única leitura pela PK.
+    """
+    chave = models.CharField(max_length=64, primary_key=True)
+    requisicao = models.CharField(max_length=64)  # hash do corpo: a mesma chave com outro corpo é recusada
+    status_code = models.PositiveSmallIntegerField(default=0)
+    resposta = models.JSONField(null=True, blank=True, encoder=DjangoJSONEncoder)
+    expira = models.DateTimeField(db_index=True)  # limpar_idempotencia apaga as vencidas
+
+    def __str__(self):
+        return f'{self.chave[:12]}… ({self.status_code}) até {self.expira}'
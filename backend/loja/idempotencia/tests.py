@@ -0,0 +1,66 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+
+from carrinho.models import Carrinho, ItemCarrinho
+from loja.testing import cliente_autenticado, criar_empresa, criar_produto, criar_usuario
+from mesa.models import Mesa
+from pedido.models import Pedido
+from .models import ChaveIdempotencia
+
+
+class IdempotenciaTests(TestCase):
+    def setUp(self):
+        self.empresa = criar_empresa()
+        self.usuario = criar_usuario()
+        self.client = cliente_autenticado(self.usuario)
+        self.chopp = criar_produto(empresa=self.empresa, estoque=10)
+        self.mesa = Mesa.objects.create(empresa=self.empresa, numero='2', nome='Mesa 2')
+        self.url = f'/api/mesas/{self.mesa.slug}/adicionar-item/'
+
+    def adicionar(self, quantidade=2, chave='abc-123'):
+        return self.client.post(self.url, {'produto_id': self.chopp.id, 'quantidade': quantidade},
+                                format='json', HTTP_IDEMPOTENCY_KEY=chave)
+
+    def test_retentativa_devolve_a_mesma_resposta_sem_baixar_estoque_de_novo(self):
+        primeira = self.adicionar()
+        segunda = self.adicionar()
+        self.assertEqual(primeira.status_code, 201, primeira.content)
+        self.assertEqual((segunda.status_code, segunda.json()), (201, primeira.json()))
+        self.assertEqual(segunda['Idempotent-Replayed'], 'true')
+        self.chopp.refresh_from_db()
+        self.assertEqual(self.chopp.estoque, 8)
+        self.assertEqual(self.mesa.items.get().quantidade, 2)
+
+    def test_chave_diferente_executa_de_novo_e_mesma_chave_com_outro_corpo_e_recusada(self):
+        self.adicionar()
+        self.assertEqual(self.adicionar(chave='outra').status_code, 201)
+        self.assertEqual(self.adicionar(quantidade=5).status_code, 422)
+        self.chopp.refresh_from_db()
+        self.assertEqual(self.chopp.estoque, 6)
+
+    def test_chave_vencida_vale_de_novo(self):
+        self.adicionar()
+        ChaveIdempotencia.objects.update(expira=timezone.now() - timedelta(seconds=1))
+        self.assertNotIn('Idempotent-Replayed', self.adicionar())
+        self.chopp.refresh_from_db()
+        self.assertEqual(self.chopp.estoque, 6)
+        self.adicionar(chave='nova')
+        ChaveIdempotencia.objects.filter(expira__gt=timezone.now()).update(expira=timezone.now() - timedelta(seconds=1))
+        call_command('limpar_idempotencia', stdout=StringIO())
+        self.assertFalse(ChaveIdempotencia.objects.exists())
+
+    def test_pedido_do_carrinho_nao_duplica(self):
+        carrinho = Carrinho.objects.create(usuario=self.usuario)
+        ItemCarrinho.objects.create(carrinho=carrinho, produto=self.chopp, quantidade=1)
+        url = f'/api/pedidos/carrinho/{carrinho.slug}/criar/'
+        respostas = [
+            self.client.post(url, {'empresa_id': self.empresa.id}, format='json', HTTP_IDEMPOTENCY_KEY='checkout-1')
+            for _ in range(2)
+        ]
+        self.assertEqual([r.status_code for r in respostas], [201, 201])
+        self.assertEqual(respostas[0].json()['id'], respostas[1].json()['id'])
+        self.assertEqual(Pedido.objects.count(), 1)
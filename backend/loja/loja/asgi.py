@@ -5,6 +5,10 @@ It exposes the ASGI callable as a module-level variable named ``application``.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/5.1/howto/deployment/asgi/
+
+Além do HTTP do Django, atende WebSockets (ver ROTAS_WEBSOCKET). A camada de
+canais é em memória (loja/canais.py), então rode com um único worker, ex.:
+``uvicorn loja.asgi:application --port 8004``.
 """
 
 import os
@@ -13,4 +17,21 @@ from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'loja.settings')
 
-application = get_asgi_application()
+django_application = get_asgi_application()
+
+# Importados depois do setup do Django (get_asgi_application)
+from mesa.consumers import mesas_websocket  # noqa: E402
+
+ROTAS_WEBSOCKET = {
+    '/ws/mesas/': mesas_websocket,
+}
+
+
+async def application(scope, receive, send):
+    if scope['type'] == 'websocket':
+        rota = ROTAS_WEBSOCKET.get(scope['path'])
+        if rota is None:
+            await send({'type': 'websocket.close', 'code': 4404})
+            return
+        return await rota(scope, receive, send)
+    return await django_application(scope, receive, send)
@@ -0,0 +1,13 @@
+# backend/loja/loja/autenticacao.py
+from rest_framework_simplejwt.authentication import JWTAuthentication
+
+
+class JWTQueryStringAuthentication(JWTAuthentication):
+    """Aceita o access token em ``?token=``, para clientes que não enviam cabeçalhos (EventSource/SSE)."""
+
+    def authenticate(self, request):
+        token = request.query_params.get('token')
+        if not token:
+            return None
+        validated_token = self.get_validated_token(token)
+        return self.get_user(validated_token), validated_token
@@ -0,0 +1,88 @@
+# backend/loja/loja/cache.py
+"""Cache das respostas dos GETs públicos que mudam pouco (produto por id, avaliações,
+categorias, empresas, cupons).
+
+Cada endpoint tem um nome e um template de chave (TEMPLATES) montado com os kwargs
+da URL e, se o template pedir ``{query}``, com a query string (ex.: ?cursor= das
+listas paginadas). Só respostas 200 de GET são guardadas, com TTL
+(CACHE_RESPOSTAS_TTL ou o do endpoint), no cache 'respostas' (LRU limitado por
+MAX_ENTRIES, ver settings.CACHES).
+
+A invalidação vem dos post_save/post_delete dos modelos (ver os signals.py dos
+apps) e é feita na hora e de novo no commit (uma requisição concorrente pode ter
+guardado os dados antigos enquanto a transação não terminava):
+- ``invalidar('produto', id=5)`` descarta uma chave;
+- ``invalidar('categorias')`` descarta o endpoint inteiro, trocando a versão que
+  faz parte de todas as chaves dele (os restos antigos saem pelo LRU/TTL).
+"""
+import functools
+import time
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from rest_framework.response import Response
+
+CACHE = 'respostas'
+TTL = getattr(settings, 'CACHE_RESPOSTAS_TTL', 300)
+
+
+def _cache():
+    return caches[CACHE]
+
+
+def _versao(nome):
+    """Versão atual do endpoint. Se tiver saído do cache, nasce uma nova (nunca volta a uma antiga)."""
+    chave = f'resp:{nome}:versao'
+    versao = _cache().get(chave)
+    if versao is None:
+        _cache().add(chave, time.time_ns(), None)
+        versao = _cache().get(chave)
+    return versao
+
+
+def _chave(nome, params, query=''):
+    return f'resp:{nome}:{_versao(nome)}:{TEMPLATES[nome].format(query=query, **params)}'
+
+
+def em_cache(nome, ttl=None):
+    """Decorator para views de função (abaixo do @api_view: autenticação e permissões rodam antes)."""
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if request.method != 'GET':
+                return view(request, *args, **kwargs)
+            chave = _chave(nome, kwargs, urlencode(sorted(request.query_params.lists()), doseq=True))
+            dados = _cache().get(chave)
+            if dados is not None:
+                return Response(dados, headers={'X-Cache': 'HIT'})
+            resposta = view(request, *args, **kwargs)
+            if resposta.status_code == 200 and isinstance(resposta, Response):
+                _cache().set(chave, resposta.data, TTL if ttl is None else ttl)
+                resposta['X-Cache'] = 'MISS'
+            return resposta
+        return wrapper
+    return decorator
+
+
+def invalidar(nome, **params):
+    """Descarta uma chave do endpoint (com params) ou o endpoint todo (sem params)."""
+    def _descartar():
+        if params:
+            _cache().delete(_chave(nome, params))
+        else:
+            _cache().set(f'resp:{nome}:versao', time.time_ns(), None)
+    _descartar()
+    transaction.on_commit(_descartar)
+
+
+# Chave de cada endpoint; os que não usam a query string não a incluem, para que
+# invalidar('produto', id=5) alcance qualquer variação da URL
+TEMPLATES = {
+    'produto': 'produto:{id}',
+    'avaliacoes_produto': 'avaliacoes:{produto_id}',
+    'categorias': 'categorias?{query}',
+    'empresas': 'empresas?{query}',
+    'cupons': 'cupons',
+}
@@ -0,0 +1,72 @@
+# backend/loja/loja/canais.py
+"""Camada de canais em memória para empurrar eventos aos clientes WebSocket.
+
+Cada conexão inscreve uma fila asyncio em um grupo (ex.: "mesas"); o código
+síncrono do Django publica no grupo depois do commit e a mensagem é entregue
+na event loop de cada conexão com ``call_soon_threadsafe``.
+
+A camada vive no processo: rode o ASGI com um único worker (as threads do
+Django e as conexões compartilham a mesma instância).
+"""
+import asyncio
+import threading
+from collections import defaultdict
+
+from django.db import transaction
+
+TAMANHO_FILA = 500  # mensagens pendentes por conexão antes de pedir ressincronização
+RESSINCRONIZAR = {'evento': 'ressincronizar'}
+
+
+class CamadaEmMemoria:
+    def __init__(self):
+        self._grupos = defaultdict(dict)  # grupo -> {fila: loop}
+        self._trava = threading.Lock()
+
+    def inscrever(self, grupo, fila, loop=None):
+        with self._trava:
+            self._grupos[grupo][fila] = loop or asyncio.get_running_loop()
+
+    def cancelar(self, grupo, fila):
+        with self._trava:
+            self._grupos[grupo].pop(fila, None)
+            if not self._grupos[grupo]:
+                del self._grupos[grupo]
+
+    def inscritos(self, grupo):
+        with self._trava:
+            return len(self._grupos.get(grupo, ()))
+
+    def enviar(self, grupo, mensagem):
+        """Entrega a mensagem a todas as conexões do grupo (pode ser chamado de qualquer thread)."""
+        with self._trava:
+            destinos = list(self._grupos.get(grupo, {}).items())
+        for fila, loop in destinos:
+            try:
+                loop.call_soon_threadsafe(_entregar, fila, mensagem)
+            except RuntimeError:  # loop encerrado: a conexão caiu sem se descadastrar
+                self.cancelar(grupo, fila)
+
+
+def _entregar(fila, mensagem):
+    try:
+        fila.put_nowait(mensagem)
+    except asyncio.QueueFull:
+        # Cliente lento: descarta o atraso e pede para ele recarregar o estado completo
+        while not fila.empty():
+            fila.get_nowait()
+        fila.put_nowait(RESSINCRONIZAR)
+
+
+camada = CamadaEmMemoria()
+
+
+def publicar(grupo, montar_mensagem):
+    """Publica no grupo quando a transação atual confirmar (nada é enviado se ela for desfeita).
+
+    ``montar_mensagem`` é chamado só no commit e só se houver alguém inscrito.
+    """
+    def _enviar():
+        if camada.inscritos(grupo):
+            camada.enviar(grupo, montar_mensagem())
+    transaction.on_commit(_enviar)
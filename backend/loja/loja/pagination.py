@@ -0,0 +1,123 @@
+# backend/loja/loja/pagination.py
+"""Paginação por cursor (keyset) compartilhada entre os apps.
+
+A paginação é opcional: só é aplicada quando o cliente envia ``?cursor=`` ou
+``?limit=``; sem esses parâmetros as views continuam devolvendo a lista completa,
+como o frontend espera hoje.
+
+O cursor é opaco (base64 dos valores da última linha da página) e a próxima
+página é buscada com ``WHERE (created, id) < (:created, :id)``, que usa o índice
+``(created, id)`` em vez de um OFFSET que varre as páginas anteriores.
+"""
+import base64
+import datetime
+import json
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import replace_query_param
+
+
+def _valor_cursor(valor):
+    # isoformat completo: o DjangoJSONEncoder corta os microssegundos e quebraria a igualdade do keyset
+    if isinstance(valor, (datetime.datetime, datetime.date)):
+        return valor.isoformat()
+    return str(valor)
+
+
+class KeysetPagination(BasePagination):
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'limit'
+    page_size = api_settings.PAGE_SIZE or 10
+    max_page_size = 100
+    invalid_cursor_message = 'Cursor inválido'
+
+    def __init__(self, ordering=('-created', '-id')):
+        self.ordering = tuple(ordering)
+        self.next_cursor = None
+        self.request = None
+
+    @classmethod
+    def is_requested(cls, request):
+        params = request.query_params
+        return cls.cursor_query_param in params or cls.page_size_query_param in params
+
+    def get_page_size(self, request):
+        try:
+            tamanho = int(request.query_params.get(self.page_size_query_param, self.page_size))
+        except (TypeError, ValueError):
+            return self.page_size
+        return max(1, min(tamanho, self.max_page_size))
+
+    def encode_cursor(self, valores):
+        dados = json.dumps(valores, default=_valor_cursor, separators=(',', ':')).encode()
+        return base64.urlsafe_b64encode(dados).decode().rstrip('=')
+
+    def decode_cursor(self, cursor, model):
+        """Valores do cursor já convertidos pelos campos da ordenação (to_python); NotFound se inválido."""
+        try:
+            dados = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+            valores = json.loads(dados)
+            if not isinstance(valores, list) or len(valores) != len(self.ordering):
+                raise ValueError
+            # Um valor que não converte (ex.: data malformada) viraria ValidationError/500 no filtro
+            valores = [
+                model._meta.get_field(campo.lstrip('-')).to_python(valor)
+                for campo, valor in zip(self.ordering, valores)
+            ]
+            if None in valores:
+                raise ValueError
+        except (TypeError, ValueError, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+        return valores
+
+    def _filtro_apos(self, valores):
+        """Monta (a < x) OR (a = x AND b < y) ... respeitando a direção de cada campo."""
+        filtro = Q()
+        iguais = {}
+        for campo, valor in zip(self.ordering, valores):
+            nome = campo.lstrip('-')
+            operador = 'lt' if campo.startswith('-') else 'gt'
+            filtro |= Q(**iguais, **{f'{nome}__{operador}': valor})
+            iguais[nome] = valor
+        return filtro
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        page_size = self.get_page_size(request)
+
+        queryset = queryset.order_by(*self.ordering)
+        cursor = request.query_params.get(self.cursor_query_param)
+        if cursor:
+            queryset = queryset.filter(self._filtro_apos(self.decode_cursor(cursor, queryset.model)))
+
+        resultados = list(queryset[:page_size + 1])
+        if len(resultados) > page_size:
+            resultados = resultados[:page_size]
+            ultimo = resultados[-1]
+            self.next_cursor = self.encode_cursor(
+                [getattr(ultimo, campo.lstrip('-')) for campo in self.ordering]
+            )
+        return resultados
+
+    def get_next_link(self):
+        if self.next_cursor is None:
+            return None
+        return replace_query_param(self.request.build_absolute_uri(), self.cursor_query_param, self.next_cursor)
+
+    def get_paginated_response(self, data):
+        return Response({'next': self.get_next_link(), 'results': data})
+
+
+def paginar(request, queryset, serializer_class, ordering=('-created', '-id'), **serializer_kwargs):
+    """Serializa a lista paginada por cursor quando pedido, ou a lista completa caso contrário."""
+    if not KeysetPagination.is_requested(request):
+        return Response(serializer_class(queryset, many=True, **serializer_kwargs).data)
+    paginator = KeysetPagination(ordering)
+    page = paginator.paginate_queryset(queryset, request)
+    serializer = serializer_class(page, many=True, **serializer_kwargs)
+    return paginator.get_paginated_response(serializer.data)
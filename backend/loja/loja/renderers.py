@@ -0,0 +1,40 @@
+# backend/loja/loja/renderers.py
+"""Renderer JSON padrão da API (ver REST_FRAMEWORK em settings).
+
+Usa o orjson quando instalado: serializa str/int/float/dict/list, datetime e UUID
+em Rust, sem passar pelo json.JSONEncoder do Python. O resto (Decimal, timedelta,
+textos traduzíveis...) cai no encoder do DRF, então a saída é a do JSONRenderer
+(Decimal como número, datetime UTC com "Z"), exceto que datetimes soltos saem com
+os microssegundos completos. Sem o orjson, ou quando
+o cliente pede indentação (API navegável, ``; indent=4``), é o próprio JSONRenderer.
+"""
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils import encoders
+
+try:
+    import orjson
+except ImportError:  # dependência opcional
+    orjson = None
+
+_encoder = encoders.JSONEncoder()
+
+
+def _padrao(obj):
+    return _encoder.default(obj)
+
+
+OPCOES = 0 if orjson is None else orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS
+
+
+def dumps(dados):
+    """bytes UTF-8 compactos, com o orjson se houver (também usado pelo benchmark_json)."""
+    if orjson is None:
+        return JSONRenderer().render(dados)
+    return orjson.dumps(dados, default=_padrao, option=OPCOES)
+
+
+class FastJSONRenderer(JSONRenderer):
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if orjson is None or data is None or self.get_indent(accepted_media_type, renderer_context or {}):
+            return super().render(data, accepted_media_type, renderer_context)
+        return orjson.dumps(data, default=_padrao, option=OPCOES)
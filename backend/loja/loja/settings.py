@@ -15,6 +15,8 @@ telefone = 945876323
 email = choperia@example.net
 cnpj = 57.851.872/3504-08 """
 
+import os
+import sys
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -57,6 +59,10 @@ INSTALLED_APPS = [
     'cupom', 
     'favoritos',
     'avaliacoes',
+    'cozinha',
+    'alteracoes',
+    'idempotencia',
+    'relatorios',
 ]
 
 MIDDLEWARE = [
@@ -111,6 +117,7 @@ CORS_ALLOW_HEADERS = [
     'x-requested-with',
     'email',  # Add 'email' to allow this header
     "password",  # Add 'password' to allow this header
+    'idempotency-key',  # retentativas de pedido/itens sem duplicar (idempotencia.decorators)
 ]
 
 CORS_ALLOW_METHODS = [
@@ -134,6 +141,16 @@ REST_FRAMEWORK = {
     'DEFAULT_PERMISSION_CLASSES': (
         'rest_framework.permissions.IsAuthenticated',
     ),
+    # JSON com orjson quando instalado (loja/renderers.py e loja/parsers.py; benchmark: manage.py benchmark_json)
+    'DEFAULT_RENDERER_CLASSES': (
+        'loja.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ),
+    'DEFAULT_PARSER_CLASSES': (
+        'loja.parsers.FastJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ),
 }
 
 from datetime import timedelta
@@ -154,10 +171,41 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        # Banco de testes em arquivo para permitir conexões concorrentes (testes de estoque)
+        'TEST': {
+            'NAME': BASE_DIR / 'test_db.sqlite3',
+        },
     }
 }
 
 
+# Cache
+# 'default' guarda o cardápio público (produto.menu) e 'respostas' os GETs públicos (loja/cache.py).
+# A invalidação feita por um worker precisa valer para os outros, então o padrão é o cache em
+# arquivo (compartilhado pelos processos da máquina). LocMemCache (LRU por processo) só nos testes,
+# ou com CACHE_BACKEND=locmem quando a API roda num único processo.
+TESTANDO = len(sys.argv) > 1 and sys.argv[1] == 'test'
+CACHE_BACKEND = os.environ.get('CACHE_BACKEND', 'locmem' if TESTANDO else 'arquivo')
+CACHE_DIR = Path(os.environ.get('CACHE_DIR', BASE_DIR / 'cache'))
+
+
+def _cache(nome, max_entradas):
+    if CACHE_BACKEND == 'locmem':
+        return {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+                'LOCATION': nome, 'OPTIONS': {'MAX_ENTRIES': max_entradas}}
+    if CACHE_BACKEND == 'arquivo':
+        return {'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+                'LOCATION': CACHE_DIR / nome, 'OPTIONS': {'MAX_ENTRIES': max_entradas}}
+    raise ValueError(f"CACHE_BACKEND deve ser 'arquivo' ou 'locmem' (recebido: {CACHE_BACKEND!r})")
+
+
+CACHES = {
+    'default': _cache('default', 300),
+    'respostas': _cache('respostas', 2000),
+}
+CACHE_RESPOSTAS_TTL = 300  # segundos; cada endpoint pode pedir menos (ver loja/cache.py)
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
 
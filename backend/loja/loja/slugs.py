@@ -0,0 +1,126 @@
+# backend/loja/loja/slugs.py
+"""Geração de slugs únicos sem consultar a tabela antes de gravar.
+
+Em vez de ``Model.objects.filter(slug=...).exists()`` a cada save, o slug é
+gravado direto e a constraint UNIQUE do banco decide: se houver colisão, o
+INSERT é refeito (dentro de um savepoint) com um sufixo aleatório. Para
+``bulk_create`` os slugs do lote já saem com sufixo, e o lote inteiro é
+refeito no caso raríssimo de colisão.
+"""
+import secrets
+
+from django.db import IntegrityError, transaction
+from django.utils.text import slugify
+
+SUFIXO_TAMANHO = 6
+SUFIXO_CARACTERES = 'abcdefghijklmnopqrstuvwxyz0123456789'
+TENTATIVAS = 5
+
+
+def sufixo():
+    # um único sorteio por sufixo (get_random_string sorteia caractere a caractere, lento em lotes grandes)
+    numero = secrets.randbelow(len(SUFIXO_CARACTERES) ** SUFIXO_TAMANHO)
+    caracteres = []
+    for _ in range(SUFIXO_TAMANHO):
+        numero, resto = divmod(numero, len(SUFIXO_CARACTERES))
+        caracteres.append(SUFIXO_CARACTERES[resto])
+    return ''.join(caracteres)
+
+
+def slug_base(texto, max_length=50):
+    return slugify(texto or '')[:max_length].strip('-')
+
+
+def slug_com_sufixo(texto, max_length=50):
+    base = slug_base(texto, max_length - SUFIXO_TAMANHO - 1)
+    return f'{base}-{sufixo()}' if base else sufixo()
+
+
+def colisao_de_slug(erro):
+    # sqlite: "UNIQUE constraint failed: app_model.slug" / postgres: "... app_model_slug_key"
+    return 'slug' in str(erro)
+
+
+def reservar_slugs(textos, max_length=50):
+    """Slugs com sufixo para um lote (sem repetição dentro do próprio lote)."""
+    slugs, usados, bases = [], set(), {}
+    for texto in textos:
+        if texto not in bases:  # lotes repetem muito o mesmo texto (ex.: o nome do produto)
+            bases[texto] = slug_base(texto, max_length - SUFIXO_TAMANHO - 1)
+        base = bases[texto]
+        slug = f'{base}-{sufixo()}' if base else sufixo()
+        while slug in usados:
+            slug = f'{base}-{sufixo()}' if base else sufixo()
+        usados.add(slug)
+        slugs.append(slug)
+    return slugs
+
+
+def criar_em_lote(model, objetos, texto_do_slug, batch_size=None):
+    """bulk_create preenchendo os slugs vazios; refaz o lote com novos sufixos se houver colisão."""
+    objetos = list(objetos)
+    max_length = model._meta.get_field('slug').max_length
+    sem_slug = [obj for obj in objetos if not obj.slug]
+    for tentativa in range(TENTATIVAS):
+        for obj, slug in zip(sem_slug, reservar_slugs([texto_do_slug(obj) for obj in sem_slug], max_length)):
+            obj.slug = slug
+        try:
+            with transaction.atomic():
+                return model.objects.bulk_create(objetos, batch_size=batch_size)
+        except IntegrityError as erro:
+            if not colisao_de_slug(erro) or tentativa == TENTATIVAS - 1:
+                raise
+
+
+class SlugUnicoMixin:
+    """Preenche o campo ``slug`` no save, confiando na constraint UNIQUE em vez de um SELECT prévio.
+
+    - ``slug_origem``: campo usado como base do slug (ou sobrescreva ``get_slug_base``);
+    - ``slug_sempre_com_sufixo``: para modelos cujo texto base se repete sempre (ex.: movimentações);
+    - ``slug_acompanha_origem``: regera o slug quando o campo de origem muda (comparado com o
+      valor carregado do banco, sem reler a linha).
+    """
+    slug_origem = 'nome'
+    slug_sempre_com_sufixo = False
+    slug_acompanha_origem = False
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        if cls.slug_acompanha_origem and cls.slug_origem in field_names:
+            instance._slug_origem_carregada = values[field_names.index(cls.slug_origem)]
+        return instance
+
+    def get_slug_base(self):
+        return getattr(self, self.slug_origem)
+
+    def _slug_desatualizado(self):
+        if not self.slug:
+            return True
+        if self.slug_acompanha_origem and hasattr(self, '_slug_origem_carregada'):
+            return getattr(self, self.slug_origem) != self._slug_origem_carregada
+        return False
+
+    def save(self, *args, **kwargs):
+        if not self._slug_desatualizado():
+            return super().save(*args, **kwargs)
+
+        max_length = self._meta.get_field('slug').max_length
+        texto = self.get_slug_base()
+        if self.slug_sempre_com_sufixo:
+            self.slug = slug_com_sufixo(texto, max_length)
+        else:
+            self.slug = slug_base(texto, max_length) or slug_com_sufixo(texto, max_length)
+
+        for tentativa in range(TENTATIVAS):
+            try:
+                with transaction.atomic():
+                    super().save(*args, **kwargs)
+                break
+            except IntegrityError as erro:
+                if not colisao_de_slug(erro) or tentativa == TENTATIVAS - 1:
+                    raise
+                self.slug = slug_com_sufixo(texto, max_length)
+
+        if self.slug_acompanha_origem:
+            self._slug_origem_carregada = getattr(self, self.slug_origem)
@@ -0,0 +1,38 @@
+# backend/loja/loja/streaming.py
+"""Respostas em streaming servidas tanto pelo WSGI quanto pelo ASGI (loja/asgi.py).
+
+No ASGI o Django só transmite aos poucos um StreamingHttpResponse com iterador
+assíncrono: com um gerador síncrono ele lê o gerador inteiro numa thread
+(``sync_to_async(list)``) antes de enviar o primeiro byte. No WSGI é o contrário:
+um iterador assíncrono é consumido inteiro antes do envio. Por isso as views de
+streaming escolhem o tipo de iterador pela requisição.
+"""
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIRequest
+
+_FIM = object()
+
+
+def requisicao_asgi(request):
+    """True se a requisição (HttpRequest ou Request do DRF) chegou pelo handler ASGI."""
+    return isinstance(getattr(request, '_request', request), ASGIRequest)
+
+
+async def assincrono(iteravel):
+    """Percorre um iterável síncrono (ex.: queryset.iterator()) em thread, um item por vez.
+
+    Usa a thread compartilhada das views síncronas (thread_sensitive), a mesma da
+    conexão com o banco que o iterável usa; entre um item e outro a event loop fica livre.
+    """
+    iterador = iter(iteravel)
+    proximo = sync_to_async(next, thread_sensitive=True)
+    while True:
+        item = await proximo(iterador, _FIM)
+        if item is _FIM:
+            return
+        yield item
+
+
+def conteudo(request, iteravel):
+    """O iterável como está no WSGI, ou embrulhado em ``assincrono`` no ASGI."""
+    return assincrono(iteravel) if requisicao_asgi(request) else iteravel
@@ -0,0 +1,56 @@
+# backend/loja/loja/testing.py
+"""Utilitários compartilhados pelos testes dos apps."""
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils.crypto import get_random_string
+from rest_framework.test import APIClient
+
+from categoria.models import Categoria
+from empresa.models import Empresa
+from produto.models import Produto
+
+
+def criar_empresa(**kwargs):
+    dados = {'nome': 'Choperia Teste', 'endereco': 'Rua A, 1', 'telefone': '1', 'email': 'teste@example.com',
+             'cnpj': get_random_string(14, '0123456789')}
+    dados.update(kwargs)
+    return Empresa.objects.create(**dados)
+
+
+def criar_produto(empresa=None, categoria='CERVEJA', **kwargs):
+    empresa = empresa or criar_empresa()
+    categoria, _ = Categoria.objects.get_or_create(nome=categoria)
+    dados = {'nome': 'Chopp Pilsen', 'descricao': '300ml', 'custo': 5, 'venda': 12,
+             'codigo': get_random_string(8), 'estoque': 100}
+    dados.update(kwargs)
+    return Produto.objects.create(empresa=empresa, categoria=categoria, **dados)
+
+
+def criar_usuario(username=None):
+    return User.objects.create(username=username or get_random_string(10))
+
+
+def cliente_autenticado(usuario=None):
+    client = APIClient()
+    client.force_authenticate(usuario or criar_usuario())
+    return client
+
+
+class QueryCountMixin:
+    """Garante que um endpoint faz sempre o mesmo número de queries, com 1 ou com muitas linhas (sem N+1)."""
+
+    def assertNumQueriesFixo(self, num, client, url, criar_linhas, linhas=(1, 10), method='get', **kwargs):
+        criadas = 0
+        for total in linhas:
+            criar_linhas(total - criadas)
+            criadas = total
+            with CaptureQueriesContext(connection) as contexto:
+                response = getattr(client, method)(url, **kwargs)
+            self.assertLess(response.status_code, 400, response.content)
+            executadas = [q['sql'] for q in contexto.captured_queries]
+            self.assertEqual(
+                len(executadas), num,
+                f'{url} com {total} linha(s) executou {len(executadas)} queries (esperado {num}):\n' + '\n'.join(executadas),
+            )
+        return response
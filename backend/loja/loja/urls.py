@@ -16,6 +16,9 @@ urlpatterns = [
     path('api/', include('cupom.urls')),
     path('api/', include('favoritos.urls')),
     path('api/', include('avaliacoes.urls')),
+    path('api/', include('cozinha.urls')),
+    path('api/', include('alteracoes.urls')),
+    path('api/', include('relatorios.urls')),
 ]
 
 
@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class MesaConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'mesa'
+
+    def ready(self):
+        from . import signals  # noqa: F401  (invalidação do cache do mapa de mesas)
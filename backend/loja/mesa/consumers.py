@@ -0,0 +1,76 @@
+# backend/loja/mesa/consumers.py
+"""WebSocket /ws/mesas/?token=<access JWT>
+
+Ao conectar o cliente recebe {"evento": "estado", "mesas": [...]} (mesmo formato
+de GET /api/mesas/) e, dali em diante, só os deltas publicados por mesa.tempo_real.
+Se receber {"evento": "ressincronizar"} o cliente ficou para trás e deve reconectar.
+"""
+import asyncio
+import json
+from urllib.parse import parse_qs
+
+from asgiref.sync import sync_to_async
+from django.core.serializers.json import DjangoJSONEncoder
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+
+from loja.canais import TAMANHO_FILA, camada
+from . import queries, tempo_real
+from .serializers import MesaSerializer
+
+CODIGO_NAO_AUTENTICADO = 4401
+
+
+def _usuario(scope):
+    token = parse_qs(scope.get('query_string', b'').decode()).get('token', [None])[0]
+    if not token:
+        return None
+    autenticacao = JWTAuthentication()
+    try:
+        return autenticacao.get_user(autenticacao.get_validated_token(token))
+    except (InvalidToken, TokenError):
+        return None
+
+
+def _estado():
+    return {'evento': 'estado', 'mesas': MesaSerializer(queries.mesas(), many=True).data}
+
+
+async def _enviar_json(send, dados):
+    await send({'type': 'websocket.send', 'text': json.dumps(dados, cls=DjangoJSONEncoder)})
+
+
+async def mesas_websocket(scope, receive, send):
+    mensagem = await receive()
+    if mensagem['type'] != 'websocket.connect':
+        return
+
+    usuario = await sync_to_async(_usuario)(scope)
+    if usuario is None or not usuario.is_active:
+        await send({'type': 'websocket.close', 'code': CODIGO_NAO_AUTENTICADO})
+        return
+    await send({'type': 'websocket.accept'})
+
+    # Inscreve antes de montar o estado, para não perder eventos entre os dois
+    fila = asyncio.Queue(maxsize=TAMANHO_FILA)
+    camada.inscrever(tempo_real.GRUPO, fila)
+    recebendo = asyncio.ensure_future(receive())
+    lendo_fila = None
+    try:
+        await _enviar_json(send, await sync_to_async(_estado)())
+        while True:
+            if lendo_fila is None:
+                lendo_fila = asyncio.ensure_future(fila.get())
+            prontos, _ = await asyncio.wait({recebendo, lendo_fila}, return_when=asyncio.FIRST_COMPLETED)
+            if recebendo in prontos:
+                if recebendo.result()['type'] == 'websocket.disconnect':
+                    break
+                recebendo = asyncio.ensure_future(receive())  # o cliente não envia nada útil; ignora
+            if lendo_fila in prontos:
+                await _enviar_json(send, lendo_fila.result())
+                lendo_fila = None
+    finally:
+        camada.cancelar(tempo_real.GRUPO, fila)
+        for tarefa in (recebendo, lendo_fila):
+            if tarefa is not None and not tarefa.done():
+                tarefa.cancel()
@@ -0,0 +1,18 @@
+# Generated by Django 5.1.7 on 2026-10-18 15:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('empresa', '0002_empresa_empresa_created_id_idx'),
+        ('mesa', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='mesa',
+            index=models.Index(fields=['created', 'id'], name='mesa_created_id_idx'),
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 5.1.7 on 2026-10-18 15:46
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Max
+
+
+def criar_contadores(apps, schema_editor):
+    # A numeração era global: todas as empresas começam depois do maior número já usado
+    Empresa = apps.get_model('empresa', 'Empresa')
+    Mesa = apps.get_model('mesa', 'Mesa')
+    SequenciaPedido = apps.get_model('mesa', 'SequenciaPedido')
+    proximo = (Mesa.objects.aggregate(maior=Max('pedido'))['maior'] or 0) + 1
+    SequenciaPedido.objects.bulk_create(
+        SequenciaPedido(empresa_id=empresa_id, proximo=proximo)
+        for empresa_id in Empresa.objects.values_list('id', flat=True)
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('empresa', '0002_empresa_empresa_created_id_idx'),
+        ('mesa', '0002_mesa_mesa_created_id_idx'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SequenciaPedido',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('proximo', models.PositiveBigIntegerField(default=1)),
+                ('empresa', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='sequencia_pedido', to='empresa.empresa')),
+            ],
+        ),
+        migrations.RunPython(criar_contadores, migrations.RunPython.noop),
+    ]
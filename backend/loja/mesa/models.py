@@ -1,14 +1,20 @@
 
 # backend\loja\mesa\models.py
+from collections import defaultdict
 from django.db import models
 from decimal import Decimal
 from empresa.models import Empresa
 from produto.models import Produto
-from django.utils.text import slugify
-from django.utils.crypto import get_random_string
+from django.db import transaction
+from django.db.models import F, Sum
+from alteracoes import registro
+from estoque import services as estoque_service
+from loja import slugs
+from loja.slugs import SlugUnicoMixin
+from . import numeracao, tempo_real
 
 
-class Mesa(models.Model):
+class Mesa(SlugUnicoMixin, models.Model):
     empresa = models.ForeignKey(Empresa, related_name='mesas', on_delete=models.CASCADE)
     numero = models.CharField(max_length=10)
     nome = models.CharField(max_length=50)
@@ -31,60 +37,153 @@ class Mesa(models.Model):
     # Para controlar se o nome da mesa é numérico
     not_numerico = models.BooleanField(default=False)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['created', 'id'], name='mesa_created_id_idx'),  # paginação por cursor
+        ]
+
     def __str__(self):
         return f'Mesa {self.numero} - {self.empresa.nome}'
 
     def calcular_total(self):
-        total = 0
-        for pedido in self.pedidos_mesa.all():  # Usando o related_name definido no modelo Pedido
-            total += pedido.quantidade * pedido.produto.venda
-        return total
-
-    #
-    def save(self, *args, **kwargs): # Adicionado método save para gerar slug
-        if not self.slug:
-            slug_base = slugify(self.nome)
-            slug = slug_base
-            if Mesa.objects.filter(slug=slug).exists():
-                slug = f'{slug_base}-{get_random_string(5)}'
-            self.slug = slug
-        
-        is_new = self._state.adding  # ✅ Corrigido para usar self._state.adding
-
-        super(Mesa, self).save(*args, **kwargs)
+        # Soma de quantidade × preço unitário dos itens, calculada no banco
+        total = self.items.aggregate(total=Sum(F('quantidade') * F('preco_unitario'), output_field=models.DecimalField()))['total']
+        return total or Decimal('0.00')
+
+    def _travar(self):
+        """Trava a linha da mesa até o fim da transação e relê o número do pedido.
+
+        Quem chega junto espera aqui; assim só o primeiro item de fato abre um número
+        novo, e o save() não regrava o número lido antes por esta instância.
+        """
+        self.pedido = Mesa.objects.select_for_update().values_list('pedido', flat=True).get(pk=self.pk)
 
     def adicionar_item(self, produto, quantidade):
-        if not self.items.exists():
-            self.pedido = self.get_next_pedido_number()
-        
-        # Verifica se o item já existe na mesa 
-        item, created = self.items.get_or_create(produto_id=produto, defaults={'quantidade': quantidade})
-        if not created: # Se o item já existir, apenas incrementa a quantidade
-            item.quantidade += quantidade
-            item.save()
-        self.status = 'Ocupada'
-        self.save()
-
-    def remover_item(self, produto):
-        item = self.items.filter(produto=produto).first()
-        if item:
-            item.delete()
-        if not self.items.exists():
-            self.status = 'Livre'
-            self.pedido = 0
-        self.save()
+        # Reserva o estoque e grava o item na mesma transação
+        with transaction.atomic():
+            self._travar()
+            estoque_service.reservar(produto.id, quantidade)
+
+            if not self.items.exists():
+                self.pedido = self.get_next_pedido_number()
+
+            # Verifica se o item já existe na mesa
+            item, created = self.items.get_or_create(produto_id=produto, defaults={'quantidade': quantidade})
+            if not created: # Se o item já existir, apenas incrementa a quantidade (no banco)
+                self.items.filter(pk=item.pk).update(quantidade=models.F('quantidade') + quantidade)
+                item.refresh_from_db(fields=['quantidade'])
+                registro.registrar([item], registro.ALTERADO)
+            self.status = 'Ocupada'
+            self.save()
+            tempo_real.item_alterado(self, item, tempo_real.ITEM_ADICIONADO if created else tempo_real.ITEM_ATUALIZADO)
+            tempo_real.itens_pedidos.send(sender=Mesa, mesa=self, itens=[(produto, quantidade)])
+        return item
+
+    def adicionar_rodada(self, linhas):
+        """Adiciona vários itens de uma vez (lista de (produto_id, quantidade)), tudo ou nada.
+
+        Estoque de todos os produtos conferido e baixado em lote, itens existentes
+        incrementados num único UPDATE e itens novos num bulk_create.
+        Levanta Produto.DoesNotExist ou EstoqueInsuficiente. Retorna os itens afetados.
+        """
+        quantidades = {}
+        for produto_id, quantidade in linhas:
+            quantidades[int(produto_id)] = quantidades.get(int(produto_id), 0) + int(quantidade)
+
+        with transaction.atomic():
+            self._travar()
+            produtos = estoque_service.reservar_lote(quantidades)
+            faltando = sorted(set(quantidades) - set(produtos))
+            if faltando:
+                raise Produto.DoesNotExist(f'Produto(s) não encontrado(s): {faltando}')
+
+            if not self.items.exists():
+                self.pedido = self.get_next_pedido_number()
+
+            existentes = {
+                item.produto_id_id: item
+                for item in self.items.select_for_update().filter(produto_id__in=quantidades)
+            }
+            if existentes:
+                self.items.filter(pk__in=[item.pk for item in existentes.values()]).update(quantidade=models.Case(
+                    *[models.When(pk=item.pk, then=F('quantidade') + quantidades[produto_id])
+                      for produto_id, item in existentes.items()],
+                    default=F('quantidade'),
+                    output_field=models.PositiveIntegerField(),
+                ))
+            novos = [
+                ItemMesa(mesa=self, produto_id=produtos[produto_id], quantidade=quantidade,
+                         preco_unitario=produtos[produto_id].venda, produto_nome=produtos[produto_id].nome,
+                         produto_slug=produtos[produto_id].slug)
+                for produto_id, quantidade in quantidades.items() if produto_id not in existentes
+            ]
+            slugs.criar_em_lote(ItemMesa, novos, ItemMesa.get_slug_base)
+
+            self.status = 'Ocupada'
+            self.save()
+
+            itens = list(self.items.filter(produto_id__in=quantidades))
+            registro.registrar([item for item in itens if item.produto_id_id in existentes], registro.ALTERADO)
+            registro.registrar([item for item in itens if item.produto_id_id not in existentes], registro.CRIADO)
+            for item in itens:
+                evento = tempo_real.ITEM_ATUALIZADO if item.produto_id_id in existentes else tempo_real.ITEM_ADICIONADO
+                tempo_real.item_alterado(self, item, evento)
+            tempo_real.itens_pedidos.send(
+                sender=Mesa, mesa=self, itens=[(produtos[produto_id], q) for produto_id, q in quantidades.items()]
+            )
+        return itens
+
+    def remover_item(self, produto=None, item_id=None):
+        """Remove o item (pelo produto ou pelo id do ItemMesa) e devolve o estoque.
+        Retorna o item removido, ou None se não existir."""
+        with transaction.atomic():
+            itens = self.items.select_for_update()
+            item = (itens.filter(pk=item_id) if item_id is not None else itens.filter(produto_id=produto)).first()
+            if item:
+                item_pk = item.pk
+                item.delete()
+                item.id = item_pk  # o delete zera o pk; o evento precisa dele
+                estoque_service.liberar(item.produto_id_id, item.quantidade)
+                tempo_real.item_alterado(self, item, tempo_real.ITEM_REMOVIDO)
+                tempo_real.itens_cancelados.send(sender=Mesa, mesa=self, produtos=[item.produto_id_id])
+            if not self.items.exists():
+                self.status = 'Livre'
+                self.pedido = 0
+                if item:
+                    tempo_real.mesa_liberada(self)
+            self.save()
+        return item
 
     def cancelar_pedido(self):
-        self.items.all().delete()  # Deleta todos os ItemMesa associados à mesa
-        self.status = 'Livre'      # Atualiza o status
-        self.pedido = 0            # Reseta o pedido
-        self.save()
+        """Remove todos os itens da mesa e devolve o estoque deles (movimentações 'estorno')."""
+        with transaction.atomic():
+            tempo_real.itens_cancelados.send(sender=Mesa, mesa=self, produtos=None)  # antes de zerar o número do pedido
+            itens = list(self.items.select_for_update())
+            quantidades = defaultdict(int)
+            for item in itens:
+                quantidades[item.produto_id_id] += item.quantidade
+            estoque_service.liberar_lote(quantidades)
+            with registro.em_lote():
+                self.items.all().delete()  # Deleta todos os ItemMesa associados à mesa
+            registro.registrar(itens, registro.REMOVIDO)
+            self.status = 'Livre'      # Atualiza o status
+            self.pedido = 0            # Reseta o pedido
+            self.save()
+            tempo_real.mesa_liberada(self)
 
     def get_next_pedido_number(self):
-        highest_pedido = Mesa.objects.aggregate(models.Max('pedido'))['pedido__max'] or 0
-        return highest_pedido + 1
+        # Contador por empresa, distribuído em blocos (ver mesa/numeracao.py)
+        return numeracao.proximo_numero(self.empresa_id)
 
-class ItemMesa(models.Model):
+class SequenciaPedido(models.Model):
+    """Próximo número de pedido livre de cada empresa (alocado em blocos por mesa.numeracao)."""
+    empresa = models.OneToOneField(Empresa, on_delete=models.CASCADE, related_name='sequencia_pedido')
+    proximo = models.PositiveBigIntegerField(default=1)
+
+    def __str__(self):
+        return f'{self.empresa_id}: {self.proximo}'
+
+class ItemMesa(SlugUnicoMixin, models.Model):
     mesa = models.ForeignKey('Mesa', on_delete=models.CASCADE, related_name='items')
     produto_id = models.ForeignKey(Produto, on_delete=models.CASCADE)  # Renomeado de 'produto' para 'produto_id'
     quantidade = models.PositiveIntegerField(default=1)
@@ -93,14 +192,15 @@ class ItemMesa(models.Model):
     produto_slug = models.SlugField()  # Cache do slug do produto
     slug = models.SlugField(unique=True, blank=True)
 
+    def get_slug_base(self):
+        return f"{self.produto_slug}-{self.mesa.numero}"
+
     def save(self, *args, **kwargs):
         if not self.produto_nome or not self.produto_slug:
             self.produto_nome = self.produto_id.nome
             self.produto_slug = self.produto_id.slug
         if not self.preco_unitario:
             self.preco_unitario = self.produto_id.venda
-        if not self.slug:
-            self.slug = f"{self.produto_slug}-{slugify(self.mesa.numero)}"
         super().save(*args, **kwargs)
 
     def __str__(self):
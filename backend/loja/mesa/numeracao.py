@@ -0,0 +1,61 @@
+# backend/loja/mesa/numeracao.py
+"""Números de pedido por empresa, sem varrer as mesas.
+
+Cada processo reserva um bloco de números com um único UPDATE no contador da
+empresa (SequenciaPedido) e distribui o bloco em memória; só volta ao banco
+quando o bloco acaba. Processos diferentes recebem blocos diferentes, então os
+números nunca se repetem (mas podem sair fora de ordem entre processos e ter
+lacunas quando um processo reinicia).
+"""
+import threading
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import F
+
+TAMANHO_BLOCO = getattr(settings, 'PEDIDO_NUMERO_BLOCO', 20)
+
+_blocos = {}  # empresa_id -> [próximo, limite) ainda não distribuídos
+_trava = threading.Lock()
+
+
+def _reservar_bloco(empresa_id, tamanho):
+    """Avança o contador da empresa em ``tamanho`` e devolve o primeiro número do bloco."""
+    from .models import SequenciaPedido
+
+    with transaction.atomic():
+        if not SequenciaPedido.objects.filter(empresa_id=empresa_id).update(proximo=F('proximo') + tamanho):
+            try:
+                with transaction.atomic():
+                    SequenciaPedido.objects.create(empresa_id=empresa_id, proximo=1 + tamanho)
+                return 1
+            except IntegrityError:  # outro processo criou o contador ao mesmo tempo
+                SequenciaPedido.objects.filter(empresa_id=empresa_id).update(proximo=F('proximo') + tamanho)
+        return SequenciaPedido.objects.filter(empresa_id=empresa_id).values_list('proximo', flat=True).get() - tamanho
+
+
+def proximo_numero(empresa_id):
+    with _trava:
+        bloco = _blocos.get(empresa_id)
+        if bloco and bloco[0] < bloco[1]:
+            numero = bloco[0]
+            bloco[0] += 1
+            return numero
+
+    inicio = _reservar_bloco(empresa_id, TAMANHO_BLOCO)
+    restante = [inicio + 1, inicio + TAMANHO_BLOCO]
+
+    def guardar():
+        with _trava:
+            _blocos[empresa_id] = restante
+
+    # O bloco só fica disponível aos outros pedidos depois do commit: se a transação for
+    # desfeita o contador volta atrás e o bloco não pode ser reaproveitado.
+    transaction.on_commit(guardar)
+    return inicio
+
+
+def limpar_cache():
+    """Descarta os blocos em memória (usado nos testes, em que o banco é recriado)."""
+    with _trava:
+        _blocos.clear()
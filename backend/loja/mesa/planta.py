@@ -0,0 +1,38 @@
+# backend/loja/mesa/planta.py
+"""Cache do mapa de mesas (GET /api/mesas-planta/).
+
+A resposta fica em cache até a próxima alteração de qualquer mesa ou item:
+os receivers de mesa/signals.py trocam a versão no commit, o que torna todas
+as entradas antigas inalcançáveis (elas expiram sozinhas pelo TTL).
+"""
+import time
+
+from django.core.cache import cache
+from django.db import transaction
+
+CHAVE_VERSAO = 'mesas:planta:versao'
+TTL = 300  # segundos; só um limite de segurança, a invalidação é pela versão
+
+
+def _versao():
+    versao = cache.get(CHAVE_VERSAO)
+    if versao is None:
+        # time_ns evita reaproveitar uma versão antiga se a chave tiver sido descartada
+        versao = time.time_ns()
+        cache.add(CHAVE_VERSAO, versao, timeout=None)
+        versao = cache.get(CHAVE_VERSAO, versao)
+    return versao
+
+
+def obter(empresa_id, montar):
+    """Resposta em cache para a empresa, ou ``montar()`` guardado na versão atual."""
+    chave = f'mesas:planta:{empresa_id}:{_versao()}'
+    dados = cache.get(chave)
+    if dados is None:
+        dados = montar()
+        cache.set(chave, dados, TTL)
+    return dados
+
+
+def invalidar():
+    transaction.on_commit(lambda: cache.set(CHAVE_VERSAO, time.time_ns(), timeout=None))
@@ -0,0 +1,29 @@
+# backend/loja/mesa/queries.py
+from decimal import Decimal
+
+from django.db.models import Count, DecimalField, F, Sum, Value
+from django.db.models.functions import Coalesce
+
+from .models import Mesa
+
+
+def mesas(queryset=None):
+    """Mesas prontas para o MesaSerializer (itens em uma única query extra)."""
+    queryset = Mesa.objects.all() if queryset is None else queryset
+    return queryset.prefetch_related('items')
+
+
+def planta(empresa_id):
+    """Mesas da empresa com quantidade de itens e total em aberto, em uma única query agrupada."""
+    return (
+        Mesa.objects.filter(empresa_id=empresa_id)
+        .annotate(
+            itens=Count('items'),
+            total=Coalesce(
+                Sum(F('items__quantidade') * F('items__preco_unitario')),
+                Value(Decimal('0.00')),
+                output_field=DecimalField(max_digits=12, decimal_places=2),
+            ),
+        )
+        .order_by('numero', 'id')
+    )
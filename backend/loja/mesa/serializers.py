@@ -1,4 +1,5 @@
 # backend/loja/mesa/serializers.py
+from decimal import Decimal
 from rest_framework import serializers
 from .models import Mesa, ItemMesa
 
@@ -15,3 +16,22 @@ class MesaSerializer(serializers.ModelSerializer):
         fields = ['id', 'empresa', 'numero', 'nome', 'descricao', 'status', 'pedido', 'slug', 'items', 'created', 'updated', 'not_numerico']
 
 
+class MesaPlantaSerializer(serializers.ModelSerializer):
+    """Resumo da mesa para o mapa do caixa (espera o queryset de queries.planta)."""
+    itens = serializers.IntegerField(read_only=True)
+    total = serializers.DecimalField(max_digits=12, decimal_places=2, read_only=True)
+    restante = serializers.SerializerMethodField()
+    restante_por_pessoa = serializers.SerializerMethodField()
+
+    class Meta:
+        model = Mesa
+        fields = ['id', 'slug', 'numero', 'nome', 'status', 'pedido', 'itens', 'total', 'valor_pago',
+                  'numero_pessoas', 'pessoas_pagaram', 'restante', 'restante_por_pessoa']
+
+    def get_restante(self, mesa):
+        return str(max(mesa.total - mesa.valor_pago, Decimal('0.00')).quantize(Decimal('0.01')))
+
+    def get_restante_por_pessoa(self, mesa):
+        pessoas = max(mesa.numero_pessoas - mesa.pessoas_pagaram, 1)
+        return str((Decimal(self.get_restante(mesa)) / pessoas).quantize(Decimal('0.01')))
+
@@ -0,0 +1,14 @@
+# backend/loja/mesa/signals.py
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from .models import ItemMesa, Mesa
+from . import planta
+
+
+@receiver([post_save, post_delete], sender=Mesa)
+@receiver([post_save, post_delete], sender=ItemMesa)
+def invalidar_planta(sender, instance, raw=False, **kwargs):
+    """Qualquer alteração de mesa ou item derruba o cache do mapa de mesas."""
+    if raw:
+        return
+    planta.invalidar()
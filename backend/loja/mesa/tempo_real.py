@@ -0,0 +1,43 @@
+# backend/loja/mesa/tempo_real.py
+"""Eventos de mesa empurrados aos tablets dos garçons (WebSocket /ws/mesas/).
+
+Os eventos são deltas: a mesa (sem a lista de itens) e, quando for o caso, o
+item que mudou. O cliente recebe o estado completo só ao conectar.
+
+Os sinais abaixo avisam outros apps (ex.: cozinha) do que foi pedido ou
+cancelado na mesa; são enviados dentro da transação da alteração.
+"""
+from django.dispatch import Signal
+
+from loja.canais import publicar
+
+GRUPO = 'mesas'
+
+ITEM_ADICIONADO = 'item_adicionado'
+ITEM_ATUALIZADO = 'item_atualizado'
+ITEM_REMOVIDO = 'item_removido'
+MESA_LIBERADA = 'mesa_liberada'
+
+itens_pedidos = Signal()     # mesa, itens=[(Produto, quantidade acrescentada)]
+itens_cancelados = Signal()  # mesa, produtos=[ids] (None: todos os itens da mesa)
+
+
+def _mesa(mesa):
+    return {'id': mesa.id, 'slug': mesa.slug, 'numero': mesa.numero, 'nome': mesa.nome,
+            'status': mesa.status, 'pedido': mesa.pedido}
+
+
+def item_alterado(mesa, item, evento):
+    # Os dados são copiados agora: no commit a instância já pode ter mudado
+    dados = {'evento': evento, 'mesa': _mesa(mesa)}
+    if evento == ITEM_REMOVIDO:
+        dados['item'] = {'id': item.id, 'produto_id': item.produto_id_id}
+    else:
+        from .serializers import ItemMesaSerializer  # serializers importa models, que importa este módulo
+        dados['item'] = ItemMesaSerializer(item).data
+    publicar(GRUPO, lambda: dados)
+
+
+def mesa_liberada(mesa):
+    dados = {'evento': MESA_LIBERADA, 'mesa': _mesa(mesa)}
+    publicar(GRUPO, lambda: dados)
@@ -1,3 +1,238 @@
+import asyncio
+import json
+from decimal import Decimal
+
+from asgiref.sync import async_to_sync, sync_to_async
+from django.core.cache import cache
+from django.db import connection, transaction
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework_simplejwt.tokens import AccessToken
+
+from estoque.models import Estoque
+from loja.asgi import application
+from loja.canais import camada
+from loja.testing import QueryCountMixin, cliente_autenticado, criar_empresa, criar_produto, criar_usuario
+from . import numeracao, tempo_real
+from .models import Mesa, ItemMesa, SequenciaPedido
+
+
+class MesaQueryCountTests(QueryCountMixin, TestCase):
+    def setUp(self):
+        self.empresa = criar_empresa()
+        self.produto = criar_produto(empresa=self.empresa)
+        self.client = cliente_autenticado()
+
+    def criar_mesas(self, quantidade):
+        for _ in range(quantidade):
+            numero = str(Mesa.objects.count() + 1)
+            mesa = Mesa.objects.create(empresa=self.empresa, numero=numero, nome=f'Mesa {numero}')
+            ItemMesa.objects.create(mesa=mesa, produto_id=self.produto, quantidade=2)
+
+    def test_lista_de_mesas(self):
+        # mesas + itens
+        self.assertNumQueriesFixo(2, self.client, '/api/mesas/', self.criar_mesas)
+
+
+class MesaTempoRealTests(TestCase):
+    def setUp(self):
+        self.empresa = criar_empresa()
+        self.produto = criar_produto(empresa=self.empresa)
+        self.mesa = Mesa.objects.create(empresa=self.empresa, numero='1', nome='Mesa 1')
+
+    def conectar(self, query_string):
+        """Abre /ws/mesas/ direto no ASGI; devolve (entrada, saida, tarefa da conexão)."""
+        entrada, saida = asyncio.Queue(), asyncio.Queue()
+        scope = {'type': 'websocket', 'path': '/ws/mesas/', 'query_string': query_string.encode()}
+        conexao = asyncio.ensure_future(application(scope, entrada.get, saida.put))
+        entrada.put_nowait({'type': 'websocket.connect'})
+        return entrada, saida, conexao
+
+    def test_deltas_so_apos_o_commit(self):
+        loop = asyncio.new_event_loop()
+        fila = asyncio.Queue()
+        camada.inscrever(tempo_real.GRUPO, fila, loop)
+        try:
+            with self.captureOnCommitCallbacks(execute=True):
+                self.mesa.adicionar_item(self.produto, 2)
+                loop.run_until_complete(asyncio.sleep(0))
+                self.assertTrue(fila.empty())  # nada antes do commit
+            with self.captureOnCommitCallbacks(execute=True):
+                self.mesa.adicionar_item(self.produto, 1)
+            with self.captureOnCommitCallbacks(execute=True):
+                self.mesa.cancelar_pedido()
+            loop.run_until_complete(asyncio.sleep(0))
+            eventos = [fila.get_nowait() for _ in range(fila.qsize())]
+        finally:
+            camada.cancelar(tempo_real.GRUPO, fila)
+            loop.close()
+        self.assertEqual([e['evento'] for e in eventos], ['item_adicionado', 'item_atualizado', 'mesa_liberada'])
+        self.assertEqual(eventos[1]['item']['quantidade'], 3)
+        self.assertEqual(eventos[2]['mesa']['status'], 'Livre')
+
+    def test_websocket_envia_estado_e_deltas(self):
+        token = str(AccessToken.for_user(criar_usuario()))
+
+        def adicionar():
+            with self.captureOnCommitCallbacks(execute=True):
+                self.mesa.adicionar_item(self.produto, 1)
+
+        async def cenario():
+            entrada, saida, conexao = self.conectar(f'token={token}')
+            self.assertEqual((await saida.get())['type'], 'websocket.accept')
+            estado = json.loads((await saida.get())['text'])
+            await sync_to_async(adicionar)()
+            delta = json.loads((await asyncio.wait_for(saida.get(), 2))['text'])
+            await entrada.put({'type': 'websocket.disconnect'})
+            await asyncio.wait_for(conexao, 2)
+            return estado, delta
+
+        estado, delta = async_to_sync(cenario)()
+        self.assertEqual(estado['evento'], 'estado')
+        self.assertEqual([m['slug'] for m in estado['mesas']], [self.mesa.slug])
+        self.assertEqual((delta['evento'], delta['mesa']['status']), ('item_adicionado', 'Ocupada'))
+        self.assertEqual(camada.inscritos(tempo_real.GRUPO), 0)
+
+    def test_websocket_sem_token_e_recusado(self):
+        async def cenario():
+            _, saida, conexao = self.conectar('')
+            resposta = await saida.get()
+            await conexao
+            return resposta
+
+        self.assertEqual(async_to_sync(cenario)(), {'type': 'websocket.close', 'code': 4401})
+
+
+class NumeracaoPedidoTests(TestCase):
+    def setUp(self):
+        numeracao.limpar_cache()
+        self.addCleanup(numeracao.limpar_cache)
+        self.empresa = criar_empresa()
+
+    def test_numeros_por_empresa_em_blocos(self):
+        outra = criar_empresa()
+        with self.captureOnCommitCallbacks(execute=True):
+            primeiro = numeracao.proximo_numero(self.empresa.id)
+        with self.assertNumQueries(0):  # o resto do bloco sai da memória
+            seguintes = [numeracao.proximo_numero(self.empresa.id) for _ in range(numeracao.TAMANHO_BLOCO - 1)]
+        self.assertEqual([primeiro] + seguintes, list(range(1, numeracao.TAMANHO_BLOCO + 1)))
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(numeracao.proximo_numero(self.empresa.id), numeracao.TAMANHO_BLOCO + 1)
+            self.assertEqual(numeracao.proximo_numero(outra.id), 1)
+        self.assertEqual(SequenciaPedido.objects.get(empresa=self.empresa).proximo, 2 * numeracao.TAMANHO_BLOCO + 1)
+
+    def test_bloco_de_transacao_desfeita_nao_e_reaproveitado(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            try:
+                with transaction.atomic():
+                    self.assertEqual(numeracao.proximo_numero(self.empresa.id), 1)
+                    raise RuntimeError
+            except RuntimeError:
+                pass
+        # o contador voltou atrás junto com a transação, e o bloco não ficou em memória
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(numeracao.proximo_numero(self.empresa.id), 1)
+        self.assertEqual(numeracao.proximo_numero(self.empresa.id), 2)
+
+    def test_primeiro_item_numera_a_mesa(self):
+        produto = criar_produto(empresa=self.empresa)
+        mesas = [Mesa.objects.create(empresa=self.empresa, numero=str(n), nome=f'Mesa {n}') for n in (1, 2)]
+        for mesa in mesas:
+            with self.captureOnCommitCallbacks(execute=True):
+                mesa.adicionar_item(produto, 1)
+        self.assertEqual([m.pedido for m in mesas], [1, 2])
+
+    def test_instancia_velha_nao_abre_outro_numero(self):
+        produto = criar_produto(empresa=self.empresa)
+        mesa = Mesa.objects.create(empresa=self.empresa, numero='3', nome='Mesa 3')
+        garcons = [Mesa.objects.get(pk=mesa.pk) for _ in range(2)]  # as duas leram a mesa vazia
+        with self.captureOnCommitCallbacks(execute=True):
+            garcons[0].adicionar_item(produto, 1)
+        with self.captureOnCommitCallbacks(execute=True):
+            garcons[1].adicionar_rodada([(produto.id, 2)])
+        mesa.refresh_from_db()
+        self.assertEqual((mesa.pedido, garcons[1].pedido), (1, 1))
+        self.assertEqual(numeracao.proximo_numero(self.empresa.id), 2)  # nenhum número queimado
+
+
+class PlantaMesasTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.empresa = criar_empresa()
+        self.client = cliente_autenticado()
+        self.chopp = criar_produto(empresa=self.empresa, venda=12)
+        self.porcao = criar_produto(empresa=self.empresa, nome='Porção', venda=30)
+        self.mesa = Mesa.objects.create(empresa=self.empresa, numero='1', nome='Mesa 1', numero_pessoas=3,
+                                        valor_pago=10, pessoas_pagaram=1)
+        Mesa.objects.create(empresa=self.empresa, numero='2', nome='Mesa 2')
+        self.mesa.adicionar_item(self.chopp, 3)
+        self.mesa.adicionar_item(self.porcao, 1)
+
+    def test_totais_em_uma_query(self):
+        url = f'/api/mesas-planta/?empresa={self.empresa.id}'
+        with self.assertNumQueries(1):
+            response = self.client.get(url)
+        ocupada, livre = response.data
+        self.assertEqual((ocupada['itens'], ocupada['total']), (2, '66.00'))
+        self.assertEqual((ocupada['restante'], ocupada['restante_por_pessoa']), ('56.00', '28.00'))
+        self.assertEqual((livre['itens'], livre['total'], livre['status']), (0, '0.00', 'Livre'))
+        self.assertEqual(self.mesa.calcular_total(), Decimal('66.00'))
+
+    def test_cache_ate_a_proxima_alteracao(self):
+        url = f'/api/mesas-planta/?empresa={self.empresa.id}'
+        self.client.get(url)
+        with self.assertNumQueries(0):
+            self.client.get(url)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.mesa.adicionar_item(self.chopp, 1)
+        self.assertEqual(self.client.get(url).data[0]['total'], '78.00')
+
+
+class RodadaMesaTests(TestCase):
+    def setUp(self):
+        self.empresa = criar_empresa()
+        self.client = cliente_autenticado()
+        self.chopp = criar_produto(empresa=self.empresa, estoque=20)
+        self.porcao = criar_produto(empresa=self.empresa, nome='Porção', venda=30, estoque=2)
+        self.mesa = Mesa.objects.create(empresa=self.empresa, numero='8', nome='Mesa 8')
+        self.mesa.adicionar_item(self.chopp, 1)
+        self.url = f'/api/mesas/{self.mesa.slug}/rodada/'
+
+    def test_rodada_numa_requisicao(self):
+        rodada = [{'produto_id': self.chopp.id, 'quantidade': 8}, {'produto_id': self.porcao.id, 'quantidade': 2}]
+        response = self.client.post(self.url, {'itens': rodada}, format='json')
+        self.assertEqual(response.status_code, 201, response.content)
+        quantidades = {item['produto_nome']: item['quantidade'] for item in response.data['items']}
+        self.assertEqual(quantidades, {'Chopp Pilsen': 9, 'Porção': 2})
+        self.chopp.refresh_from_db()
+        self.porcao.refresh_from_db()
+        self.assertEqual((self.chopp.estoque, self.porcao.estoque), (11, 0))
+
+    def test_rodada_sem_estoque_nao_grava_nada(self):
+        rodada = [{'produto_id': self.chopp.id, 'quantidade': 8}, {'produto_id': self.porcao.id, 'quantidade': 3}]
+        response = self.client.post(self.url, rodada, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data['produto_id'], self.porcao.id)
+        self.chopp.refresh_from_db()
+        self.assertEqual(self.chopp.estoque, 19)
+        self.assertEqual(list(self.mesa.items.values_list('quantidade', flat=True)), [1])
+
+    def test_queries_nao_crescem_com_a_rodada(self):
+        produtos = [criar_produto(empresa=self.empresa, nome=f'Petisco {n}') for n in range(10)]
+        contagens = []
+        for lote in (produtos[:2], produtos[2:]):
+            with CaptureQueriesContext(connection) as contexto:
+                self.client.post(self.url, [{'produto_id': p.id, 'quantidade': 1} for p in lote], format='json')
+            contagens.append(len(contexto))
+        self.assertEqual(contagens[0], contagens[1])
 
-# Create your tests here.
+    def test_cancelar_pedido_devolve_o_estoque(self):
+        self.mesa.adicionar_rodada([(self.chopp.id, 4), (self.porcao.id, 2)])
+        response = self.client.post(f'/api/mesas/{self.mesa.slug}/cancelar-pedido/')
+        self.assertLess(response.status_code, 400, response.content)
+        self.chopp.refresh_from_db()
+        self.porcao.refresh_from_db()
+        self.assertEqual((self.chopp.estoque, self.porcao.estoque), (20, 2))
+        estornos = Estoque.objects.filter(tipo=Estoque.ESTORNO).values_list('produto_id', 'quantidade')
+        self.assertEqual(sorted(estornos), sorted([(self.chopp.id, 5), (self.porcao.id, 2)]))
+        self.assertFalse(self.mesa.items.exists())
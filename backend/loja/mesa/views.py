@@ -3,13 +3,17 @@ from rest_framework.response import Response
 from rest_framework.decorators import api_view
 from rest_framework import status
 from .models import Mesa, Empresa, ItemMesa, Produto
-from .serializers import MesaSerializer, ItemMesaSerializer
+from .serializers import MesaSerializer, ItemMesaSerializer, MesaPlantaSerializer
+from . import planta, queries
+from idempotencia.decorators import idempotente
+from loja.pagination import paginar
+from estoque.services import EstoqueInsuficiente
 from django.db.models import Q
 
 @api_view(['GET'])
 def search_mesas(request):
     query = request.query_params.get("search")
-    mesas = Mesa.objects.filter(
+    mesas = queries.mesas().filter(
         Q(nome__icontains=query)
     )
     serializer = MesaSerializer(mesas, many=True)
@@ -18,9 +22,8 @@ def search_mesas(request):
 @api_view(['GET', 'POST']) # Adicionar POST para criar uma nova mesa 
 def mesas(request): # Adicionar request como argumento da função 
     if request.method == 'GET': # Adicionar um bloco de código para o método GET 
-        mesas = Mesa.objects.all() # Adicionar uma variável mesas para armazenar todas as mesas
-        serializer = MesaSerializer(mesas, many=True) 
-        return Response(serializer.data)
+        mesas = queries.mesas() # Adicionar uma variável mesas para armazenar todas as mesas
+        return paginar(request, mesas, MesaSerializer)
     
     elif request.method == 'POST':
         empresa_id = request.data.get('empresa')
@@ -46,10 +49,22 @@ def mesas(request): # Adicionar request como argumento da função
         
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
+@api_view(['GET'])
+def planta_mesas(request):
+    """Mapa de mesas do caixa: status, itens, total em aberto e quanto falta por pessoa."""
+    empresa_id = request.query_params.get('empresa')
+    if not empresa_id:
+        empresa_id = Empresa.objects.values_list('id', flat=True).first()  # Usa a primeira empresa se não for enviada
+    elif not str(empresa_id).isdigit():
+        return Response({"error": "Empresa inválida"}, status=status.HTTP_400_BAD_REQUEST)
+
+    dados = planta.obter(empresa_id, lambda: list(MesaPlantaSerializer(queries.planta(empresa_id), many=True).data))
+    return Response(dados)
+
 @api_view(['GET', 'PUT', 'DELETE'])
 def mesa_detail(request, slug):
     try:
-        mesa = Mesa.objects.get(slug=slug)
+        mesa = queries.mesas().get(slug=slug)
     except Mesa.DoesNotExist:
         return Response(status=status.HTTP_404_NOT_FOUND)
 
@@ -70,6 +85,7 @@ def mesa_detail(request, slug):
     
 
 @api_view(['POST'])
+@idempotente
 def adicionar_item_mesa(request, slug):
     print(f'🚀 Tentando adicionar item à mesa com slug: {slug}')
     try:
@@ -95,21 +111,49 @@ def adicionar_item_mesa(request, slug):
         print(f'❌ Produto com ID {produto_id} não encontrado!')
         return Response({"error": "Produto não encontrado"}, status=status.HTTP_404_NOT_FOUND)
 
-    if produto.estoque < quantidade:
-        print(f'❌ Estoque insuficiente para {produto.nome}: {produto.estoque} disponíveis')
+    # Usar o método adicionar_item do modelo Mesa (reserva o estoque de forma atômica)
+    try:
+        mesa.adicionar_item(produto, quantidade)
+    except EstoqueInsuficiente:
+        print(f'❌ Estoque insuficiente para {produto.nome}')
         return Response({"error": "Estoque insuficiente"}, status=status.HTTP_400_BAD_REQUEST)
+    print(f'✅ Item {produto.nome} adicionado, estoque reservado: {quantidade}')
 
-    # Usar o método adicionar_item do modelo Mesa
-    mesa.adicionar_item(produto, quantidade)
+    serializer = MesaSerializer(queries.mesas().get(pk=mesa.pk))
+    return Response(serializer.data, status=status.HTTP_201_CREATED)
+      
+@api_view(['POST'])
+@idempotente
+def adicionar_rodada_mesa(request, slug):
+    """Rodada: vários itens numa requisição só. Aceita [{produto_id, quantidade}, ...] ou {"itens": [...]}."""
+    print(f'🚀 Recebendo rodada para a mesa com slug: {slug}')
+    try:
+        mesa = Mesa.objects.get(slug=slug)
+    except Mesa.DoesNotExist:
+        return Response({"error": "Mesa não encontrada"}, status=status.HTTP_404_NOT_FOUND)
 
-    # Atualizar o estoque
-    produto.estoque -= quantidade
-    produto.save()
-    print(f'✅ Estoque atualizado: {produto.estoque}')
+    linhas = request.data.get('itens') if isinstance(request.data, dict) else request.data
+    if not isinstance(linhas, list) or not linhas:
+        return Response({"error": "Envie uma lista de itens com produto_id e quantidade"}, status=status.HTTP_400_BAD_REQUEST)
+    try:
+        pares = [(int(linha['produto_id']), int(linha.get('quantidade', 1))) for linha in linhas]
+    except (KeyError, TypeError, ValueError, AttributeError):
+        return Response({"error": "Cada item precisa de produto_id e quantidade inteiros"}, status=status.HTTP_400_BAD_REQUEST)
+    if any(quantidade < 1 for _, quantidade in pares):
+        return Response({"error": "Quantidade deve ser maior que zero"}, status=status.HTTP_400_BAD_REQUEST)
 
-    serializer = MesaSerializer(mesa)
+    try:
+        mesa.adicionar_rodada(pares)
+    except Produto.DoesNotExist as e:
+        return Response({"error": str(e)}, status=status.HTTP_404_NOT_FOUND)
+    except EstoqueInsuficiente as e:
+        print(f'❌ {e}')
+        return Response({"error": "Estoque insuficiente", "produto_id": e.produto_id}, status=status.HTTP_400_BAD_REQUEST)
+    print(f'✅ Rodada com {len(pares)} itens adicionada à mesa {mesa.nome}')
+
+    serializer = MesaSerializer(queries.mesas().get(pk=mesa.pk))
     return Response(serializer.data, status=status.HTTP_201_CREATED)
-      
+
 @api_view(['POST'])
 def remover_item_mesa(request, slug):
     print(f'🚀 Tentando remover item da mesa com slug: {slug}')
@@ -125,28 +169,56 @@ def remover_item_mesa(request, slug):
         print('❌ Item ID não fornecido!')
         return Response({"error": "Item ID é obrigatório"}, status=status.HTTP_400_BAD_REQUEST)
 
-    try:
-        item = ItemMesa.objects.get(id=item_id, mesa=mesa)
-        produto = item.produto_id  # Ajustado de produto para produto_id
-        print(f'✅ Item encontrado: {item.produto_nome}, quantidade: {item.quantidade}')
-    except ItemMesa.DoesNotExist:
+    # Usar o método remover_item do modelo Mesa (devolve o estoque e libera a mesa se ficar vazia)
+    item = mesa.remover_item(item_id=item_id)
+    if item is None:
         print(f'❌ Item com ID {item_id} não encontrado na mesa {mesa.nome}!')
         return Response({"error": "Item não encontrado"}, status=status.HTTP_404_NOT_FOUND)
+    print(f'✅ Item {item.produto_nome} removido da mesa {mesa.nome}, estoque devolvido: {item.quantidade}')
+
+    serializer = MesaSerializer(queries.mesas().get(pk=mesa.pk))
+    return Response(serializer.data, status=status.HTTP_200_OK)
 
-    quantidade = item.quantidade
-    item.delete()
-    produto.estoque += quantidade
-    produto.save()
-    print(f'✅ Item removido da mesa {mesa.nome}, estoque atualizado: {produto.estoque}')
+def _fechar(request, fechamentos):
+    # Importado aqui: o app pedido depende de mesa
+    from pedido.serializers import PedidoSerializer
+    from pedido.services import DescontoInvalido, MesaVazia, fechar_mesas
+    from pedido import queries as pedido_queries
 
-    if not mesa.items.exists():
-        mesa.status = 'Livre'
-        mesa.pedido = 0
-        mesa.save()
-        print(f'✅ Mesa {mesa.nome} redefinida para o estado inicial')
+    try:
+        pedidos = fechar_mesas(fechamentos, usuario=request.user if request.user.is_authenticated else None)
+    except Mesa.DoesNotExist as e:
+        return None, Response({"error": str(e)}, status=status.HTTP_404_NOT_FOUND)
+    except MesaVazia as e:
+        return None, Response({"error": str(e), "mesa": e.mesa.slug}, status=status.HTTP_400_BAD_REQUEST)
+    except DescontoInvalido as e:
+        return None, Response({"error": str(e), "mesa": e.mesa.slug}, status=status.HTTP_400_BAD_REQUEST)
+    except (TypeError, ValueError, ArithmeticError):
+        return None, Response({"error": "Valores de pagamento inválidos"}, status=status.HTTP_400_BAD_REQUEST)
+    print(f'✅ {len(pedidos)} mesa(s) fechada(s)')
+    dados = PedidoSerializer(pedido_queries.pedidos().filter(pk__in=[p.pk for p in pedidos]).order_by('id'), many=True).data
+    return dados, None
 
-    serializer = MesaSerializer(mesa)
-    return Response(serializer.data, status=status.HTTP_200_OK)
+@api_view(['POST'])
+def fechar_mesa(request, slug):
+    """Mesa paga: vira um Pedido de origem 'fisica' (com valor_pago/pessoas_pagaram) e volta a ficar Livre."""
+    print(f'🚀 Fechando a mesa com slug: {slug}')
+    dados, erro = _fechar(request, [{**request.data, 'slug': slug}])
+    if erro:
+        return erro
+    return Response(dados[0], status=status.HTTP_201_CREATED)
+
+@api_view(['POST'])
+def fechar_mesas_lote(request):
+    """Fechamento do turno: {"mesas": [{"slug": ..., "metodo_pagamento": ..., ...}, ...]} numa transação."""
+    fechamentos = request.data.get('mesas') if isinstance(request.data, dict) else request.data
+    if not isinstance(fechamentos, list) or not fechamentos or not all(isinstance(f, dict) and f.get('slug') for f in fechamentos):
+        return Response({"error": "Envie uma lista de mesas com slug"}, status=status.HTTP_400_BAD_REQUEST)
+    print(f'🚀 Fechando {len(fechamentos)} mesas em lote')
+    dados, erro = _fechar(request, fechamentos)
+    if erro:
+        return erro
+    return Response(dados, status=status.HTTP_201_CREATED)
 
 @api_view(['POST'])
 def cancelar_pedido(request, slug):
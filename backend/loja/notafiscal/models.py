@@ -1,10 +1,13 @@
 # backend\loja\notafiscal\models.py
 from django.db import models
 from empresa.models import Empresa
-from django.utils.text import slugify
-from django.utils.crypto import get_random_string
+from loja.slugs import SlugUnicoMixin
+
+class NotaFiscal(SlugUnicoMixin, models.Model):
+    # O slug segue o campo serie: é regerado quando ele muda
+    slug_origem = 'serie'
+    slug_acompanha_origem = True
 
-class NotaFiscal(models.Model):
     # A nota fiscal pertence a uma empresa. Portanto a empresa é a chave estrangeira da nota fiscal e será excluída se a empresa for excluída 
     # Por isso foi utilizado o on_delete=models.CASCADE
     # Dessa forma, a nota fiscal não pode existir sem uma empresa associada a ela 
@@ -21,17 +24,14 @@ class NotaFiscal(models.Model):
     created = models.DateTimeField(auto_now_add=True) # Quando o registro for criado, a data e hora serão salvas
     updated = models.DateTimeField(auto_now=True) # Sempre que o registro for atualizado, a data e hora serão salvas
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['created', 'id'], name='notafiscal_created_id_idx'),  # paginação por cursor
+        ]
+
     def __str__(self):
         return f'{self.serie} - {self.numero}'
     
-    def save(self, *args, **kwargs):
-        if not self.slug or NotaFiscal.objects.filter(pk=self.pk).exists() and self.serie != NotaFiscal.objects.get(pk=self.pk).serie:
-            slug_base = slugify(self.serie)
-            slug = slug_base
-            if NotaFiscal.objects.filter(slug=slug).exists():
-                slug = f'{slug_base}-{get_random_string(5)}'
-            self.slug = slug
-        super(NotaFiscal, self).save(*args, **kwargs)
 
 
 
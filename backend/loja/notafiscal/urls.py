@@ -3,6 +3,7 @@ from . import views
 
 urlpatterns = [
     path("notasfiscais/", views.notasfiscais, name="notasfiscais"),
+    path("notasfiscais/exportar/", views.exportar_notasfiscais, name="notasfiscais-exportar"),
     path("notasfiscais/<slug:slug>/", views.notafiscal_detail, name="notafiscal-detail"),
     path("notasfiscais-search/", views.search_notasfiscais, name='notasfiscais-search'),
 ]
\ No newline at end of file
@@ -1,9 +1,12 @@
 # filepath: /d:/Meta-AI/notafiscal-tracker-notas/backend/loja/notafiscal/views.py
 from rest_framework.response import Response
-from rest_framework.decorators import api_view
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import IsAdminUser
 from rest_framework import status
 from .models import NotaFiscal
 from .serializers import NotaFiscalSerializer
+from loja.exportacao import exportar
+from loja.pagination import paginar
 from django.db.models import Q
 
 @api_view(['GET'])
@@ -19,8 +22,7 @@ def search_notasfiscais(request):
 def notasfiscais(request):
     if request.method == 'GET':
         notasfiscais = NotaFiscal.objects.all()
-        serializer = NotaFiscalSerializer(notasfiscais, many=True)
-        return Response(serializer.data)
+        return paginar(request, notasfiscais, NotaFiscalSerializer)
     
     elif request.method == 'POST':
         serializer = NotaFiscalSerializer(data=request.data)
@@ -57,3 +59,11 @@ def notafiscal_detail(request, slug):
 
 
 
+
+
+# Exportação para a administração: streaming linha a linha (?formato=ndjson|csv, ?empresa=, ?inicio=, ?fim=)
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def exportar_notasfiscais(request):
+    campos = ('id', 'empresa_id', 'serie', 'numero', 'descricao', 'data', 'created')
+    return exportar(request, NotaFiscal.objects.all(), campos, 'notasfiscais', campo_data='data')
@@ -0,0 +1,30 @@
+# Generated by Django 5.1.7 on 2026-10-18 15:49
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('mesa', '0003_sequencia_pedido'),
+        ('pedido', '0002_pedido_pedido_created_id_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='pedido',
+            name='mesa',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='pedidos', to='mesa.mesa'),
+        ),
+        migrations.AddField(
+            model_name='pedido',
+            name='pessoas_pagaram',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='pedido',
+            name='valor_pago',
+            field=models.DecimalField(decimal_places=2, default=0.0, max_digits=10),
+        ),
+    ]
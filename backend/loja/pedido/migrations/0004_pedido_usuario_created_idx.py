@@ -0,0 +1,22 @@
+# Generated by Django 5.1.7 on 2026-10-18 16:03
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('carrinho', '0002_carrinho_carrinho_criado_em_id_idx'),
+        ('empresa', '0002_empresa_empresa_created_id_idx'),
+        ('mesa', '0003_sequencia_pedido'),
+        ('pedido', '0003_pedido_mesa_pagamento'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='pedido',
+            index=models.Index(fields=['usuario', '-created', '-id'], name='pedido_usuario_created_idx'),
+        ),
+    ]
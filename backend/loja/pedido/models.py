@@ -1,14 +1,13 @@
 
 from django.db import models
 from django.contrib.auth.models import User
-from django.utils.text import slugify
-from django.utils.crypto import get_random_string
 from produto.models import Produto
 from mesa.models import Mesa
 from carrinho.models import Carrinho
 from empresa.models import Empresa
+from loja.slugs import SlugUnicoMixin
 
-class Pedido(models.Model):
+class Pedido(SlugUnicoMixin, models.Model):
     usuario = models.ForeignKey(User, null=True, blank=True, on_delete=models.SET_NULL)
     carrinho = models.ForeignKey(Carrinho, null=True, blank=True, on_delete=models.SET_NULL)
     empresa = models.ForeignKey(Empresa, on_delete=models.CASCADE)
@@ -21,23 +20,42 @@ class Pedido(models.Model):
     metodo_pagamento = models.CharField(max_length=50, null=True, blank=True)
     desconto_aplicado = models.DecimalField(max_digits=10, decimal_places=2, default=0.00)
     origem = models.CharField(max_length=10, choices=[('online', 'Online'), ('fisica', 'Física')], default='online')
+    # Pedidos da loja física: mesa de origem e como a conta foi dividida no fechamento
+    mesa = models.ForeignKey(Mesa, null=True, blank=True, on_delete=models.SET_NULL, related_name='pedidos')
+    valor_pago = models.DecimalField(max_digits=10, decimal_places=2, default=0.00)
+    pessoas_pagaram = models.PositiveIntegerField(default=0)
     slug = models.SlugField(unique=True, blank=True, null=True)
     is_available = models.BooleanField(default=True)
     created = models.DateTimeField(auto_now_add=True)
     updated = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['created', 'id'], name='pedido_created_id_idx'),  # paginação por cursor
+            models.Index(fields=['usuario', '-created', '-id'], name='pedido_usuario_created_idx'),  # histórico do cliente
+        ]
+
+    slug_sempre_com_sufixo = True
+
+    def get_slug_base(self):
+        return 'pedido'
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        if 'status' in field_names:
+            instance._status_carregado = values[field_names.index('status')]
+        return instance
+
     def save(self, *args, **kwargs):
-        if not self.slug:
-            slug_base = slugify(f'pedido-{self.id or "temp"}-{get_random_string(5)}')
-            slug = slug_base
-            if Pedido.objects.filter(slug=slug).exists():
-                slug = f'{slug_base}-{get_random_string(5)}'
-            self.slug = slug
-        if self.carrinho:
+        if self.carrinho_id:
             self.origem = 'online'
+        # Status antes deste save (None na criação): os rollups de vendas só mudam quando ele muda
+        self.status_anterior = None if self._state.adding else getattr(self, '_status_carregado', self.status)
         super().save(*args, **kwargs)
+        self._status_carregado = self.status
 
-class ItemPedido(models.Model):
+class ItemPedido(SlugUnicoMixin, models.Model):
     pedido = models.ForeignKey(Pedido, related_name='itens', on_delete=models.CASCADE)
     produto = models.ForeignKey(Produto, on_delete=models.CASCADE)
     quantidade = models.PositiveIntegerField()
@@ -45,9 +63,22 @@ class ItemPedido(models.Model):
     total = models.DecimalField(max_digits=10, decimal_places=2)
     slug = models.SlugField(unique=True, blank=True, null=True)
 
+    slug_sempre_com_sufixo = True
+
+    def get_slug_base(self):
+        """Também usado pelo bulk_create (criar_em_lote), que não chama save."""
+        return f'item-{self.produto.nome}'
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Valores gravados: se o item mudar, os rollups de vendas somam só a diferença
+        carregado = dict(zip(field_names, values))
+        if {'produto_id', 'quantidade', 'total'} <= carregado.keys():
+            instance._carregado = (carregado['produto_id'], carregado['quantidade'], carregado['total'])
+        return instance
+
     def save(self, *args, **kwargs):
         self.total = self.quantidade * self.preco_unitario
-        if not self.slug:
-            slug_base = slugify(f'item-{self.produto.nome}-{get_random_string(5)}')
-            self.slug = slug_base
         super().save(*args, **kwargs)
+        self._carregado = (self.produto_id, self.quantidade, self.total)
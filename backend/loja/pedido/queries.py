@@ -0,0 +1,31 @@
+# backend/loja/pedido/queries.py
+from django.db.models import Count, IntegerField, OuterRef, Prefetch, Subquery, Value
+from django.db.models.functions import Coalesce
+from .models import Pedido, ItemPedido
+
+
+def itens_pedido():
+    """Itens com o produto já carregado (ItemPedidoSerializer lê produto.nome)."""
+    return ItemPedido.objects.select_related('produto')
+
+
+def pedidos(queryset=None):
+    """Pedidos prontos para o PedidoSerializer: 2 queries, qualquer que seja o número de pedidos/itens."""
+    queryset = Pedido.objects.all() if queryset is None else queryset
+    return queryset.prefetch_related(Prefetch('itens', queryset=itens_pedido()))
+
+
+def historico(usuario):
+    """Pedidos do usuário para o PedidoResumoSerializer, sem carregar os itens.
+
+    A contagem de itens é uma subconsulta por pedido (e não um JOIN + GROUP BY):
+    assim o banco percorre o índice (usuario, -created, -id) na ordem da página e
+    para no LIMIT.
+    """
+    quantidade_itens = (
+        ItemPedido.objects.filter(pedido=OuterRef('pk')).order_by()
+        .values('pedido').annotate(total=Count('id')).values('total')
+    )
+    return Pedido.objects.filter(usuario=usuario).annotate(
+        quantidade_itens=Coalesce(Subquery(quantidade_itens, output_field=IntegerField()), Value(0)),
+    )
@@ -10,6 +10,14 @@ class ItemPedidoSerializer(serializers.ModelSerializer):
         model = ItemPedido
         fields = ['id', 'produto', 'produto_nome', 'quantidade', 'preco_unitario', 'total', 'slug']
 
+class PedidoResumoSerializer(serializers.ModelSerializer):
+    """Linha do histórico: sem os itens (ver GET /pedidos/<slug>/itens/); espera o queryset de queries.historico."""
+    quantidade_itens = serializers.IntegerField(read_only=True)
+
+    class Meta:
+        model = Pedido
+        fields = ['id', 'slug', 'status', 'total', 'origem', 'created', 'quantidade_itens']
+
 class PedidoSerializer(serializers.ModelSerializer):
     itens = ItemPedidoSerializer(many=True, read_only=True)
 
@@ -18,6 +26,7 @@ class PedidoSerializer(serializers.ModelSerializer):
         fields = [
             'id', 'usuario', 'status', 'total', 'metodo_pagamento',
             'desconto_aplicado', 'slug', 'empresa_id', 'itens', 'is_available', 'origem',
-            'created', 'updated', 'carrinho'  # Mantemos apenas o carrinho
+            'created', 'updated', 'carrinho',  # Mantemos apenas o carrinho
+            'mesa', 'valor_pago', 'pessoas_pagaram',
         ]
 
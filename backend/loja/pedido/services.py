@@ -0,0 +1,183 @@
+# backend/loja/pedido/services.py
+from collections import defaultdict
+from decimal import Decimal
+from django.db import transaction
+from django.dispatch import Signal
+from django.utils import timezone
+from alteracoes import registro
+from loja import slugs
+from mesa import planta, tempo_real
+from mesa.models import ItemMesa, Mesa
+from relatorios import services as relatorios
+from .models import Pedido, ItemPedido
+
+# Enviado dentro da transação quando um pedido online é criado (ex.: abre os tickets da cozinha)
+pedido_criado = Signal()  # pedido, itens=[ItemPedido]
+
+
+class CarrinhoVazio(Exception):
+    """O carrinho não tem itens para virar pedido."""
+
+
+class MesaVazia(Exception):
+    """A mesa não tem itens para ser fechada."""
+
+    def __init__(self, mesa):
+        self.mesa = mesa
+        super().__init__(f'A mesa {mesa.nome} não tem itens para fechar')
+
+
+class DescontoInvalido(Exception):
+    """O desconto não é um número, é negativo ou é maior que o subtotal (da mesa, se houver)."""
+
+    def __init__(self, desconto, subtotal, mesa=None):
+        self.mesa = mesa
+        self.desconto = desconto
+        self.subtotal = subtotal
+        onde = f' para a mesa {mesa.nome}' if mesa is not None else ''
+        super().__init__(f'Desconto inválido{onde}: {desconto} (subtotal: {subtotal})')
+
+
+def _desconto(valor, subtotal, mesa=None):
+    """O desconto informado como Decimal entre 0 e o subtotal; senão levanta DescontoInvalido."""
+    try:
+        desconto = Decimal(str(valor or 0))
+    except ArithmeticError:  # decimal.InvalidOperation
+        raise DescontoInvalido(valor, subtotal, mesa) from None
+    if not desconto.is_finite() or not 0 <= desconto <= subtotal:
+        raise DescontoInvalido(desconto, subtotal, mesa)
+    return desconto
+
+
+def criar_pedido_do_carrinho(carrinho, empresa, usuario=None, metodo_pagamento=None, desconto_aplicado=0):
+    """Converte o carrinho em pedido numa única transação.
+
+    Um INSERT para o pedido (total já calculado), um bulk_create para os itens
+    (total e slugs com sufixo reservados em lote) e um DELETE para esvaziar o carrinho; o número
+    de queries não depende do número de linhas do carrinho.
+    Levanta CarrinhoVazio ou DescontoInvalido (fora de 0..subtotal).
+    """
+    with transaction.atomic():
+        # Trava o carrinho (a varredura de vencidos o pula) e as linhas dos itens, para que dois
+        # checkouts simultâneos não gerem dois pedidos
+        carrinho.renovar_reserva()
+        itens_carrinho = list(carrinho.itens.select_for_update().select_related('produto'))
+        if not itens_carrinho:
+            raise CarrinhoVazio()
+
+        itens = [
+            ItemPedido(
+                produto=item.produto,
+                quantidade=item.quantidade,
+                preco_unitario=item.preco_unitario,
+                total=item.quantidade * item.preco_unitario,
+            )
+            for item in itens_carrinho
+        ]
+        subtotal = sum((item.total for item in itens), Decimal('0.00'))
+        desconto = _desconto(desconto_aplicado, subtotal)
+
+        pedido = Pedido.objects.create(
+            usuario=usuario,
+            empresa=empresa,
+            total=subtotal - desconto,
+            metodo_pagamento=metodo_pagamento,
+            origem='online',
+            carrinho=carrinho,
+            desconto_aplicado=desconto,
+        )
+        for item in itens:
+            item.pedido = pedido
+        slugs.criar_em_lote(ItemPedido, itens, ItemPedido.get_slug_base)
+        pedido_criado.send(sender=Pedido, pedido=pedido, itens=itens)
+
+        with registro.em_lote():
+            carrinho.itens.all().delete()
+        registro.registrar(itens_carrinho, registro.REMOVIDO)
+
+    return pedido
+
+
+def fechar_mesas(fechamentos, usuario=None):
+    """Fecha as mesas pagas, transformando os itens de cada uma num Pedido de origem 'fisica'.
+
+    ``fechamentos`` é uma lista de dicts com ``slug`` da mesa e, opcionalmente,
+    ``metodo_pagamento``, ``valor_pago``, ``pessoas_pagaram`` e ``desconto_aplicado``
+    (sem valor_pago/pessoas_pagaram vale o que a mesa acumulou na divisão da conta).
+
+    Tudo numa transação e em lote: uma query trava as mesas, uma lê os itens, os
+    pedidos e os itens de pedido entram com bulk_create e as mesas são zeradas
+    num único UPDATE, qualquer que seja o número de mesas. O estoque não muda: ele
+    já foi reservado quando cada item entrou na mesa.
+    Levanta Mesa.DoesNotExist, MesaVazia ou DescontoInvalido (fora de 0..subtotal). Retorna os pedidos na ordem recebida.
+    """
+    fechamentos = {dados['slug']: dados for dados in fechamentos}
+
+    with transaction.atomic():
+        mesas = {mesa.slug: mesa for mesa in Mesa.objects.select_for_update().filter(slug__in=list(fechamentos))}
+        faltando = sorted(set(fechamentos) - set(mesas))
+        if faltando:
+            raise Mesa.DoesNotExist(f'Mesa(s) não encontrada(s): {faltando}')
+
+        itens_por_mesa = defaultdict(list)
+        for item in ItemMesa.objects.filter(mesa__in=list(mesas.values())).select_related('produto_id').order_by('id'):
+            itens_por_mesa[item.mesa_id].append(item)
+
+        pedidos = []
+        for slug, dados in fechamentos.items():
+            mesa = mesas[slug]
+            if not itens_por_mesa[mesa.id]:
+                raise MesaVazia(mesa)
+            itens = [
+                ItemPedido(
+                    produto=item.produto_id,
+                    quantidade=item.quantidade,
+                    preco_unitario=item.preco_unitario,
+                    total=item.quantidade * item.preco_unitario,
+                )
+                for item in itens_por_mesa[mesa.id]
+            ]
+            subtotal = sum((item.total for item in itens), Decimal('0.00'))
+            desconto = _desconto(dados.get('desconto_aplicado'), subtotal, mesa)
+            total = subtotal - desconto
+            valor_pago = dados.get('valor_pago')
+            valor_pago = Decimal(str(valor_pago)) if valor_pago is not None else (mesa.valor_pago or total)
+            pedido = Pedido(
+                usuario=usuario,
+                empresa_id=mesa.empresa_id,
+                mesa=mesa,
+                status='entregue',
+                origem='fisica',
+                total=total,
+                metodo_pagamento=dados.get('metodo_pagamento'),
+                desconto_aplicado=desconto,
+                valor_pago=valor_pago,
+                pessoas_pagaram=int(dados.get('pessoas_pagaram') or mesa.pessoas_pagaram or mesa.numero_pessoas),
+            )
+            pedidos.append((pedido, itens))
+
+        slugs.criar_em_lote(Pedido, [pedido for pedido, _ in pedidos], Pedido.get_slug_base)
+        todos_itens = []
+        for pedido, itens in pedidos:
+            for item in itens:
+                item.pedido = pedido
+            todos_itens.extend(itens)
+        slugs.criar_em_lote(ItemPedido, todos_itens, ItemPedido.get_slug_base)
+        registro.registrar([pedido for pedido, _ in pedidos], registro.CRIADO)
+        # bulk_create não dispara post_save: os pedidos já nascem entregues e entram nos rollups aqui
+        relatorios.registrar_transicoes([(pedido, None, pedido.status) for pedido, _ in pedidos])
+
+        # Zera as mesas para o próximo cliente
+        with registro.em_lote():
+            ItemMesa.objects.filter(mesa__in=list(mesas.values())).delete()
+        registro.registrar([item for itens in itens_por_mesa.values() for item in itens], registro.REMOVIDO)
+        zerada = {'status': 'Livre', 'pedido': 0, 'valor_pago': Decimal('0.00'), 'pessoas_pagaram': 0, 'numero_pessoas': 1}
+        Mesa.objects.filter(pk__in=[mesa.pk for mesa in mesas.values()]).update(updated=timezone.now(), **zerada)
+        for mesa in mesas.values():
+            for campo, valor in zerada.items():
+                setattr(mesa, campo, valor)
+            tempo_real.mesa_liberada(mesa)
+        registro.registrar(mesas.values(), registro.ALTERADO)
+        planta.invalidar()
+
+    return [pedido for pedido, _ in pedidos]
@@ -1,3 +1,260 @@
-from django.test import TestCase
+import json
+from datetime import timedelta
+from unittest import mock
 
-# Create your tests here.
+from asgiref.sync import sync_to_async
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import AsyncClient, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from django.urls import resolve
+from rest_framework_simplejwt.tokens import AccessToken
+
+from carrinho.models import Carrinho, ItemCarrinho
+from mesa.models import Mesa
+from loja import exportacao
+from loja.testing import QueryCountMixin, cliente_autenticado, criar_empresa, criar_produto, criar_usuario
+from .models import Pedido, ItemPedido
+from .services import fechar_mesas
+
+
+class PedidoQueryCountTests(QueryCountMixin, TestCase):
+    def setUp(self):
+        self.empresa = criar_empresa()
+        self.client = cliente_autenticado()
+
+    def criar_pedidos(self, quantidade):
+        for _ in range(quantidade):
+            pedido = Pedido.objects.create(empresa=self.empresa, total=24)
+            for _ in range(3):
+                produto = criar_produto(empresa=self.empresa)
+                ItemPedido.objects.create(pedido=pedido, produto=produto, quantidade=2, preco_unitario=12)
+
+    def test_lista_de_pedidos(self):
+        # pedidos + itens (com produto)
+        self.assertNumQueriesFixo(2, self.client, '/api/pedidos/', self.criar_pedidos)
+
+    def test_detalhe_do_pedido(self):
+        self.criar_pedidos(1)
+        pedido = Pedido.objects.get()
+        self.assertNumQueriesFixo(
+            2, self.client, f'/api/pedidos/{pedido.slug}/',
+            lambda n: [ItemPedido.objects.create(pedido=pedido, produto=criar_produto(empresa=self.empresa),
+                                                 quantidade=1, preco_unitario=12) for _ in range(n)],
+        )
+
+
+class HistoricoPedidosTests(QueryCountMixin, TestCase):
+    def setUp(self):
+        self.empresa = criar_empresa()
+        self.usuario = criar_usuario()
+        self.client = cliente_autenticado(self.usuario)
+        self.produto = criar_produto(empresa=self.empresa)
+
+    def criar_pedidos(self, quantidade, usuario=None):
+        for _ in range(quantidade):
+            pedido = Pedido.objects.create(empresa=self.empresa, usuario=usuario or self.usuario, total=24)
+            for _ in range(2):
+                ItemPedido.objects.create(pedido=pedido, produto=self.produto, quantidade=1, preco_unitario=12)
+
+    def test_rotas_fixas_nao_sao_lidas_como_slug(self):
+        self.assertEqual(resolve('/api/pedidos/historico/').url_name, 'historico-pedidos')
+        self.assertEqual(resolve('/api/pedidos/criar/').url_name, 'criar-pedido')
+
+    def test_resumo_paginado_so_do_usuario(self):
+        self.criar_pedidos(5)
+        self.criar_pedidos(2, usuario=criar_usuario())
+        Pedido.objects.create(empresa=self.empresa, usuario=self.usuario, total=0)  # sem itens
+
+        primeira = self.client.get('/api/pedidos/historico/?limit=4').json()
+        self.assertEqual(len(primeira['results']), 4)
+        self.assertEqual(primeira['results'][0]['quantidade_itens'], 0)
+        self.assertNotIn('itens', primeira['results'][0])
+        segunda = self.client.get(primeira['next']).json()
+        self.assertIsNone(segunda['next'])
+        ids = [p['id'] for p in primeira['results'] + segunda['results']]
+        esperados = list(Pedido.objects.filter(usuario=self.usuario).order_by('-created', '-id').values_list('id', flat=True))
+        self.assertEqual(ids, esperados)
+        self.assertEqual([p['quantidade_itens'] for p in primeira['results'] + segunda['results']], [0, 2, 2, 2, 2, 2])
+
+    def test_historico_sem_n_mais_um(self):
+        # só a página de pedidos, com a contagem de itens na mesma consulta
+        self.assertNumQueriesFixo(1, self.client, '/api/pedidos/historico/?limit=50', self.criar_pedidos)
+
+    def test_itens_sob_demanda(self):
+        self.criar_pedidos(1)
+        pedido = Pedido.objects.get()
+        resposta = self.client.get(f'/api/pedidos/{pedido.slug}/itens/')
+        self.assertEqual(resposta.status_code, 200)
+        self.assertEqual(len(resposta.json()), 2)
+        self.assertEqual(cliente_autenticado().get(f'/api/pedidos/{pedido.slug}/itens/').status_code, 404)
+
+
+class CheckoutCarrinhoTests(TestCase):
+    def setUp(self):
+        self.empresa = criar_empresa()
+        self.client = cliente_autenticado()
+
+    def carrinho(self, linhas):
+        carrinho = Carrinho.objects.create(sessao_id='sessao-teste')
+        for _ in range(linhas):
+            ItemCarrinho.objects.create(carrinho=carrinho, produto=criar_produto(empresa=self.empresa),
+                                        quantidade=2, preco_unitario=12)
+        return carrinho
+
+    def checkout(self, linhas):
+        carrinho = self.carrinho(linhas)
+        with CaptureQueriesContext(connection) as contexto:
+            response = self.client.post(f'/api/pedidos/carrinho/{carrinho.slug}/criar/',
+                                        {'empresa_id': self.empresa.id, 'desconto_aplicado': '4.00'}, format='json')
+        self.assertEqual(response.status_code, 201, response.content)
+        return response.json(), len(contexto.captured_queries)
+
+    def test_desconto_invalido_nao_cria_pedido(self):
+        carrinho = self.carrinho(1)  # subtotal 24
+        for desconto in ('-1', '24.01', 'abc', 'NaN'):
+            response = self.client.post(f'/api/pedidos/carrinho/{carrinho.slug}/criar/',
+                                        {'empresa_id': self.empresa.id, 'desconto_aplicado': desconto}, format='json')
+            self.assertEqual(response.status_code, 400, desconto)
+        self.assertFalse(Pedido.objects.exists())
+        self.assertEqual(carrinho.itens.count(), 1)
+
+    def test_pedido_criado_com_todos_os_itens(self):
+        pedido, _ = self.checkout(3)
+        self.assertEqual(len(pedido['itens']), 3)
+        self.assertEqual(pedido['total'], '68.00')
+        self.assertFalse(ItemCarrinho.objects.exists())
+
+    def test_queries_constantes_no_numero_de_linhas(self):
+        _, poucas = self.checkout(1)
+        _, muitas = self.checkout(20)
+        self.assertEqual(poucas, muitas)
+
+
+class FecharMesaTests(TestCase):
+    def setUp(self):
+        self.empresa = criar_empresa()
+        self.client = cliente_autenticado()
+        self.chopp = criar_produto(empresa=self.empresa, venda=12, estoque=50)
+        self.porcao = criar_produto(empresa=self.empresa, nome='Porção', venda=30, estoque=50)
+
+    def abrir_mesa(self, numero, itens=2):
+        mesa = Mesa.objects.create(empresa=self.empresa, numero=str(numero), nome=f'Mesa {numero}', numero_pessoas=4)
+        mesa.adicionar_item(self.chopp, 2)
+        if itens > 1:
+            mesa.adicionar_item(self.porcao, 1)
+        return mesa
+
+    def test_fechar_mesa_gera_pedido_fisico(self):
+        mesa = self.abrir_mesa(1)
+        response = self.client.post(f'/api/mesas/{mesa.slug}/fechar/',
+                                    {'metodo_pagamento': 'pix', 'valor_pago': '54.00', 'pessoas_pagaram': 3}, format='json')
+        self.assertEqual(response.status_code, 201, response.content)
+        self.assertEqual((response.data['origem'], response.data['status'], response.data['total']), ('fisica', 'entregue', '54.00'))
+        self.assertEqual((response.data['valor_pago'], response.data['pessoas_pagaram']), ('54.00', 3))
+        self.assertEqual(len(response.data['itens']), 2)
+        mesa.refresh_from_db()
+        self.assertEqual((mesa.status, mesa.pedido, mesa.items.count()), ('Livre', 0, 0))
+        self.chopp.refresh_from_db()
+        self.assertEqual(self.chopp.estoque, 48)  # a reserva feita na mesa virou a venda
+
+    def test_fechar_mesa_vazia(self):
+        mesa = Mesa.objects.create(empresa=self.empresa, numero='9', nome='Mesa 9')
+        response = self.client.post(f'/api/mesas/{mesa.slug}/fechar/', {}, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(Pedido.objects.exists())
+
+    def test_desconto_fora_do_subtotal(self):
+        mesa = self.abrir_mesa(1)  # subtotal 54,00
+        for desconto in ('-1', '54.01'):
+            response = self.client.post(f'/api/mesas/{mesa.slug}/fechar/', {'desconto_aplicado': desconto}, format='json')
+            self.assertEqual(response.status_code, 400, desconto)
+        self.assertFalse(Pedido.objects.exists())
+        response = self.client.post(f'/api/mesas/{mesa.slug}/fechar/', {'desconto_aplicado': '54.00'}, format='json')
+        self.assertEqual((response.status_code, response.data['total']), (201, '0.00'))
+
+    def test_fechamento_do_turno_em_lote(self):
+        fechar_mesas([{'slug': self.abrir_mesa(99).slug}])  # cria as linhas do rollup de vendas; daqui em diante são UPDATEs
+        contagens = []
+        for inicio, quantidade in ((1, 2), (10, 12)):
+            mesas = [self.abrir_mesa(n) for n in range(inicio, inicio + quantidade)]
+            with CaptureQueriesContext(connection) as contexto:
+                response = self.client.post('/api/mesas-fechar/', {'mesas': [{'slug': m.slug} for m in mesas]}, format='json')
+            self.assertEqual(response.status_code, 201, response.content)
+            contagens.append(len(contexto))
+        self.assertEqual(contagens[0], contagens[1])
+        self.assertEqual(Pedido.objects.filter(origem='fisica').count(), 15)
+        self.assertEqual(ItemPedido.objects.count(), 30)
+        self.assertFalse(Mesa.objects.filter(status='Ocupada').exists())
+
+
+class ExportacaoPedidosTests(TestCase):
+    def setUp(self):
+        self.empresa = criar_empresa()
+        self.produto = criar_produto(empresa=self.empresa)
+        self.admin = cliente_autenticado(User.objects.create(username='admin', is_staff=True))
+        usuario = criar_usuario()
+        for _ in range(3):
+            pedido = Pedido.objects.create(empresa=self.empresa, usuario=usuario, total=12)
+            ItemPedido.objects.create(pedido=pedido, produto=self.produto, quantidade=1, preco_unitario=12)
+        outra = Pedido.objects.create(empresa=criar_empresa(), usuario=usuario, total=5)
+        Pedido.objects.filter(pk=outra.pk).update(created=timezone.now() - timedelta(days=10))
+
+    def conteudo(self, resposta):
+        return b''.join(resposta.streaming_content).decode()
+
+    def test_ndjson_em_streaming(self):
+        resposta = self.admin.get('/api/pedidos/exportar/')
+        self.assertEqual(resposta.status_code, 200)
+        self.assertTrue(resposta.streaming)
+        self.assertEqual(resposta['Content-Type'], 'application/x-ndjson')
+        linhas = [json.loads(linha) for linha in self.conteudo(resposta).splitlines()]
+        self.assertEqual(len(linhas), 4)
+        self.assertEqual(linhas[0]['empresa_id'], self.empresa.id)
+        self.assertEqual(linhas[0]['total'], 12)
+
+    def test_filtros_de_empresa_e_data(self):
+        hoje = timezone.localdate().isoformat()
+        resposta = self.admin.get('/api/pedidos/exportar/', {'inicio': hoje, 'fim': hoje})
+        self.assertEqual(len(self.conteudo(resposta).splitlines()), 3)
+        resposta = self.admin.get('/api/pedidos/itens/exportar/', {'empresa': self.empresa.id, 'formato': 'csv'})
+        self.assertIn('attachment; filename="itens_pedido.csv"', resposta['Content-Disposition'])
+        linhas = self.conteudo(resposta).splitlines()
+        self.assertEqual(linhas[0], 'id,pedido_id,produto_id,produto__nome,quantidade,preco_unitario,total,pedido__created')
+        self.assertEqual(len(linhas), 4)
+
+    def test_parametros_invalidos_e_permissao(self):
+        self.assertEqual(self.admin.get('/api/pedidos/exportar/', {'formato': 'xml'}).status_code, 400)
+        self.assertEqual(self.admin.get('/api/pedidos/exportar/', {'inicio': '01/02/2025'}).status_code, 400)
+        self.assertEqual(cliente_autenticado().get('/api/pedidos/exportar/').status_code, 403)
+        self.assertEqual(resolve('/api/pedidos/exportar/').url_name, 'pedidos-exportar')
+
+    def test_primeiro_bloco_sai_antes_de_ler_todas_as_linhas(self):
+        lidas = []
+        original = exportacao._linhas_ndjson
+
+        def contando(campos, linhas):
+            for linha in original(campos, linhas):
+                lidas.append(linha)
+                yield linha
+
+        with mock.patch.object(exportacao, 'LINHAS_POR_BLOCO', 1), \
+                mock.patch.object(exportacao, 'CHUNK_SIZE', 1), \
+                mock.patch.object(exportacao, '_linhas_ndjson', contando):
+            resposta = self.admin.get('/api/pedidos/exportar/')
+            self.assertFalse(resposta.is_async)
+            blocos = iter(resposta.streaming_content)
+            self.assertEqual(len(next(blocos).splitlines()), 1)
+            self.assertEqual(len(lidas), 1)
+            self.assertEqual(len(list(blocos)), 3)
+
+    async def test_asgi_recebe_iterador_assincrono(self):
+        token = await sync_to_async(AccessToken.for_user)(await User.objects.aget(username='admin'))
+        with mock.patch.object(exportacao, 'LINHAS_POR_BLOCO', 1):
+            resposta = await AsyncClient().get('/api/pedidos/exportar/', headers={'Authorization': f'Bearer {token}'})
+            self.assertEqual(resposta.status_code, 200)
+            self.assertTrue(resposta.is_async)
+            blocos = [bloco async for bloco in resposta.streaming_content]
+        self.assertEqual(len(blocos), 4)
+        self.assertEqual(json.loads(blocos[0])['empresa_id'], self.empresa.id)
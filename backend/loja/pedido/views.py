@@ -2,10 +2,14 @@
 # backend/loja/pedido/views.py
 from rest_framework.response import Response
 from rest_framework.decorators import api_view, permission_classes
-from rest_framework.permissions import AllowAny
+from rest_framework.permissions import AllowAny, IsAdminUser
 from rest_framework import status
 from .models import Pedido, ItemPedido
-from .serializers import PedidoSerializer, ItemPedidoSerializer
+from .serializers import PedidoSerializer, PedidoResumoSerializer, ItemPedidoSerializer
+from . import queries, services
+from idempotencia.decorators import idempotente
+from loja.exportacao import exportar
+from loja.pagination import KeysetPagination, paginar
 from carrinho.models import Carrinho, ItemCarrinho
 from produto.models import Produto
 from empresa.models import Empresa
@@ -15,7 +19,7 @@ from django.db.models import Q
 @api_view(['GET'])
 def search_pedidos(request):
     query = request.query_params.get("search")
-    pedidos = Pedido.objects.filter(
+    pedidos = queries.pedidos().filter(
         Q(nome__icontains=query)
     )
     serializer = PedidoSerializer(pedidos, many=True)
@@ -24,9 +28,8 @@ def search_pedidos(request):
 @api_view(['GET', 'POST'])
 def pedidos(request):
     if request.method == 'GET':
-        pedidos = Pedido.objects.all()
-        serializer = PedidoSerializer(pedidos, many=True)
-        return Response(serializer.data)
+        pedidos = queries.pedidos()
+        return paginar(request, pedidos, PedidoSerializer)
     
     elif request.method == 'POST':
         serializer = PedidoSerializer(data=request.data)
@@ -38,7 +41,7 @@ def pedidos(request):
 @api_view(['GET', 'PUT', 'DELETE'])
 def pedido_detail(request, slug):
     try:
-        pedido = Pedido.objects.get(slug=slug)
+        pedido = queries.pedidos().get(slug=slug)
     except Pedido.DoesNotExist:
         return Response(status=status.HTTP_404_NOT_FOUND)
 
@@ -80,15 +83,31 @@ def criar_pedido(request):
     )
     pedido.save()
 
-    serializer = PedidoSerializer(pedido)
+    serializer = PedidoSerializer(queries.pedidos().get(pk=pedido.pk))
     return Response(serializer.data, status=status.HTTP_201_CREATED)
 
 @api_view(['GET'])
 def historico_pedidos(request):
-    print("Acessando historico_pedidos")  # Log para depuração
-    pedidos = Pedido.objects.filter(usuario=request.user).order_by('-data')
-    serializer = PedidoSerializer(pedidos, many=True)
-    return Response(serializer.data)
+    """Histórico do usuário logado, do mais recente para o mais antigo, sempre paginado por cursor
+    (?limit=, ?cursor=; opcional ?status=). Os itens de cada pedido vêm sob demanda em /pedidos/<slug>/itens/."""
+    pedidos = queries.historico(request.user)
+    status_pedido = request.query_params.get('status')
+    if status_pedido:
+        pedidos = pedidos.filter(status=status_pedido)
+    paginator = KeysetPagination()
+    pagina = paginator.paginate_queryset(pedidos, request)
+    return paginator.get_paginated_response(PedidoResumoSerializer(pagina, many=True).data)
+
+@api_view(['GET'])
+def itens_pedido(request, slug):
+    try:
+        pedido = Pedido.objects.only('id', 'usuario_id').get(slug=slug)
+    except Pedido.DoesNotExist:
+        return Response({'error': 'Pedido não encontrado'}, status=status.HTTP_404_NOT_FOUND)
+    if pedido.usuario_id != request.user.id and not request.user.is_staff:
+        return Response({'error': 'Pedido não encontrado'}, status=status.HTTP_404_NOT_FOUND)
+    itens = queries.itens_pedido().filter(pedido_id=pedido.id).order_by('id')
+    return Response(ItemPedidoSerializer(itens, many=True).data)
 
 @api_view(['PUT'])
 def atualizar_status(request, slug):
@@ -98,7 +117,7 @@ def atualizar_status(request, slug):
         if status_novo in dict(Pedido._meta.get_field('status').choices):
             pedido.status = status_novo
             pedido.save()
-            serializer = PedidoSerializer(pedido)
+            serializer = PedidoSerializer(queries.pedidos().get(pk=pedido.pk))
             return Response(serializer.data)
         return Response({'error': 'Status inválido'}, status=status.HTTP_400_BAD_REQUEST)
     except Pedido.DoesNotExist:
@@ -111,13 +130,14 @@ def confirmar_recebimento(request, slug):
         if pedido.status == 'em-andamento':
             pedido.status = 'entregue'
             pedido.save()
-            serializer = PedidoSerializer(pedido)
+            serializer = PedidoSerializer(queries.pedidos().get(pk=pedido.pk))
             return Response(serializer.data)
         return Response({'error': 'Pedido não pode ser confirmado'}, status=status.HTTP_400_BAD_REQUEST)
     except Pedido.DoesNotExist:
         return Response({'error': 'Pedido não encontrado'}, status=status.HTTP_404_NOT_FOUND)
 
 @api_view(['POST'])
+@idempotente
 def criar_pedido_from_carrinho(request, carrinhoSlug):
     try:
         carrinho = Carrinho.objects.get(slug=carrinhoSlug)
@@ -137,40 +157,36 @@ def criar_pedido_from_carrinho(request, carrinhoSlug):
     except Empresa.DoesNotExist:
         return Response({"error": "Empresa não encontrada"}, status=status.HTTP_404_NOT_FOUND)
 
-    itens_carrinho = ItemCarrinho.objects.filter(carrinho=carrinho)
-    if not itens_carrinho.exists():
+    try:
+        pedido = services.criar_pedido_do_carrinho(
+            carrinho,
+            empresa,
+            usuario=usuario,
+            metodo_pagamento=metodo_pagamento,
+            desconto_aplicado=desconto_aplicado,
+        )
+    except services.CarrinhoVazio:
         return Response({"error": "Carrinho vazio"}, status=status.HTTP_400_BAD_REQUEST)
+    except services.DescontoInvalido as e:
+        return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
-    # Create the pedido
-    pedido = Pedido(
-        usuario=usuario,
-        empresa=empresa,
-        total=0,
-        metodo_pagamento=metodo_pagamento,
-        origem='online',
-        carrinho=carrinho,
-        desconto_aplicado=desconto_aplicado if desconto_aplicado else 0,
-    )
-    
-    pedido.save()
+    serializer = PedidoSerializer(queries.pedidos().get(pk=pedido.pk))
+    return Response(serializer.data, status=status.HTTP_201_CREATED)
 
-    total = 0
-    for item in itens_carrinho:
-        item_pedido = ItemPedido(
-            pedido=pedido,
-            produto=item.produto,
-            quantidade=item.quantidade,
-            preco_unitario=item.preco_unitario,
-            total=item.quantidade * item.preco_unitario,
-        )
-        item_pedido.save()
-        total += item_pedido.total
 
-    pedido.total = total - (desconto_aplicado or 0)
-    pedido.save()
+# Exportações para a administração: streaming linha a linha (?formato=ndjson|csv, ?empresa=, ?inicio=, ?fim=)
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def exportar_pedidos(request):
+    campos = ('id', 'slug', 'empresa_id', 'usuario_id', 'mesa_id', 'status', 'origem', 'metodo_pagamento',
+              'total', 'desconto_aplicado', 'valor_pago', 'created')
+    return exportar(request, Pedido.objects.all(), campos, 'pedidos')
 
-    # Clear the cart items
-    carrinho.itens.all().delete()
 
-    serializer = PedidoSerializer(pedido)
-    return Response(serializer.data, status=status.HTTP_201_CREATED)
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def exportar_itens_pedido(request):
+    campos = ('id', 'pedido_id', 'produto_id', 'produto__nome', 'quantidade', 'preco_unitario', 'total',
+              'pedido__created')
+    return exportar(request, ItemPedido.objects.all(), campos, 'itens_pedido',
+                    campo_data='pedido__created', campo_empresa='pedido__empresa_id')
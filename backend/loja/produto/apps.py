@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class ProdutoConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'produto'
+
+    def ready(self):
+        from . import signals  # noqa: F401  (conecta os receivers de busca)
@@ -0,0 +1,95 @@
+# backend/loja/produto/busca.py
+"""Busca de produtos por trigramas, sem acento e ordenada por relevância.
+
+Cada palavra é indexada no estilo do pg_trgm ("  ch", " cho", "cho", ..., "pp "),
+então a busca é só um IN indexado na tabela ProdutoTrigrama agrupado por produto,
+em vez de um LIKE em todas as colunas.
+"""
+import math
+import re
+import unicodedata
+
+from django.db import transaction
+from django.db.models import Count, Sum
+
+from .models import Produto, ProdutoTrigrama
+
+# Peso de cada campo na relevância do produto
+PESO_NOME = 3
+PESO_CODIGO = 3
+PESO_CATEGORIA = 2
+PESO_DESCRICAO = 1
+
+# Fração mínima dos trigramas da busca que o produto precisa conter
+SIMILARIDADE_MINIMA = 0.5
+
+
+def normalizar(texto):
+    """Remove acentos e coloca em minúsculas ("Açaí" -> "acai")."""
+    texto = unicodedata.normalize('NFKD', str(texto or ''))
+    return ''.join(c for c in texto if not unicodedata.combining(c)).lower()
+
+
+def palavras(texto):
+    return re.findall(r'[a-z0-9]+', normalizar(texto))
+
+
+def trigramas(texto, completo=True):
+    """Trigramas das palavras do texto.
+
+    Com completo=False o trigrama final (com espaço à direita) é omitido,
+    para que uma palavra digitada pela metade ainda encontre o produto.
+    """
+    resultado = set()
+    for palavra in palavras(texto):
+        padded = f'  {palavra} ' if completo else f'  {palavra}'
+        for i in range(len(padded) - 2):
+            resultado.add(padded[i:i + 3])
+    return resultado
+
+
+def indexar_produto(produto):
+    """Reescreve as entradas de índice de um produto."""
+    pesos = {}
+    campos = [
+        (produto.nome, PESO_NOME),
+        (produto.codigo, PESO_CODIGO),
+        (produto.categoria.nome if produto.categoria_id else '', PESO_CATEGORIA),
+        (produto.descricao, PESO_DESCRICAO),
+    ]
+    for texto, peso in campos:
+        for trigrama in trigramas(texto):
+            pesos[trigrama] = pesos.get(trigrama, 0) + peso
+
+    with transaction.atomic():
+        ProdutoTrigrama.objects.filter(produto=produto).delete()
+        ProdutoTrigrama.objects.bulk_create(
+            ProdutoTrigrama(produto=produto, trigrama=trigrama, peso=peso) for trigrama, peso in pesos.items()
+        )
+
+
+def reindexar(produtos=None, tamanho_lote=500):
+    """Reindexa os produtos informados (ou o catálogo inteiro). Retorna quantos foram indexados."""
+    if produtos is None:
+        produtos = Produto.objects.all()
+    total = 0
+    for produto in produtos.select_related('categoria').iterator(chunk_size=tamanho_lote):
+        indexar_produto(produto)
+        total += 1
+    return total
+
+
+def buscar(query):
+    """Retorna um queryset de {'produto': id, 'score': ...} ordenado por relevância."""
+    termos = trigramas(query, completo=False)
+    if not termos:
+        return ProdutoTrigrama.objects.none().values('produto')
+    minimo = max(1, math.ceil(len(termos) * SIMILARIDADE_MINIMA))
+    return (
+        ProdutoTrigrama.objects
+        .filter(trigrama__in=termos)
+        .values('produto')
+        .annotate(acertos=Count('id'), score=Sum('peso'))
+        .filter(acertos__gte=minimo)
+        .order_by('-acertos', '-score', 'produto')
+    )
@@ -0,0 +1,11 @@
+# backend/loja/produto/management/commands/reindexar_busca.py
+from django.core.management.base import BaseCommand
+from produto import busca
+
+
+class Command(BaseCommand):
+    help = 'Reconstrói o índice de busca (trigramas) de todos os produtos.'
+
+    def handle(self, *args, **options):
+        total = busca.reindexar()
+        self.stdout.write(self.style.SUCCESS(f'✅ {total} produtos reindexados'))
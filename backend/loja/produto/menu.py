@@ -0,0 +1,108 @@
+# backend/loja/produto/menu.py
+"""Cardápio público por empresa (GET /api/menu/<empresa_id>/), pronto em cache.
+
+O JSON (categorias -> produtos disponíveis, com preço, "esgotado", imagem e nota)
+é montado uma vez, guardado já serializado junto com a versão (hash do conteúdo,
+usada como ETag) e só é refeito depois que Produto, Categoria ou Avaliacao mudam
+(ver produto.signals). Entre uma mudança e outra o cardápio sai do cache sem
+consultar o banco.
+
+O cache é o MENU_CACHE (padrão: 'default', compartilhado entre os processos; ver
+CACHE_BACKEND nas settings). Ainda assim cada cardápio vence em MENU_TTL segundos
+(padrão 300): se a invalidação não chegar a algum processo (ex.: CACHE_BACKEND=locmem
+com vários workers), o cardápio velho dura no máximo esse tempo.
+"""
+import hashlib
+import json
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+
+from empresa.models import Empresa
+from .models import Produto
+
+CACHE = getattr(settings, 'MENU_CACHE', 'default')
+TTL = getattr(settings, 'MENU_TTL', 300)  # segundos; None faria o cardápio valer até a invalidação
+
+
+def _chave(empresa_id):
+    return f'menu:{empresa_id}'
+
+
+def _cache():
+    return caches[CACHE]
+
+
+def montar(empresa_id):
+    """Lê o cardápio do banco (uma consulta). Retorna {'versao', 'corpo', 'disponiveis'} ou None se a empresa não existir."""
+    produtos = (
+        Produto.objects.filter(empresa_id=empresa_id, is_available=True, categoria__is_available=True)
+        .select_related('categoria').order_by('categoria__nome', 'nome', 'id')
+        .only('nome', 'slug', 'descricao', 'venda', 'imagem', 'estoque', 'avaliacoes_soma', 'avaliacoes_total',
+              'categoria__id', 'categoria__nome', 'categoria__slug')
+    )
+    categorias = []
+    disponiveis = {}
+    for produto in produtos:
+        if not categorias or categorias[-1]['id'] != produto.categoria_id:
+            categorias.append({'id': produto.categoria.id, 'nome': produto.categoria.nome,
+                               'slug': produto.categoria.slug, 'produtos': []})
+        disponiveis[produto.id] = produto.estoque > 0
+        categorias[-1]['produtos'].append({
+            'id': produto.id,
+            'nome': produto.nome,
+            'slug': produto.slug,
+            'descricao': produto.descricao,
+            'venda': float(produto.venda),  # float, como no ProdutoSerializer
+            'imagem': produto.imagem,
+            'disponivel': disponiveis[produto.id],
+            'media_avaliacoes': produto.media_avaliacoes,
+            'total_avaliacoes': produto.avaliacoes_total,
+        })
+    if not categorias and not Empresa.objects.filter(pk=empresa_id).exists():
+        return None
+
+    conteudo = json.dumps(categorias, cls=DjangoJSONEncoder, sort_keys=True, separators=(',', ':'))
+    versao = hashlib.sha256(conteudo.encode()).hexdigest()[:16]
+    corpo = f'{{"empresa":{int(empresa_id)},"versao":"{versao}","categorias":{conteudo}}}'.encode()
+    return {'versao': versao, 'corpo': corpo, 'disponiveis': disponiveis}
+
+
+def obter(empresa_id):
+    """Cardápio em cache, montando-o se ainda não existir."""
+    cardapio = _cache().get(_chave(empresa_id))
+    if cardapio is None:
+        cardapio = montar(empresa_id)
+        if cardapio is not None:
+            _cache().set(_chave(empresa_id), cardapio, TTL)
+    return cardapio
+
+
+def invalidar(empresa_ids):
+    """Descarta os cardápios das empresas depois do commit (antes disso outra requisição
+    poderia remontar o cardápio com os dados antigos e deixá-lo no cache)."""
+    chaves = [_chave(empresa_id) for empresa_id in set(empresa_ids) if empresa_id is not None]
+    if chaves:
+        transaction.on_commit(lambda: _cache().delete_many(chaves))
+
+
+def conferir_saldos(saldos):
+    """Descarta só os cardápios em que algum produto passou de disponível para esgotado (ou o contrário);
+    baixas que não mudam o "esgotado" não custam a remontagem."""
+    por_empresa = defaultdict(dict)
+    for produto_id, empresa_id, saldo in saldos:
+        por_empresa[empresa_id][produto_id] = saldo > 0
+
+    def _conferir():
+        chaves = {_chave(empresa_id): disponiveis for empresa_id, disponiveis in por_empresa.items()}
+        vencidas = [
+            chave for chave, cardapio in _cache().get_many(list(chaves)).items()
+            if any(cardapio['disponiveis'].get(produto_id, disponivel) != disponivel
+                   for produto_id, disponivel in chaves[chave].items())
+        ]
+        if vencidas:
+            _cache().delete_many(vencidas)
+    transaction.on_commit(_conferir)
@@ -0,0 +1,43 @@
+# Generated by Django 5.1.7 on 2026-10-18 15:32
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def indexar_produtos_existentes(apps, schema_editor):
+    from produto.busca import PESO_CATEGORIA, PESO_CODIGO, PESO_DESCRICAO, PESO_NOME, trigramas
+
+    Produto = apps.get_model('produto', 'Produto')
+    ProdutoTrigrama = apps.get_model('produto', 'ProdutoTrigrama')
+    for produto in Produto.objects.select_related('categoria').iterator():
+        pesos = {}
+        for texto, peso in [(produto.nome, PESO_NOME), (produto.codigo, PESO_CODIGO),
+                            (produto.categoria.nome, PESO_CATEGORIA), (produto.descricao, PESO_DESCRICAO)]:
+            for trigrama in trigramas(texto):
+                pesos[trigrama] = pesos.get(trigrama, 0) + peso
+        ProdutoTrigrama.objects.bulk_create(
+            ProdutoTrigrama(produto=produto, trigrama=trigrama, peso=peso) for trigrama, peso in pesos.items()
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('produto', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProdutoTrigrama',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('trigrama', models.CharField(max_length=3)),
+                ('peso', models.PositiveSmallIntegerField(default=1)),
+                ('produto', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='trigramas', to='produto.produto')),
+            ],
+            options={
+                'unique_together': {('trigrama', 'produto')},
+            },
+        ),
+        migrations.RunPython(indexar_produtos_existentes, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.1.7 on 2026-10-18 15:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('categoria', '0002_categoria_categoria_created_id_idx'),
+        ('empresa', '0002_empresa_empresa_created_id_idx'),
+        ('produto', '0002_produtotrigrama'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='produto',
+            index=models.Index(fields=['created', 'id'], name='produto_created_id_idx'),
+        ),
+    ]
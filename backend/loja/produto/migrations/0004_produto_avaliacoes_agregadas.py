@@ -0,0 +1,23 @@
+# Generated by Django 5.1.7 on 2026-10-18 16:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('produto', '0003_produto_produto_created_id_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='produto',
+            name='avaliacoes_soma',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='produto',
+            name='avaliacoes_total',
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
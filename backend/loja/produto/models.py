@@ -5,9 +5,13 @@ from django.utils.crypto import get_random_string
 from empresa.models import Empresa
 from categoria.models import Categoria
 from django.apps import apps
+from django.db import transaction
 from django.utils import timezone
+from loja.slugs import SlugUnicoMixin
+
+class Produto(SlugUnicoMixin, models.Model):
+    CAMPOS_DA_BUSCA = ('nome', 'codigo', 'categoria_id', 'descricao')  # o que entra no índice de trigramas
 
-class Produto(models.Model):
     nome = models.CharField(max_length=100)
     descricao = models.TextField()
     custo = models.DecimalField(max_digits=10, decimal_places=2)
@@ -19,32 +23,84 @@ class Produto(models.Model):
     imagem = models.URLField(blank=True, null=True, default='https://images.unsplash.com/photo-1583744513233-64c7d1aec5c1')
     slug = models.SlugField(unique=True, blank=True, null=True)
     is_available = models.BooleanField(default=True)
+    # Mantidos pelos sinais de avaliacoes (UPDATE com F()); recalcular_avaliacoes refaz do zero
+    avaliacoes_soma = models.PositiveIntegerField(default=0)
+    avaliacoes_total = models.PositiveIntegerField(default=0)
     created = models.DateTimeField(auto_now_add=True)
     updated = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['created', 'id'], name='produto_created_id_idx'),  # paginação por cursor
+        ]
+
     def __str__(self):
         return self.nome
 
-    def save(self, *args, **kwargs):
-        if not self.slug:
-            slug_base = slugify(self.nome)
-            slug = slug_base
-            if Produto.objects.filter(slug=slug).exists():
-                slug = f'{slug_base}-{get_random_string(5)}'
-            self.slug = slug
+    @property
+    def media_avaliacoes(self):
+        if not self.avaliacoes_total:
+            return 0
+        return round(self.avaliacoes_soma / self.avaliacoes_total, 2)
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        if 'estoque' in field_names:
+            instance._estoque_carregado = values[field_names.index('estoque')]
+        if all(campo in field_names for campo in cls.CAMPOS_DA_BUSCA):
+            instance._busca_indexada = tuple(values[field_names.index(campo)] for campo in cls.CAMPOS_DA_BUSCA)
+        return instance
+
+    def busca_desatualizada(self):
+        """True se algum campo do índice de busca mudou desde a leitura (ou não dá para saber)."""
+        valores = tuple(getattr(self, campo) for campo in self.CAMPOS_DA_BUSCA)
+        return valores != getattr(self, '_busca_indexada', None)
 
+    def save(self, *args, **kwargs):
         is_new = self._state.adding  # ✅ Corrigido para usar self._state.adding
+        ajuste = 0
+        if not is_new and hasattr(self, '_estoque_carregado'):
+            # O saldo em memória pode estar velho (reservas por UPDATE com F() desde a leitura):
+            # a edição nunca grava o estoque; a diferença digitada (admin/PUT) vira uma movimentação
+            update_fields = kwargs.get('update_fields')
+            if update_fields is None or 'estoque' in update_fields:
+                ajuste = self.estoque - self._estoque_carregado
+            if update_fields is None:
+                deferidos = self.get_deferred_fields()
+                update_fields = [campo.name for campo in self._meta.concrete_fields
+                                 if not campo.primary_key and campo.attname not in deferidos]
+            kwargs['update_fields'] = [campo for campo in update_fields if campo != 'estoque']
+
+        Estoque = apps.get_model('estoque', 'Estoque')  # Resolvendo a importação circular
+        with transaction.atomic():
+            super(Produto, self).save(*args, **kwargs)
+            if ajuste:
+                from estoque import services as estoque_service  # idem
+                if ajuste > 0:
+                    self.estoque = estoque_service.liberar(self.pk, ajuste, tipo=Estoque.ENTRADA)
+                else:
+                    self.estoque = estoque_service.baixar(self.pk, -ajuste)
+            self._estoque_carregado = self.estoque
 
-        super(Produto, self).save(*args, **kwargs)
+            # Criar registro de entrada no estoque apenas na criação
+            if is_new:
+                Estoque.objects.create(
+                    empresa=self.empresa,
+                    produto=self,
+                    quantidade=self.estoque,
+                    tipo=Estoque.ENTRADA,
+                )
 
-        # Criar registro de entrada no estoque apenas na criação
-        if is_new:
-            Estoque = apps.get_model('estoque', 'Estoque')  # Resolvendo a importação circular
-            Estoque.objects.create(
-                empresa=self.empresa,
-                produto=self,
-                quantidade=self.estoque,
-                tipo='entrada',
-            )
 
+class ProdutoTrigrama(models.Model):
+    """Índice de busca: trigramas (sem acento, minúsculos) de nome, código, categoria e descrição do produto."""
+    produto = models.ForeignKey(Produto, on_delete=models.CASCADE, related_name='trigramas')
+    trigrama = models.CharField(max_length=3)
+    peso = models.PositiveSmallIntegerField(default=1)
 
+    class Meta:
+        unique_together = ('trigrama', 'produto')
+
+    def __str__(self):
+        return f'{self.trigrama} -> {self.produto_id} ({self.peso})'
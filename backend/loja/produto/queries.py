@@ -0,0 +1,8 @@
+# backend/loja/produto/queries.py
+from .models import Produto
+
+
+def produtos(queryset=None):
+    """Produtos prontos para o ProdutoSerializer (categoria é serializada pelo nome)."""
+    queryset = Produto.objects.all() if queryset is None else queryset
+    return queryset.select_related('categoria')
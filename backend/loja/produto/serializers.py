@@ -8,10 +8,12 @@ class ProdutoSerializer(serializers.ModelSerializer):
     categoria = serializers.SlugRelatedField(slug_field='nome', queryset=Categoria.objects.all())
     venda = serializers.FloatField()  # Garante que o valor seja enviado como float
     custo = serializers.FloatField()  # Garante que o valor seja enviado como float
+    media_avaliacoes = serializers.FloatField(read_only=True)
+    total_avaliacoes = serializers.IntegerField(source='avaliacoes_total', read_only=True)
     class Meta:
         model = Produto
         fields = ['id', 'nome', 'descricao', 'custo', 'venda', 'codigo', 
                  'estoque', 'empresa', 'categoria', 'imagem', 'slug', 
-                 'is_available', 'created', 'updated']
+                 'is_available', 'media_avaliacoes', 'total_avaliacoes', 'created', 'updated']
         
 
@@ -0,0 +1,67 @@
+# backend/loja/produto/signals.py
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from avaliacoes.models import Avaliacao
+from categoria.models import Categoria
+from estoque.services import saldos_alterados
+from loja import cache
+from .models import Produto, ProdutoTrigrama
+from . import busca, menu
+
+
+@receiver(post_save, sender=Produto)
+def indexar_produto(sender, instance, raw=False, **kwargs):
+    """Mantém o índice de busca em dia quando muda nome, código, categoria ou descrição."""
+    if raw or not instance.busca_desatualizada():  # loaddata, ou edição que não mexe no texto buscado
+        return
+    busca.indexar_produto(instance)
+    instance._busca_indexada = tuple(getattr(instance, campo) for campo in Produto.CAMPOS_DA_BUSCA)
+
+
+@receiver(post_delete, sender=Produto)
+def remover_indice_produto(sender, instance, **kwargs):
+    ProdutoTrigrama.objects.filter(produto_id=instance.pk).delete()
+
+
+@receiver(post_save, sender=Categoria)
+def reindexar_categoria(sender, instance, created=False, raw=False, **kwargs):
+    """O nome da categoria faz parte do índice, então os produtos dela são reindexados."""
+    if raw or created:
+        return
+    busca.reindexar(Produto.objects.filter(categoria=instance))
+
+
+# Cardápio público (produto.menu) e respostas em cache (loja.cache): descartados quando muda algo que mostram
+@receiver(post_save, sender=Produto)
+@receiver(post_delete, sender=Produto)
+def invalidar_caches_produto(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    menu.invalidar([instance.empresa_id])
+    cache.invalidar('produto', id=instance.pk)
+    cache.invalidar('avaliacoes_produto', produto_id=instance.pk)  # produto_nome
+
+
+@receiver(post_save, sender=Categoria)
+@receiver(post_delete, sender=Categoria)
+def invalidar_caches_categoria(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    menu.invalidar(Produto.objects.filter(categoria=instance).values_list('empresa_id', flat=True).distinct())
+    cache.invalidar('produto')  # o nome da categoria vai em todo produto
+
+
+@receiver(post_save, sender=Avaliacao)
+@receiver(post_delete, sender=Avaliacao)
+def invalidar_caches_avaliacao(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    menu.invalidar(Produto.objects.filter(pk=instance.produto_id).values_list('empresa_id', flat=True))
+    cache.invalidar('produto', id=instance.produto_id)  # média e total de avaliações
+
+
+@receiver(saldos_alterados)
+def invalidar_caches_saldos(sender, saldos, **kwargs):
+    menu.conferir_saldos(saldos)
+    for produto_id, _, _ in saldos:
+        cache.invalidar('produto', id=produto_id)
@@ -1,3 +1,158 @@
+from unittest import mock
+
+from django.core.cache import cache, caches
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from rest_framework.test import APIClient
+
+from avaliacoes.models import Avaliacao
+from estoque import services as estoque_service
+from estoque.models import Estoque
+from loja import slugs
+
+from loja.testing import QueryCountMixin, cliente_autenticado, criar_empresa, criar_produto, criar_usuario
+from . import busca
+from .models import Produto
+
+
+class ProdutoQueryCountTests(QueryCountMixin, TestCase):
+    def setUp(self):
+        self.empresa = criar_empresa()
+        self.client = cliente_autenticado()
+
+    def criar_produtos(self, quantidade):
+        for _ in range(quantidade):
+            criar_produto(empresa=self.empresa)
+
+    def test_lista_de_produtos(self):
+        # produtos com categoria em um JOIN
+        self.assertNumQueriesFixo(1, self.client, '/api/produtos/', self.criar_produtos)
+
+
+class SlugUnicoTests(TestCase):
+    def test_nomes_repetidos_ganham_sufixo_sem_select_previo(self):
+        empresa = criar_empresa()
+        primeiro = criar_produto(empresa=empresa, nome='Chopp Pilsen')
+        with CaptureQueriesContext(connection) as contexto:
+            segundo = criar_produto(empresa=empresa, nome='Chopp Pilsen')
+        self.assertEqual(primeiro.slug, 'chopp-pilsen')
+        self.assertTrue(segundo.slug.startswith('chopp-pilsen-'))
+        consultas = [q['sql'] for q in contexto.captured_queries if 'produto_produto' in q['sql']]
+        self.assertFalse([sql for sql in consultas if sql.startswith('SELECT') and '"slug"' in sql.split('WHERE')[-1]])
+
+    def test_movimentacoes_de_estoque_do_mesmo_produto_nao_colidem(self):
+        produto = criar_produto()
+        movimentos = [Estoque(empresa=produto.empresa, produto=produto, quantidade=1, tipo='entrada') for _ in range(50)]
+        slugs.criar_em_lote(Estoque, movimentos, Estoque.get_slug_base)
+        self.assertEqual(Estoque.objects.filter(produto=produto).values('slug').distinct().count(), 51)
+
+
+class MenuTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.empresa = criar_empresa()
+        self.chopp = criar_produto(empresa=self.empresa, nome='Chopp Pilsen', estoque=1)
+        self.pizza = criar_produto(empresa=self.empresa, categoria='PIZZA', nome='Pizza Calabresa', venda=40)
+        criar_produto(empresa=self.empresa, nome='Fora do cardápio', is_available=False)
+        self.client = APIClient()
+        self.url = f'/api/menu/{self.empresa.id}/'
+
+    def test_cardapio_agrupado_e_servido_do_cache(self):
+        resposta = self.client.get(self.url)
+        self.assertEqual(resposta.status_code, 200)
+        dados = resposta.json()
+        self.assertEqual([c['nome'] for c in dados['categorias']], ['CERVEJA', 'PIZZA'])
+        self.assertEqual([p['nome'] for p in dados['categorias'][0]['produtos']], ['Chopp Pilsen'])
+        self.assertEqual(resposta['ETag'], f'"{dados["versao"]}"')
+
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get(self.url).content, resposta.content)
+            nao_modificado = self.client.get(self.url, HTTP_IF_NONE_MATCH=resposta['ETag'])
+        self.assertEqual(nao_modificado.status_code, 304)
+
+    def test_mudancas_trocam_a_versao(self):
+        versao = self.client.get(self.url).json()['versao']
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.pizza.venda = 45
+            self.pizza.save()
+        nova = self.client.get(self.url).json()
+        self.assertNotEqual(nova['versao'], versao)
+        self.assertEqual(nova['categorias'][1]['produtos'][0]['venda'], 45.0)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Avaliacao.objects.create(usuario=criar_usuario(), produto=self.pizza, rating=4, comentario='')
+        self.assertEqual(self.client.get(self.url).json()['categorias'][1]['produtos'][0]['media_avaliacoes'], 4)
+
+    def test_esgotar_invalida_so_quando_muda_o_disponivel(self):
+        self.client.get(self.url)
+        with self.captureOnCommitCallbacks(execute=True):
+            estoque_service.reservar(self.pizza.id, 1)  # pizza continua disponível: cardápio mantido
+        with self.assertNumQueries(0):
+            self.client.get(self.url)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            estoque_service.reservar(self.chopp.id, 1)
+        chopp = self.client.get(self.url).json()['categorias'][0]['produtos'][0]
+        self.assertFalse(chopp['disponivel'])
+
+    def test_cardapio_vence_mesmo_sem_invalidacao(self):
+        # Um processo que não recebeu a invalidação não serve o cardápio velho para sempre
+        with mock.patch.object(cache, 'set', wraps=cache.set) as guardar:
+            self.client.get(self.url)
+        self.assertEqual(guardar.call_args.args[2], 300)
+
+    def test_empresa_inexistente(self):
+        self.assertEqual(self.client.get('/api/menu/999999/').status_code, 404)
+
+
+class ProdutoPorIdCacheTests(TestCase):
+    def setUp(self):
+        caches['respostas'].clear()
+        self.client = APIClient()
+
+    def test_produto_por_id_invalida_no_preco_e_no_estoque(self):
+        produto = criar_produto(empresa=criar_empresa())
+        url = f'/api/produtos/id/{produto.id}/'
+        self.client.get(url)
+        self.assertEqual(self.client.get(url)['X-Cache'], 'HIT')
+
+        produto.venda = 15
+        produto.save()
+        self.assertEqual(self.client.get(url).json()['venda'], 15.0)
+
+        estoque_service.reservar(produto.id, 3)
+        self.assertEqual(self.client.get(url).json()['estoque'], 97)
+
+        Avaliacao.objects.create(usuario=criar_usuario(), produto=produto, rating=4, comentario='')
+        self.assertEqual(self.client.get(url).json()['media_avaliacoes'], 4)
+        self.assertEqual(len(self.client.get(f'/api/avaliacoes/produto/{produto.id}/').json()), 1)
+
+
+class BuscaProdutosTests(TestCase):
+    def setUp(self):
+        empresa = criar_empresa()
+        self.chopp = criar_produto(empresa=empresa, nome='Chopp Pilsen')
+        self.pizza = criar_produto(empresa=empresa, nome='Pizza Calabresa', categoria='PIZZA')
+
+    def test_lista_simples_por_relevancia(self):
+        resposta = APIClient().get('/api/produtos-search/', {'search': 'pilsen'})
+        self.assertEqual(resposta.status_code, 200)
+        self.assertEqual([p['nome'] for p in resposta.json()], ['Chopp Pilsen'])
+        self.assertEqual(len(APIClient().get('/api/produtos-search/').json()), 2)
 
-# Create your tests here.
+    def test_reindexa_so_quando_muda_o_texto_buscado(self):
+        produto = Produto.objects.get(pk=self.chopp.pk)
+        with mock.patch.object(busca, 'indexar_produto', wraps=busca.indexar_produto) as indexar:
+            produto.venda = 15
+            produto.save()
+            estoque_service.reservar(produto.id, 1)
+            self.assertEqual(indexar.call_count, 0)
+            produto.nome = 'Chopp Weiss'
+            produto.save()
+            produto.save()
+            self.assertEqual(indexar.call_count, 1)
+        self.assertEqual([p['nome'] for p in APIClient().get('/api/produtos-search/', {'search': 'weiss'}).json()],
+                         ['Chopp Weiss'])
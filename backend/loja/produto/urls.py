@@ -9,6 +9,7 @@ urlpatterns = [
     path('produtos/<slug:slug>/decrementar-estoque/', views.decrementar_estoque, name='decrementar-estoque'),
     path('produtos/<slug:slug>/incrementar-estoque/', views.incrementar_estoque, name='incrementar-estoque'),
     path('produtos/id/<int:id>/', views.produto_por_id, name='produto-por-id'),  # Nova rota para buscar por ID
+    path('menu/<int:empresa_id>/', views.menu_empresa, name='menu-empresa'),
 ]
 
 
@@ -1,27 +1,37 @@
 # backend\loja\produto\views.py
+from django.http import HttpResponse
 from django.shortcuts import render
+from django.utils.http import parse_etags
 from rest_framework.response import Response
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated
 from rest_framework import status
-from django.db.models import Q
 from .models import Produto
+from . import busca, menu
+from . import queries
 from .serializers import ProdutoSerializer
+from loja import cache
+from loja.pagination import paginar
 from rest_framework.permissions import AllowAny
+from estoque import services as estoque_service
+from estoque.models import Estoque
 
 @api_view(['GET'])
 @permission_classes([AllowAny])  # Permite acesso sem autenticação
 def search_produtos(request):
+    """Busca por relevância no índice de trigramas (nome, código, categoria e descrição).
+
+    Devolve a lista simples (sem envelope de paginação), como sempre devolveu.
+    """
     query = request.query_params.get("search", "")
 
-    produtos = Produto.objects.filter(
-        Q(nome__icontains=query) | 
-        Q(codigo__icontains=query) | 
-        Q(venda__icontains=query) |
-        Q(descricao__icontains=query) |
-        Q(categoria__nome__icontains=query)  # ✅ Busca pelo nome da categoria
-    )
-    
+    if not busca.palavras(query):
+        produtos = queries.produtos().order_by('nome', 'id')
+    else:
+        ids = [linha['produto'] for linha in busca.buscar(query)]
+        por_id = queries.produtos().in_bulk(ids)
+        produtos = [por_id[i] for i in ids if i in por_id]
+
     serializer = ProdutoSerializer(produtos, many=True)
     return Response(serializer.data, status=status.HTTP_200_OK)
 
@@ -30,9 +40,8 @@ def search_produtos(request):
 @permission_classes([IsAuthenticated])  # Exige autenticação
 def produtos(request):
     if request.method == "GET":
-        produtos = Produto.objects.all()
-        serializer = ProdutoSerializer(produtos, many=True)
-        return Response(serializer.data)
+        produtos = queries.produtos()
+        return paginar(request, produtos, ProdutoSerializer)
     
     elif request.method == 'POST':
         serializer = ProdutoSerializer(data=request.data)
@@ -45,7 +54,7 @@ def produtos(request):
 @permission_classes([IsAuthenticated])  # Exige autenticação
 def produto_detail(request, slug):
     try:
-        produto = Produto.objects.get(slug=slug)
+        produto = queries.produtos().get(slug=slug)
     except Produto.DoesNotExist:
         return Response(status=status.HTTP_404_NOT_FOUND)
 
@@ -66,23 +75,41 @@ def produto_detail(request, slug):
 
 @api_view(['GET'])
 @permission_classes([AllowAny])  # Permite acesso sem autenticação
+@cache.em_cache('produto')
 def produto_por_id(request, id):
     print('Chamei produto_por_id na views produto:', id)
     try:
-        produto = Produto.objects.get(id=id)
+        produto = queries.produtos().get(id=id)
         serializer = ProdutoSerializer(produto)
         return Response(serializer.data)
     except Produto.DoesNotExist:
         return Response({'status': 'error', 'message': 'Produto não encontrado'}, status=404)
     
+@api_view(['GET'])
+@permission_classes([AllowAny])
+def menu_empresa(request, empresa_id):
+    """Cardápio da empresa já serializado (ver produto.menu), com ETag: If-None-Match igual devolve 304."""
+    cardapio = menu.obter(empresa_id)
+    if cardapio is None:
+        return Response({'error': 'Empresa não encontrada'}, status=status.HTTP_404_NOT_FOUND)
+
+    etag = f'"{cardapio["versao"]}"'
+    cabecalhos = {'ETag': etag, 'Cache-Control': 'no-cache'}  # o navegador guarda, mas sempre revalida
+    etags_cliente = parse_etags(request.headers.get('If-None-Match', ''))
+    if etag in etags_cliente or '*' in etags_cliente:
+        return Response(status=status.HTTP_304_NOT_MODIFIED, headers=cabecalhos)
+    resposta = HttpResponse(cardapio['corpo'], content_type='application/json')
+    for nome, valor in cabecalhos.items():
+        resposta[nome] = valor
+    return resposta
+
 @api_view(['POST'])
 def decrementar_estoque(request, slug):
     try:
         produto = Produto.objects.get(slug=slug)
-        quantidade = request.data.get('quantidade', 0)
-        produto.estoque = max(0, produto.estoque - quantidade)
-        produto.save()
-        return Response({'status': 'success', 'estoque': produto.estoque})
+        quantidade = int(request.data.get('quantidade', 0))
+        saldo = estoque_service.baixar(produto.id, quantidade)
+        return Response({'status': 'success', 'estoque': saldo})
     except Produto.DoesNotExist:
         return Response({'status': 'error', 'message': 'Produto não encontrado'}, status=404)
 
@@ -91,10 +118,9 @@ def decrementar_estoque(request, slug):
 def incrementar_estoque(request, slug):
     try:
         produto = Produto.objects.get(slug=slug)
-        quantidade = request.data.get('quantidade', 0)
-        produto.estoque += quantidade
-        produto.save()
-        return Response({'status': 'success', 'estoque': produto.estoque})
+        quantidade = int(request.data.get('quantidade', 0))
+        saldo = estoque_service.liberar(produto.id, quantidade, tipo=Estoque.ENTRADA)
+        return Response({'status': 'success', 'estoque': saldo})
     except Produto.DoesNotExist:
         return Response({'status': 'error', 'message': 'Produto não encontrado'}, status=404)
     
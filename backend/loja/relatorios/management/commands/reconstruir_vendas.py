@@ -0,0 +1,66 @@
+# backend/loja/relatorios/management/commands/reconstruir_vendas.py
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.utils import timezone
+from pedido.models import Pedido
+from relatorios import services
+
+
+def _calcular_lote(intervalo):
+    try:
+        return intervalo, services.calcular(*intervalo)
+    finally:
+        connection.close()  # cada thread abre a própria conexão
+
+
+class Command(BaseCommand):
+    help = (
+        'Reconstrói os rollups de vendas (VendaDiaria/VendaHoraria) a partir dos pedidos, em lotes de dias. '
+        'As consultas dos lotes rodam em threads (--threads); a gravação é uma por vez, nesta thread, '
+        'porque o SQLite aceita um só escritor. Rode fora do horário de movimento: pedidos entregues '
+        'durante a reconstrução de um lote podem ficar fora dele.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--inicio', type=date.fromisoformat, help='Primeiro dia (AAAA-MM-DD); padrão: dia do pedido mais antigo.')
+        parser.add_argument('--fim', type=date.fromisoformat, help='Último dia, inclusive (AAAA-MM-DD); padrão: hoje.')
+        parser.add_argument('--dias-por-lote', type=int, default=7)
+        parser.add_argument('--threads', '--processos', dest='threads', type=int, default=4,
+                            help='Lotes consultados ao mesmo tempo (threads; --processos é o nome antigo).')
+
+    def handle(self, *args, **options):
+        inicio = options['inicio']
+        if inicio is None:
+            primeiro = Pedido.objects.order_by('created').values_list('created', flat=True).first()
+            if primeiro is None:
+                self.stdout.write('Nenhum pedido para consolidar')
+                return
+            inicio = timezone.localtime(primeiro).date()
+        fim = (options['fim'] or timezone.localdate()) + timedelta(days=1)
+        if fim <= inicio:
+            raise CommandError('--fim deve ser posterior a --inicio')
+
+        lotes = list(services.lotes(inicio, fim, max(options['dias_por_lote'], 1)))
+        threads = max(1, min(options['threads'], len(lotes)))
+        self.stdout.write(f'🚀 Reconstruindo {len(lotes)} lote(s) de {inicio} a {fim - timedelta(days=1)} com {threads} thread(s)')
+
+        if threads == 1:
+            self._relatar((intervalo, services.reconstruir(*intervalo)) for intervalo in lotes)
+        else:
+            with ThreadPoolExecutor(max_workers=threads) as executor:
+                # map devolve na ordem dos lotes; cada lote é gravado aqui assim que sai da sua thread
+                self._relatar(
+                    (intervalo, services.gravar(*intervalo, *linhas))
+                    for intervalo, linhas in executor.map(_calcular_lote, lotes)
+                )
+
+    def _relatar(self, resultados):
+        total_diarias = total_horarias = 0
+        for (de, ate), (diarias, horarias) in resultados:
+            total_diarias += diarias
+            total_horarias += horarias
+            self.stdout.write(f'  {de} a {ate - timedelta(days=1)}: {diarias} linhas diárias, {horarias} horárias')
+        self.stdout.write(self.style.SUCCESS(f'✅ {total_diarias} linhas diárias e {total_horarias} horárias gravadas'))
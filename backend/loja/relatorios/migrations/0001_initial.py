@@ -0,0 +1,52 @@
+# Generated by Django 5.1.7 on 2026-10-18 16:01
+
+import django.db.models.deletion
+from decimal import Decimal
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('empresa', '0002_empresa_empresa_created_id_idx'),
+        ('produto', '0003_produto_produto_created_id_idx'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='VendaDiaria',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('dia', models.DateField()),
+                ('quantidade', models.IntegerField(default=0)),
+                ('receita', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=14)),
+                ('pedidos', models.IntegerField(default=0)),
+                ('quantidade_cancelada', models.IntegerField(default=0)),
+                ('valor_cancelado', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=14)),
+                ('empresa', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='empresa.empresa')),
+                ('produto', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='produto.produto')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['empresa', 'dia'], name='venda_diaria_empresa_dia_idx')],
+                'constraints': [models.UniqueConstraint(fields=('dia', 'empresa', 'produto'), name='venda_diaria_unica')],
+            },
+        ),
+        migrations.CreateModel(
+            name='VendaHoraria',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('hora', models.DateTimeField()),
+                ('pedidos', models.IntegerField(default=0)),
+                ('itens', models.IntegerField(default=0)),
+                ('receita', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=14)),
+                ('pedidos_cancelados', models.IntegerField(default=0)),
+                ('valor_cancelado', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=14)),
+                ('empresa', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='empresa.empresa')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('empresa', 'hora'), name='venda_horaria_unica')],
+            },
+        ),
+    ]
@@ -0,0 +1,51 @@
+# backend/loja/relatorios/models.py
+from decimal import Decimal
+from django.db import models
+from empresa.models import Empresa
+from produto.models import Produto
+
+
+class VendaDiaria(models.Model):
+    """Rollup dia × empresa × produto dos pedidos entregues e cancelados (dia no fuso da loja).
+
+    ``receita`` soma o total dos itens (antes do desconto do pedido); ``pedidos``
+    conta os pedidos entregues em que o produto apareceu.
+    """
+    dia = models.DateField()
+    empresa = models.ForeignKey(Empresa, on_delete=models.CASCADE, related_name='+')
+    produto = models.ForeignKey(Produto, on_delete=models.CASCADE, related_name='+')
+    quantidade = models.IntegerField(default=0)
+    receita = models.DecimalField(max_digits=14, decimal_places=2, default=Decimal('0.00'))
+    pedidos = models.IntegerField(default=0)
+    quantidade_cancelada = models.IntegerField(default=0)
+    valor_cancelado = models.DecimalField(max_digits=14, decimal_places=2, default=Decimal('0.00'))
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['dia', 'empresa', 'produto'], name='venda_diaria_unica'),
+        ]
+        indexes = [
+            models.Index(fields=['empresa', 'dia'], name='venda_diaria_empresa_dia_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.dia} {self.empresa_id}/{self.produto_id}: {self.quantidade} ({self.receita})'
+
+
+class VendaHoraria(models.Model):
+    """Rollup hora × empresa dos pedidos entregues e cancelados (``receita`` já com desconto)."""
+    hora = models.DateTimeField()  # início da hora, no fuso da loja
+    empresa = models.ForeignKey(Empresa, on_delete=models.CASCADE, related_name='+')
+    pedidos = models.IntegerField(default=0)
+    itens = models.IntegerField(default=0)
+    receita = models.DecimalField(max_digits=14, decimal_places=2, default=Decimal('0.00'))
+    pedidos_cancelados = models.IntegerField(default=0)
+    valor_cancelado = models.DecimalField(max_digits=14, decimal_places=2, default=Decimal('0.00'))
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['empresa', 'hora'], name='venda_horaria_unica'),
+        ]
+
+    def __str__(self):
+        return f'{self.hora} {self.empresa_id}: {self.pedidos} pedidos ({self.receita})'
@@ -0,0 +1,21 @@
+# backend/loja/relatorios/serializers.py
+from rest_framework import serializers
+from .models import VendaHoraria
+
+
+class VendaAgrupadaSerializer(serializers.Serializer):
+    """Soma das linhas de VendaDiaria agrupadas por dia ou por produto."""
+    dia = serializers.DateField(required=False)
+    produto_id = serializers.IntegerField(required=False)
+    produto_nome = serializers.CharField(required=False)
+    quantidade = serializers.IntegerField()
+    receita = serializers.DecimalField(max_digits=14, decimal_places=2)
+    pedidos = serializers.IntegerField()
+    quantidade_cancelada = serializers.IntegerField()
+    valor_cancelado = serializers.DecimalField(max_digits=14, decimal_places=2)
+
+
+class VendaHorariaSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = VendaHoraria
+        fields = ['hora', 'pedidos', 'itens', 'receita', 'pedidos_cancelados', 'valor_cancelado']
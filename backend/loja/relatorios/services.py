@@ -0,0 +1,249 @@
+# backend/loja/relatorios/services.py
+"""Rollups de vendas (VendaDiaria e VendaHoraria).
+
+Entram no rollup os pedidos entregues (vendas) e cancelados (cancelamentos).
+A cada mudança de status o pedido sai da coluna do status anterior e entra na
+do novo, com poucas queries por lote de pedidos: uma para os itens, uma para
+achar as linhas do rollup que já existem, um UPDATE com CASE e um bulk_create.
+``reconstruir`` recalcula um intervalo de dias do zero (comando reconstruir_vendas).
+"""
+from collections import defaultdict
+from datetime import datetime, time, timedelta
+from decimal import Decimal
+
+from django.db import IntegrityError, transaction
+from django.db.models import Case, Count, F, Q, Sum, When
+from django.db.models.functions import TruncDate, TruncHour
+from django.utils import timezone
+
+from pedido.models import ItemPedido, Pedido
+from .models import VendaDiaria, VendaHoraria
+
+ENTREGUE = 'entregue'
+CANCELADO = 'cancelado'
+STATUS_DOS_ROLLUPS = (ENTREGUE, CANCELADO)
+
+
+def _bucket(momento):
+    local = timezone.localtime(momento)
+    return local.date(), local.replace(minute=0, second=0, microsecond=0)
+
+
+def registrar_transicoes(transicoes):
+    """Aplica aos rollups uma lista de (pedido, status_anterior, status_novo).
+
+    Status None vale como "fora do rollup" (pedido novo ou apagado); o pedido
+    precisa ter os itens gravados.
+    """
+    sinais = defaultdict(list)  # pedido -> [(status, +1/-1)]
+    for pedido, anterior, novo in transicoes:
+        if anterior == novo:
+            continue
+        if anterior in STATUS_DOS_ROLLUPS:
+            sinais[pedido].append((anterior, -1))
+        if novo in STATUS_DOS_ROLLUPS:
+            sinais[pedido].append((novo, 1))
+    if not sinais:
+        return
+
+    itens = defaultdict(list)
+    for linha in (
+        ItemPedido.objects.filter(pedido_id__in=[pedido.pk for pedido in sinais])
+        .values('pedido_id', 'produto_id').annotate(quantidade=Sum('quantidade'), receita=Sum('total')).order_by()
+    ):
+        itens[linha['pedido_id']].append(linha)
+
+    diarias = defaultdict(lambda: defaultdict(int))
+    horarias = defaultdict(lambda: defaultdict(int))
+    for pedido, movimentos in sinais.items():
+        dia, hora = _bucket(pedido.created)
+        total = Decimal(pedido.total)
+        for status, sinal in movimentos:
+            vendido = status == ENTREGUE
+            horaria = horarias[(hora, pedido.empresa_id)]
+            if vendido:
+                horaria['pedidos'] += sinal
+                horaria['receita'] += total * sinal
+            else:
+                horaria['pedidos_cancelados'] += sinal
+                horaria['valor_cancelado'] += total * sinal
+            for item in itens[pedido.pk]:
+                diaria = diarias[(dia, pedido.empresa_id, item['produto_id'])]
+                if vendido:
+                    horaria['itens'] += item['quantidade'] * sinal
+                    diaria['quantidade'] += item['quantidade'] * sinal
+                    diaria['receita'] += item['receita'] * sinal
+                    diaria['pedidos'] += sinal
+                else:
+                    diaria['quantidade_cancelada'] += item['quantidade'] * sinal
+                    diaria['valor_cancelado'] += item['receita'] * sinal
+
+    with transaction.atomic():
+        _somar(VendaDiaria, ('dia', 'empresa_id', 'produto_id'), diarias)
+        _somar(VendaHoraria, ('hora', 'empresa_id'), horarias)
+
+
+def registrar_item(pedido_id, antes, depois):
+    """Aplica aos rollups a mudança de um item de pedido que já está neles.
+
+    ``antes``/``depois`` são (produto_id, quantidade, total) do item, ou None quando ele
+    não existia (incluído) ou deixou de existir (apagado). Chamado depois da gravação.
+    Itens de pedidos fora dos rollups (ex.: pendentes) não mudam nada aqui: eles entram
+    junto com o pedido na transição de status.
+    """
+    if antes == depois:
+        return
+    pedido = (
+        Pedido.objects.filter(pk=pedido_id, status__in=STATUS_DOS_ROLLUPS)
+        .only('status', 'created', 'empresa_id').first()
+    )
+    if pedido is None:
+        return
+    dia, hora = _bucket(pedido.created)
+    vendido = pedido.status == ENTREGUE
+
+    diarias = defaultdict(lambda: defaultdict(int))
+    horarias = defaultdict(lambda: defaultdict(int))
+    for item, sinal in ((antes, -1), (depois, 1)):
+        if item is None:
+            continue
+        produto_id, quantidade, total = item
+        diaria = diarias[(dia, pedido.empresa_id, produto_id)]
+        if vendido:
+            horarias[(hora, pedido.empresa_id)]['itens'] += quantidade * sinal
+            diaria['quantidade'] += quantidade * sinal
+            diaria['receita'] += Decimal(total) * sinal
+        else:
+            diaria['quantidade_cancelada'] += quantidade * sinal
+            diaria['valor_cancelado'] += Decimal(total) * sinal
+
+    if vendido:
+        # "pedidos" conta o pedido uma vez por produto: muda quando o produto aparece ou some do pedido
+        depois_por_produto = defaultdict(int)
+        for produto_id in ItemPedido.objects.filter(pedido_id=pedido_id).values_list('produto_id', flat=True):
+            depois_por_produto[produto_id] += 1
+        antes_por_produto = defaultdict(int, depois_por_produto)
+        if depois is not None:
+            antes_por_produto[depois[0]] -= 1
+        if antes is not None:
+            antes_por_produto[antes[0]] += 1
+        for item in (antes, depois):
+            if item is not None:
+                diarias[(dia, pedido.empresa_id, item[0])]['pedidos'] = (
+                    (depois_por_produto[item[0]] > 0) - (antes_por_produto[item[0]] > 0)
+                )
+
+    with transaction.atomic():
+        _somar(VendaDiaria, ('dia', 'empresa_id', 'produto_id'), diarias)
+        _somar(VendaHoraria, ('hora', 'empresa_id'), horarias)
+
+
+def _somar(model, chave, deltas):
+    """Soma ``deltas`` ({valores da chave: {campo: delta}}) nas linhas do rollup, criando as que faltam."""
+    deltas = {valores: campos for valores, campos in deltas.items() if any(campos.values())}
+    if not deltas:
+        return
+    filtro = Q()
+    for valores in deltas:
+        filtro |= Q(**dict(zip(chave, valores)))
+    existentes = {
+        tuple(linha[campo] for campo in chave): linha['pk']
+        for linha in model.objects.select_for_update().filter(filtro).values('pk', *chave)
+    }
+
+    if existentes:
+        campos = {campo for valores in existentes for campo in deltas[valores]}
+        model.objects.filter(pk__in=existentes.values()).update(**{
+            campo: Case(
+                *[When(pk=pk, then=F(campo) + deltas[valores][campo])
+                  for valores, pk in existentes.items() if deltas[valores].get(campo)],
+                default=F(campo),
+                output_field=model._meta.get_field(campo),
+            )
+            for campo in campos
+        })
+
+    novos = {valores: campos for valores, campos in deltas.items() if valores not in existentes}
+    if novos:
+        try:
+            with transaction.atomic():
+                model.objects.bulk_create([model(**dict(zip(chave, valores)), **campos) for valores, campos in novos.items()])
+        except IntegrityError:
+            _somar(model, chave, novos)  # outra transação criou a linha no meio do caminho: agora é UPDATE
+
+
+def reconstruir(inicio, fim):
+    """Recalcula do zero os rollups dos dias [inicio, fim) (datas no fuso da loja). Retorna (diárias, horárias)."""
+    return gravar(inicio, fim, *calcular(inicio, fim))
+
+
+def _limites(inicio, fim):
+    fuso = timezone.get_current_timezone()
+    return (timezone.make_aware(datetime.combine(inicio, time.min), fuso),
+            timezone.make_aware(datetime.combine(fim, time.min), fuso))
+
+
+def calcular(inicio, fim):
+    """Só as leituras de ``reconstruir``: as linhas dos rollups dos dias [inicio, fim), sem gravar.
+    Retorna (diarias, horarias), dicts {chave: campos}."""
+    fuso = timezone.get_current_timezone()
+    de, ate = _limites(inicio, fim)
+    pedidos = Pedido.objects.filter(created__gte=de, created__lt=ate, status__in=STATUS_DOS_ROLLUPS)
+    itens = ItemPedido.objects.filter(pedido__in=pedidos)
+
+    diarias = defaultdict(dict)
+    for linha in (
+        itens.annotate(dia=TruncDate('pedido__created', tzinfo=fuso))
+        .values('dia', 'pedido__empresa_id', 'produto_id', 'pedido__status')
+        .annotate(quantidade=Sum('quantidade'), receita=Sum('total'), pedidos=Count('pedido_id', distinct=True))
+        .order_by()
+    ):
+        diaria = diarias[(linha['dia'], linha['pedido__empresa_id'], linha['produto_id'])]
+        if linha['pedido__status'] == ENTREGUE:
+            diaria.update(quantidade=linha['quantidade'], receita=linha['receita'], pedidos=linha['pedidos'])
+        else:
+            diaria.update(quantidade_cancelada=linha['quantidade'], valor_cancelado=linha['receita'])
+
+    horarias = defaultdict(dict)
+    for linha in (
+        pedidos.annotate(hora=TruncHour('created', tzinfo=fuso))
+        .values('hora', 'empresa_id', 'status').annotate(pedidos=Count('id'), receita=Sum('total')).order_by()
+    ):
+        horaria = horarias[(linha['hora'], linha['empresa_id'])]
+        if linha['status'] == ENTREGUE:
+            horaria.update(pedidos=linha['pedidos'], receita=linha['receita'])
+        else:
+            horaria.update(pedidos_cancelados=linha['pedidos'], valor_cancelado=linha['receita'])
+    for linha in (
+        itens.filter(pedido__status=ENTREGUE).annotate(hora=TruncHour('pedido__created', tzinfo=fuso))
+        .values('hora', 'pedido__empresa_id').annotate(itens=Sum('quantidade')).order_by()
+    ):
+        horarias[(linha['hora'], linha['pedido__empresa_id'])]['itens'] = linha['itens']
+    return diarias, horarias
+
+
+def gravar(inicio, fim, diarias, horarias):
+    """Troca os rollups dos dias [inicio, fim) pelas linhas de ``calcular``. Retorna (diárias, horárias)."""
+    de, ate = _limites(inicio, fim)
+    with transaction.atomic():
+        VendaDiaria.objects.filter(dia__gte=inicio, dia__lt=fim).delete()
+        VendaHoraria.objects.filter(hora__gte=de, hora__lt=ate).delete()
+        VendaDiaria.objects.bulk_create(
+            [VendaDiaria(dia=dia, empresa_id=empresa_id, produto_id=produto_id, **campos)
+             for (dia, empresa_id, produto_id), campos in diarias.items()],
+            batch_size=1000,
+        )
+        VendaHoraria.objects.bulk_create(
+            [VendaHoraria(hora=hora, empresa_id=empresa_id, **campos) for (hora, empresa_id), campos in horarias.items()],
+            batch_size=1000,
+        )
+    return len(diarias), len(horarias)
+
+
+def lotes(inicio, fim, dias_por_lote):
+    """Divide [inicio, fim) em intervalos de ``dias_por_lote`` dias."""
+    atual = inicio
+    while atual < fim:
+        proximo = min(atual + timedelta(days=dias_por_lote), fim)
+        yield atual, proximo
+        atual = proximo
@@ -0,0 +1,43 @@
+# backend/loja/relatorios/signals.py
+from django.db.models import QuerySet
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.dispatch import receiver
+from pedido.models import ItemPedido, Pedido
+from . import services
+
+
+@receiver(post_save, sender=Pedido)
+def atualizar_rollups(sender, instance, raw=False, **kwargs):
+    """Pedido entregue ou cancelado (ou que deixou de ser) entra/sai dos rollups de vendas."""
+    if raw:
+        return
+    anterior = getattr(instance, 'status_anterior', None)
+    if anterior != instance.status:
+        services.registrar_transicoes([(instance, anterior, instance.status)])
+
+
+@receiver(pre_delete, sender=Pedido)
+def retirar_dos_rollups(sender, instance, **kwargs):
+    # Antes do delete: depois dele os itens já não existem para saber o que subtrair
+    services.registrar_transicoes([(instance, getattr(instance, '_status_carregado', instance.status), None)])
+
+
+@receiver(post_save, sender=ItemPedido)
+def item_gravado(sender, instance, created, raw=False, **kwargs):
+    """Item incluído ou alterado depois que o pedido entrou nos rollups (ex.: pedido criado já
+    entregue pela API e os itens gravados em seguida). bulk_create não passa por aqui."""
+    if raw:
+        return
+    antes = None if created else getattr(instance, '_carregado', None)
+    if not created and antes is None:
+        return  # instância montada sem ler o banco: não há como saber a diferença
+    services.registrar_item(instance.pedido_id, antes, (instance.produto_id, instance.quantidade, instance.total))
+
+
+@receiver(post_delete, sender=ItemPedido)
+def item_apagado(sender, instance, origin=None, **kwargs):
+    # Apagado junto com o pedido: o pre_delete do pedido já tirou todos os itens dos rollups
+    modelo = origin.model if isinstance(origin, QuerySet) else type(origin)
+    if modelo is Pedido:
+        return
+    services.registrar_item(instance.pedido_id, (instance.produto_id, instance.quantidade, instance.total), None)
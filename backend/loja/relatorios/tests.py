@@ -0,0 +1,127 @@
+from datetime import timedelta
+from decimal import Decimal
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase, TransactionTestCase
+from django.utils import timezone
+
+from carrinho.models import Carrinho, ItemCarrinho
+from loja.testing import cliente_autenticado, criar_empresa, criar_produto, criar_usuario
+from mesa.models import Mesa
+from pedido.models import ItemPedido, Pedido
+from pedido.services import criar_pedido_do_carrinho, fechar_mesas
+from .models import VendaDiaria, VendaHoraria
+
+
+def _rollups():
+    diarias = sorted(VendaDiaria.objects.values_list(
+        'dia', 'empresa_id', 'produto_id', 'quantidade', 'receita', 'pedidos', 'quantidade_cancelada', 'valor_cancelado'))
+    horarias = sorted(VendaHoraria.objects.values_list(
+        'hora', 'empresa_id', 'pedidos', 'itens', 'receita', 'pedidos_cancelados', 'valor_cancelado'))
+    return diarias, horarias
+
+
+class RollupVendasTests(TestCase):
+    def setUp(self):
+        self.empresa = criar_empresa()
+        self.client = cliente_autenticado()
+        self.chopp = criar_produto(empresa=self.empresa, venda=12, estoque=100)
+        self.pizza = criar_produto(empresa=self.empresa, nome='Pizza', venda=50, estoque=100)
+
+    def pedido_online(self, **quantidades):
+        usuario = criar_usuario()
+        carrinho = Carrinho.objects.create(usuario=usuario)
+        for produto, quantidade in ((self.chopp, quantidades.get('chopp', 0)), (self.pizza, quantidades.get('pizza', 0))):
+            if quantidade:
+                ItemCarrinho.objects.create(carrinho=carrinho, produto=produto, quantidade=quantidade)
+        return criar_pedido_do_carrinho(carrinho, self.empresa, usuario=usuario)
+
+    def test_entregue_entra_e_cancelado_muda_de_coluna(self):
+        pedido = self.pedido_online(chopp=2, pizza=1)
+        self.assertFalse(VendaDiaria.objects.exists())  # pendente não conta
+
+        pedido.status = 'entregue'
+        pedido.save()
+        chopp = VendaDiaria.objects.get(produto=self.chopp)
+        self.assertEqual((chopp.quantidade, chopp.receita, chopp.pedidos), (2, Decimal('24.00'), 1))
+        hora = VendaHoraria.objects.get()
+        self.assertEqual((hora.pedidos, hora.itens, hora.receita), (1, 3, Decimal('74.00')))
+
+        pedido.status = 'cancelado'
+        pedido.save()
+        chopp.refresh_from_db()
+        hora.refresh_from_db()
+        self.assertEqual((chopp.quantidade, chopp.quantidade_cancelada, chopp.valor_cancelado), (0, 2, Decimal('24.00')))
+        self.assertEqual((hora.pedidos, hora.pedidos_cancelados, hora.valor_cancelado), (0, 1, Decimal('74.00')))
+
+    def test_fechamento_de_mesa_entra_no_rollup(self):
+        mesa = Mesa.objects.create(empresa=self.empresa, numero='1', nome='Mesa 1')
+        mesa.adicionar_item(self.chopp, 3)
+        fechar_mesas([{'slug': mesa.slug}])
+        self.assertEqual(VendaDiaria.objects.get(produto=self.chopp).quantidade, 3)
+        self.assertEqual(VendaHoraria.objects.get().receita, Decimal('36.00'))
+
+    def test_reconstrucao_bate_com_o_incremental(self):
+        for quantidades, status in (({'chopp': 1}, 'entregue'), ({'chopp': 2, 'pizza': 1}, 'entregue'), ({'pizza': 2}, 'cancelado')):
+            pedido = self.pedido_online(**quantidades)
+            pedido.status = status
+            pedido.save()
+        incremental = _rollups()
+        VendaDiaria.objects.all().delete()
+        VendaHoraria.objects.all().delete()
+        call_command('reconstruir_vendas', threads=1, stdout=StringIO())
+        self.assertEqual(_rollups(), incremental)
+
+    def test_pedido_criado_entregue_com_itens_gravados_depois(self):
+        pedido = Pedido.objects.create(empresa=self.empresa, status='entregue', total=74)
+        chopp = ItemPedido.objects.create(pedido=pedido, produto=self.chopp, quantidade=2, preco_unitario=12)
+        ItemPedido.objects.create(pedido=pedido, produto=self.pizza, quantidade=1, preco_unitario=50)
+        ItemPedido.objects.create(pedido=pedido, produto=self.chopp, quantidade=1, preco_unitario=12)
+        chopp.quantidade = 3
+        chopp.save()
+        ItemPedido.objects.filter(produto=self.pizza).get().delete()
+        incremental = _rollups()
+        linha = VendaDiaria.objects.get(produto=self.chopp)
+        self.assertEqual((linha.quantidade, linha.receita, linha.pedidos), (4, Decimal('48.00'), 1))
+        self.assertEqual(VendaDiaria.objects.get(produto=self.pizza).pedidos, 0)
+        self.assertEqual(VendaHoraria.objects.get().itens, 4)
+
+        VendaDiaria.objects.all().delete()
+        VendaHoraria.objects.all().delete()
+        call_command('reconstruir_vendas', threads=1, stdout=StringIO())
+        reconstruido = _rollups()
+        self.assertEqual([linha for linha in reconstruido[0] if linha[3]], [linha for linha in incremental[0] if linha[3]])
+        self.assertEqual(reconstruido[1], incremental[1])
+
+        pedido.delete()  # os itens saem uma vez só (pelo pedido), não de novo pela cascata
+        self.assertEqual(VendaHoraria.objects.get().itens, 0)
+        self.assertEqual(VendaDiaria.objects.get(produto=self.chopp).quantidade, 0)
+
+    def test_dashboard_le_os_rollups(self):
+        pedido = self.pedido_online(chopp=2, pizza=1)
+        pedido.status = 'entregue'
+        pedido.save()
+        por_produto = self.client.get(f'/api/relatorios/vendas/?empresa={self.empresa.id}&agrupar=produto').json()
+        self.assertEqual([(linha['produto_nome'], linha['quantidade']) for linha in por_produto], [('Pizza', 1), ('Chopp Pilsen', 2)])
+        por_dia = self.client.get(f'/api/relatorios/vendas/?empresa={self.empresa.id}').json()
+        self.assertEqual([linha['receita'] for linha in por_dia], ['74.00'])
+        por_hora = self.client.get(f'/api/relatorios/vendas-por-hora/?empresa={self.empresa.id}').json()
+        self.assertEqual([(linha['pedidos'], linha['itens']) for linha in por_hora], [(1, 3)])
+
+
+class ReconstrucaoEmThreadsTests(TransactionTestCase):
+    def test_threads_gravam_um_lote_por_vez(self):
+        empresa = criar_empresa()
+        chopp = criar_produto(empresa=empresa, venda=12, estoque=100)
+        for dias in range(6):
+            pedido = Pedido.objects.create(empresa=empresa, total=12)
+            ItemPedido.objects.create(pedido=pedido, produto=chopp, quantidade=1, preco_unitario=12)
+            Pedido.objects.filter(pk=pedido.pk).update(status='entregue', created=timezone.now() - timedelta(days=dias))
+        call_command('reconstruir_vendas', threads=1, dias_por_lote=1, stdout=StringIO())
+        sequencial = _rollups()
+        self.assertEqual(len(sequencial[0]), 6)
+        saida = StringIO()
+        call_command('reconstruir_vendas', '--processos', '3', '--dias-por-lote', '1', stdout=saida)
+        self.assertIn('3 thread(s)', saida.getvalue())
+        self.assertEqual(_rollups(), sequencial)
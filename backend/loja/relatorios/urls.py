@@ -0,0 +1,8 @@
+# backend/loja/relatorios/urls.py
+from django.urls import path
+from . import views
+
+urlpatterns = [
+    path("relatorios/vendas/", views.vendas, name="relatorio-vendas"),
+    path("relatorios/vendas-por-hora/", views.vendas_por_hora, name="relatorio-vendas-por-hora"),
+]
@@ -0,0 +1,68 @@
+# backend/loja/relatorios/views.py
+from datetime import date, datetime, time, timedelta
+
+from django.db.models import Sum
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.decorators import api_view
+from rest_framework.response import Response
+
+from .models import VendaDiaria, VendaHoraria
+from .serializers import VendaAgrupadaSerializer, VendaHorariaSerializer
+
+CAMPOS_SOMADOS = ['quantidade', 'receita', 'pedidos', 'quantidade_cancelada', 'valor_cancelado']
+
+
+def _filtros(request):
+    """?empresa= (obrigatório), ?inicio= e ?fim= (AAAA-MM-DD, inclusive; padrão: últimos 30 dias)."""
+    try:
+        empresa_id = int(request.query_params['empresa'])
+        fim = date.fromisoformat(request.query_params['fim']) if request.query_params.get('fim') else timezone.localdate()
+        inicio = (date.fromisoformat(request.query_params['inicio']) if request.query_params.get('inicio')
+                  else fim - timedelta(days=29))
+    except (KeyError, ValueError):
+        return None, Response({"error": "Informe ?empresa=<id> e datas no formato AAAA-MM-DD"}, status=status.HTTP_400_BAD_REQUEST)
+    return (empresa_id, inicio, fim), None
+
+
+@api_view(['GET'])
+def vendas(request):
+    """Vendas por dia (padrão) ou por produto (?agrupar=produto), lidas do rollup VendaDiaria."""
+    filtros, erro = _filtros(request)
+    if erro:
+        return erro
+    empresa_id, inicio, fim = filtros
+    agrupar = request.query_params.get('agrupar', 'dia')
+    if agrupar not in ('dia', 'produto'):
+        return Response({"error": "agrupar deve ser 'dia' ou 'produto'"}, status=status.HTTP_400_BAD_REQUEST)
+
+    linhas = VendaDiaria.objects.filter(empresa_id=empresa_id, dia__gte=inicio, dia__lte=fim)
+    if agrupar == 'produto':
+        grupo, ordem = ['produto_id', 'produto__nome'], '-total_receita'
+    else:
+        grupo, ordem = ['dia'], 'dia'
+    linhas = (
+        linhas.values(*grupo)
+        .annotate(**{f'total_{campo}': Sum(campo) for campo in CAMPOS_SOMADOS})  # o nome não pode repetir o do campo
+        .order_by(ordem)
+    )
+    grupos = [
+        {**{campo.replace('__', '_'): linha[campo] for campo in grupo},
+         **{campo: linha[f'total_{campo}'] for campo in CAMPOS_SOMADOS}}
+        for linha in linhas
+    ]
+    return Response(VendaAgrupadaSerializer(grupos, many=True).data)
+
+
+@api_view(['GET'])
+def vendas_por_hora(request):
+    """Pedidos, itens e receita por hora, lidos do rollup VendaHoraria."""
+    filtros, erro = _filtros(request)
+    if erro:
+        return erro
+    empresa_id, inicio, fim = filtros
+    fuso = timezone.get_current_timezone()
+    de = timezone.make_aware(datetime.combine(inicio, time.min), fuso)
+    ate = timezone.make_aware(datetime.combine(fim + timedelta(days=1), time.min), fuso)
+    linhas = VendaHoraria.objects.filter(empresa_id=empresa_id, hora__gte=de, hora__lt=ate).order_by('hora')
+    return Response(VendaHorariaSerializer(linhas, many=True).data)
@@ -2,10 +2,13 @@
 # backend/loja/usuario/models.py
 from django.db import models
 from django.contrib.auth.models import User
-from django.utils.text import slugify
-from django.utils.crypto import get_random_string
+from loja.slugs import SlugUnicoMixin
+
+class Usuario(SlugUnicoMixin, models.Model):
+    # O slug segue o campo name: é regerado quando ele muda
+    slug_origem = 'name'
+    slug_acompanha_origem = True
 
-class Usuario(models.Model):
     USER_TYPE_CHOICES = (
         ('physical', 'Physical'),
         ('online', 'Online'),
@@ -21,15 +24,12 @@ class Usuario(models.Model):
     created = models.DateTimeField(auto_now_add=True)
     updated = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['created', 'id'], name='usuario_created_id_idx'),  # paginação por cursor
+        ]
+
     def __str__(self):
         return self.name
 
-    def save(self, *args, **kwargs):
-        if not self.slug or Usuario.objects.filter(pk=self.pk).exists() and self.name != Usuario.objects.get(pk=self.pk).name:
-            slug_base = slugify(self.name)
-            slug = slug_base
-            if Usuario.objects.filter(slug=slug).exists():
-                slug = f'{slug_base}-{get_random_string(5)}'
-            self.slug = slug
-        super(Usuario, self).save(*args, **kwargs)
 
@@ -5,6 +5,7 @@ from django.contrib.auth.models import User
 from rest_framework import status
 from .models import Usuario
 from .serializers import UsuarioSerializer
+from loja.pagination import paginar
 from django.db.models import Q
 from django.contrib.auth import authenticate, login
 
@@ -36,8 +37,7 @@ def search_usuarios(request):
 def usuarios(request):
     if request.method == 'GET':
         usuarios = Usuario.objects.all()
-        serializer = UsuarioSerializer(usuarios, many=True)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        return paginar(request, usuarios, UsuarioSerializer)
 
     if request.method == 'POST':
         name = request.data.get('name')
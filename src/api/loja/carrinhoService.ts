@@ -1,7 +1,7 @@
 
 // src/api/loja/carrinhoService.ts
 import axios from 'axios';
-import { API_URL } from '@/config/api';
+import { API_URL, postIdempotente } from '@/config/api';
 import { ProdutoCarrinho } from '@/types/tipo';
 
 const api = axios.create({
@@ -21,7 +21,7 @@ export const adicionarItem = async (produto: Omit<ProdutoCarrinho, 'quantidade'>
       const novoCarrinho = await api.post<ProdutoCarrinho>('/carrinhos/', { slug: `carrinho-${Date.now()}` });
       console.log('Novo carrinho criado:', novoCarrinho.data);
       const slug = novoCarrinho.data.slug;
-      await api.post(`/carrinhos/${slug}/adicionar-item/`, {
+      await postIdempotente(api, `/carrinhos/${slug}/adicionar-item/`, {
         produto_id: produto.id,
         slug: produto.slug, // Enviar o slug do produto
         quantidade: 1,
@@ -29,7 +29,7 @@ export const adicionarItem = async (produto: Omit<ProdutoCarrinho, 'quantidade'>
       });
     } else {
       const carrinho = carrinhoData[0];
-      await api.post(`/carrinhos/${carrinho.slug}/adicionar-item/`, {
+      await postIdempotente(api, `/carrinhos/${carrinho.slug}/adicionar-item/`, {
         produto_id: produto.id,
         slug: produto.slug, // Enviar o slug do produto
         quantidade: 1,
@@ -1,8 +1,8 @@
 //src\api\mesas\itemService.ts
 import axios from 'axios';
-import { API_URL } from '../../config/api';
+import { API_URL, postIdempotente } from '../../config/api';
 import { PedidoItem } from '../../types/tipo';
-import { incrementarEstoque, decrementarEstoque } from '@/api/produtos/produtoService';
+import { decrementarEstoque } from '@/api/produtos/produtoService';
 import { registrarMovimentacaoSaida } from '@/api/estoque/estoqueService';
 
 export const adicionarItemMesa = async (slug: string, item: PedidoItem) => {
@@ -14,7 +14,7 @@ export const adicionarItemMesa = async (slug: string, item: PedidoItem) => {
   };
   console.log('📌 Payload enviado:', payload);
   try {
-    const response = await axios.post(`${API_URL}/mesas/${slug}/adicionar-item/`, payload);
+    const response = await postIdempotente(axios, `${API_URL}/mesas/${slug}/adicionar-item/`, payload);
     console.log('✅ Resposta da API:', response.data);
     // await decrementarEstoque(item.slug, item.quantidade);
     return response.data;
@@ -24,6 +24,25 @@ export const adicionarItemMesa = async (slug: string, item: PedidoItem) => {
   }
 };
 
+// Rodada: vários itens numa única requisição (estoque conferido e baixado de uma vez)
+export const adicionarRodadaMesa = async (slug: string, itens: PedidoItem[]) => {
+  const payload = {
+    itens: itens.map((item) => ({
+      produto_id: item.produtoId || item.id,
+      quantidade: item.quantidade,
+    })),
+  };
+  console.log('🚀 Enviando rodada para API:', `${API_URL}/mesas/${slug}/rodada/`, payload);
+  try {
+    const response = await postIdempotente(axios, `${API_URL}/mesas/${slug}/rodada/`, payload);
+    console.log('✅ Rodada adicionada:', response.data);
+    return response.data;
+  } catch (error: any) {
+    console.error("❌ Erro ao adicionar rodada:", error.response?.data || error);
+    throw error;
+  }
+};
+
 export const removerItemMesa = async (slug: string, produtoId: string | number): Promise<any> => {
   console.log("🚀 Removendo item da mesa:", slug, produtoId);
 
@@ -43,12 +62,12 @@ export const removerItemMesa = async (slug: string, produtoId: string | number):
   }
 };
 
-export const cancelarItensMesa = async (slug: string, itensMesa: PedidoItem[]): Promise<any> => {
+// O backend devolve o estoque dos itens na mesma transação do cancelamento
+export const cancelarItensMesa = async (slug: string): Promise<any> => {
   console.log('🚀 Cancelando todos os itens da:', slug);
   const url = `${API_URL}/mesas/${slug}/cancelar-pedido/`;
   try {
     const response = await axios.post(url);
-    itensMesa.map((item) => incrementarEstoque(item.slug, item.quantidade));
     console.log('✅ Itens da mesa cancelados:', response.data);
     return response.data;
   } catch (error: any) {
@@ -6,7 +6,6 @@ import {
   atualizarMesa as atualizarMesaStorage,
 } from '../../data/mesa_storage';
 import { Mesa, PedidoItem } from '../../types/tipo';
-import { registrarMovimentacaoSaida } from '@/api/estoque/estoqueService';
 
 export const getAllMesas = async (): Promise<Mesa[]> => {
   try {
@@ -69,6 +68,21 @@ export const limparMesa = async (slug: string): Promise<any> => {
   }
 };
 
+// Fecha a mesa paga: o backend gera o pedido (origem 'fisica') e libera a mesa
+export const fecharMesa = async (
+  slug: string,
+  pagamento: { metodo_pagamento?: string; valor_pago?: number; pessoas_pagaram?: number } = {}
+): Promise<any> => {
+  try {
+    const response = await axios.post(`${API_URL}/mesas/${slug}/fechar/`, pagamento);
+    console.log('✅ Mesa fechada, pedido gerado:', response.data);
+    return response.data;
+  } catch (error: any) {
+    console.error("❌ Erro ao fechar mesa:", error.response?.data || error);
+    throw error;
+  }
+};
+
 // Função para confirmar o pagamento da mesa
 export const confirmarPagamento = async (
   itemSlug: string,
@@ -84,13 +98,16 @@ export const confirmarPagamento = async (
       throw new Error('Nenhum item para registrar movimentação');
     }
 
-    // Registrar movimentação de saída no estoque
-    await registrarMovimentacaoSaida(itensPedido);
+    // O estoque já foi baixado (movimentação 'reserva') quando cada item entrou na mesa;
+    // registrar uma saída aqui contaria a venda duas vezes no livro de estoque.
 
-    // If it's a counter order, delete the table; otherwise, just clear it
-    const response = not_numerico
-      ? await deletarMesa(itemSlug) // New function to delete the table
-      : await limparMesa(itemSlug); // Existing function to clear the table
+    // Registra a venda (pedido da loja física) e libera a mesa
+    const response = await fecharMesa(itemSlug);
+
+    // If it's a counter order, delete the table
+    if (not_numerico) {
+      await deletarMesa(itemSlug);
+    }
 
     console.log('✅ Pagamento confirmado:', response);
     return response;
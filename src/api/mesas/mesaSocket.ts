@@ -0,0 +1,65 @@
+// src/api/mesas/mesaSocket.ts
+import { QueryClient } from '@tanstack/react-query';
+import { API_URL } from '../../config/api';
+import { Mesa, PedidoItem } from '../../types/tipo';
+
+// ws://127.0.0.1:8004/ws/mesas/ (mesmo host da API)
+const WS_URL = `${API_URL.replace(/^http/, 'ws').replace(/\/api\/?$/, '')}/ws/mesas/`;
+const RECONECTAR_MS = 3000;
+
+type EventoMesa =
+  | { evento: 'estado'; mesas: Mesa[] }
+  | { evento: 'item_adicionado' | 'item_atualizado' | 'item_removido'; mesa: Partial<Mesa>; item: PedidoItem }
+  | { evento: 'mesa_liberada'; mesa: Partial<Mesa> }
+  | { evento: 'ressincronizar' };
+
+const aplicarEvento = (mesas: Mesa[], dados: EventoMesa): Mesa[] => {
+  if (dados.evento === 'estado' || dados.evento === 'ressincronizar') return mesas;
+  return mesas.map((mesa) => {
+    if (mesa.id !== dados.mesa.id) return mesa;
+    const atualizada = { ...mesa, ...dados.mesa };
+    if (dados.evento === 'mesa_liberada') return { ...atualizada, items: [] };
+    const outros = (mesa.items || []).filter((item) => item.id !== dados.item.id);
+    return {
+      ...atualizada,
+      items: dados.evento === 'item_removido' ? outros : [...outros, dados.item],
+    };
+  });
+};
+
+/**
+ * Mantém o cache ['mesas'] do react-query em dia via WebSocket, sem polling.
+ * Retorna a função que encerra a conexão (para o cleanup do useEffect).
+ */
+export const conectarMesasTempoReal = (queryClient: QueryClient): (() => void) => {
+  let socket: WebSocket | null = null;
+  let encerrado = false;
+  let timer: ReturnType<typeof setTimeout> | undefined;
+
+  const conectar = () => {
+    const token = localStorage.getItem('access_token');
+    socket = new WebSocket(`${WS_URL}?token=${encodeURIComponent(token || '')}`);
+
+    socket.onmessage = (mensagem) => {
+      const dados: EventoMesa = JSON.parse(mensagem.data);
+      if (dados.evento === 'estado') {
+        queryClient.setQueryData<Mesa[]>(['mesas'], dados.mesas);
+      } else if (dados.evento === 'ressincronizar') {
+        socket?.close(); // reconecta e recebe o estado completo
+      } else {
+        queryClient.setQueryData<Mesa[]>(['mesas'], (mesas = []) => aplicarEvento(mesas, dados));
+      }
+    };
+
+    socket.onclose = () => {
+      if (!encerrado) timer = setTimeout(conectar, RECONECTAR_MS);
+    };
+  };
+
+  conectar();
+  return () => {
+    encerrado = true;
+    clearTimeout(timer);
+    socket?.close();
+  };
+};
@@ -1,6 +1,6 @@
 // src/api/pedidos/pedidoService.ts
 import axios from 'axios';
-import { API_URL } from '../../config/api';
+import { API_URL, postIdempotente } from '../../config/api';
 import { Pedido, PedidoItem, PedidoResponse } from '@/types/tipo';
 
 const api = axios.create({
@@ -130,7 +130,7 @@ export const criarPedidoOnline = async (data: PedidoOnlineData): Promise<Pedido>
     console.log('🔗 URL da requisição:', `${API_URL}/pedidos/carrinho/${data.carrinhoSlug}/criar/`);
 
     console.log('🌐 Enviando requisição POST para o backend...');
-    const response = await api.post<Pedido>(`/pedidos/carrinho/${data.carrinhoSlug}/criar/`, payload);
+    const response = await postIdempotente<Pedido>(api, `/pedidos/carrinho/${data.carrinhoSlug}/criar/`, payload);
     console.log('✅ Pedido criado com sucesso:', response.data);
 
     return response.data;
@@ -1,5 +1,5 @@
 // src\config\api.ts
-import axios from 'axios';
+import axios, { AxiosInstance } from 'axios';
 
 export const API_URL = 'http://127.0.0.1:8004/api';
 
@@ -7,5 +7,15 @@ export const api = axios.create({
   baseURL: API_URL,
 });
 
-
-
+// POST com Idempotency-Key: se a rede cair antes da resposta, reenvia com a mesma chave
+// e o backend devolve a resposta gravada em vez de baixar o estoque (ou criar o pedido) de novo
+export const postIdempotente = async <T = any>(cliente: AxiosInstance, url: string, payload: unknown, tentativas = 3) => {
+  const headers = { 'Idempotency-Key': crypto.randomUUID() };
+  for (let tentativa = 1; ; tentativa++) {
+    try {
+      return await cliente.post<T>(url, payload, { headers });
+    } catch (error: any) {
+      if (error.response || tentativa >= tentativas) throw error; // só falha de rede é repetida
+    }
+  }
+};
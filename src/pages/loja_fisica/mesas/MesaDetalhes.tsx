@@ -207,7 +207,7 @@ const MesaDetalhes = () => {
     if (!mesa || !slug) return;
   
     try {
-      const response = await cancelarItensMesa(mesa.slug, itensMesa);
+      const response = await cancelarItensMesa(mesa.slug);
       console.log('✅ Resposta do cancelamento:', response);
       await queryClient.invalidateQueries({ queryKey: ['mesa', slug] });
       await refetchMesa();
@@ -4,6 +4,7 @@ import { useQuery, useQueryClient } from '@tanstack/react-query';
 import { useNavigate } from 'react-router-dom';
 import { useToast } from "@/hooks/use-toast";
 import { getAllMesas, salvarMesa, deletarMesa } from '@/api/mesas/mesaService';
+import { conectarMesasTempoReal } from '@/api/mesas/mesaSocket';
 import MesaCard from '@/components/loja_fisica/mesa/MesaCard';
 import MesaActions from '@/components/loja_fisica/mesa/MesaActions';
 import { Mesa } from "@/types/tipo";
@@ -47,6 +48,9 @@ const MesasPage = () => {
     }
   }, [refetch]);
 
+  // Status e itens das mesas chegam por WebSocket (sem polling)
+  useEffect(() => conectarMesasTempoReal(queryClient), [queryClient]);
+
   const mesasAbertas = mesas
     .filter(mesa => mesa.status === 'Ocupada')
     .sort((a, b) => {
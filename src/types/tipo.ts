@@ -141,7 +141,7 @@ export interface MovimentacaoEstoque {
   id: number;
   produto: string;  // Alterado de number para string para corresponder ao id do produto
   quantidade: number;
-  tipo: 'entrada' | 'saída' | 'saida'; // Adicionado 'saida' sem acento
+  tipo: 'entrada' | 'saída' | 'saida' | 'reserva' | 'estorno'; // Adicionado 'saida' sem acento
   data: string;
   slug?: string;
   empresa?: string; // Adicionado campo empresa para registrar a empresa do produto